@@ -1,16 +1,30 @@
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton, QStackedWidget, QLabel
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton, QStackedWidget, QLabel, QProgressBar
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QPalette, QBrush
 from PyQt5.QtCore import Qt, QSize
-from coordinate_converter_app import CoordinateConverterApp
-from angle_converter_app import AngleConverterApp
-from degree_converter_app import DegreeConverterApp
-from direct_problem_app import DirectProblemApp
-from inverse_problem_app import InverseProblemApp
 from PyQt5.QtWidgets import QDesktopWidget
+import importlib
+import sys
+import time
+
+# Pages construites à la demande : nom -> (module, classe). Le module n'est importé
+# qu'à la première ouverture de la page, ce qui évite notamment de démarrer
+# QtWebEngine (cartes des problèmes direct et inverse) avant qu'il ne serve.
+# Seule la bibliothèque QtWebEngineCore est chargée au démarrage, pour déclarer
+# le schéma geotools:// (voir map_scheme.py et main.py).
+PAGES = {
+    "coordinate": ("coordinate_converter_app", "CoordinateConverterApp"),
+    "angle": ("angle_converter_app", "AngleConverterApp"),
+    "degree": ("degree_converter_app", "DegreeConverterApp"),
+    "direct": ("direct_problem_app", "DirectProblemApp"),
+    "inverse": ("inverse_problem_app", "InverseProblemApp"),
+}
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.pages = {}
+        self.timings = {}  # durées mesurées en secondes (démarrage, construction des pages)
+        self.tracked_job = None  # calcul dont l'avancement est affiché (voir workers.py)
         self.initUI()
 
     def initUI(self):
@@ -84,19 +98,7 @@ class MainWindow(QMainWindow):
         self.main_layout.addStretch(1)
 
         self.menu_page = MenuPage(self)
-        self.coordinate_page = self.create_converter_page(CoordinateConverterApp)
-        self.angle_page = self.create_converter_page(AngleConverterApp)
-        self.degree_page = self.create_converter_page(DegreeConverterApp)
-
-        self.direct_page = self.create_converter_page(DirectProblemApp)
-        self.inverse_page = self.create_converter_page(InverseProblemApp)
-
         self.stacked_widget.addWidget(self.menu_page)
-        self.stacked_widget.addWidget(self.coordinate_page)
-        self.stacked_widget.addWidget(self.angle_page)
-        self.stacked_widget.addWidget(self.degree_page)
-        self.stacked_widget.addWidget(self.direct_page)
-        self.stacked_widget.addWidget(self.inverse_page)
 
         creator_label = QLabel("Réalisé par: KHOUSSI Imane")
         creator_label.setAlignment(Qt.AlignRight)
@@ -108,6 +110,21 @@ class MainWindow(QMainWindow):
         """)
         self.main_layout.addWidget(creator_label)
 
+        # Durées de démarrage et de construction des pages
+        self.statusBar().setStyleSheet("""
+            color: #FFFFFF;
+            background-color: rgba(0, 0, 0, 0.5);
+        """)
+
+        # Avancement des calculs en arrière-plan, affiché seulement pendant un calcul par lot
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(250)
+        self.cancel_button = QPushButton("Annuler")
+        self.cancel_button.clicked.connect(self.cancel_tracked_job)
+        for widget in (self.progress_bar, self.cancel_button):
+            widget.hide()
+            self.statusBar().addPermanentWidget(widget)
+
     def resizeEvent(self, event):
         """Gérer le redimensionnement de la fenêtre"""
         super().resizeEvent(event)
@@ -149,26 +166,88 @@ class MainWindow(QMainWindow):
 
         return page
 
+    def page(self, name):
+        """Retourne la page demandée, en important son module et en la construisant au premier appel"""
+        page = self.pages.get(name)
+        if page is None:
+            start = time.perf_counter()
+            module_name, class_name = PAGES[name]
+            converter_class = getattr(importlib.import_module(module_name), class_name)
+            page = self.create_converter_page(converter_class)
+            self.stacked_widget.addWidget(page)
+            self.pages[name] = page
+            self.report_timing(f"page {name}", time.perf_counter() - start)
+        return page
+
+    def report_timing(self, label, seconds, parts=None):
+        """
+        Enregistre une durée et l'affiche dans la barre d'état, avec le détail
+        éventuel de ses composantes (parts : nom -> durée en secondes)
+        """
+        self.timings[label] = seconds
+        message = f"{label} : {seconds * 1000:.0f} ms"
+        if parts:
+            for name, part in parts.items():
+                self.timings[f"{label} / {name}"] = part
+            message += " (dont " + ", ".join(f"{name} : {part * 1000:.0f} ms"
+                                            for name, part in parts.items()) + ")"
+        self.statusBar().showMessage(message)
+
+    def track_job(self, job):
+        """Affiche l'avancement d'un calcul en arrière-plan dans la barre d'état, avec un bouton d'annulation"""
+        self.hide_progress(self.tracked_job)
+        self.tracked_job = job
+        job.signals.progress.connect(lambda done, total: self.show_progress(job, done, total))
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *_: self.hide_progress(job))
+        return job
+
+    def show_progress(self, job, done, total):
+        if job is not self.tracked_job:
+            return
+        self.progress_bar.setMaximum(max(total, 1))
+        self.progress_bar.setValue(done)
+        self.progress_bar.show()
+        self.cancel_button.show()
+
+    def hide_progress(self, job):
+        if job is not None and job is self.tracked_job:
+            self.tracked_job = None
+            self.progress_bar.hide()
+            self.cancel_button.hide()
+
+    def cancel_tracked_job(self):
+        if self.tracked_job is not None:
+            self.tracked_job.cancel()
+            self.statusBar().showMessage("Calcul annulé", 3000)
+
+    def closeEvent(self, event):
+        # Les threads du pool ne doivent pas survivre à la fenêtre (workers n'est
+        # importé qu'au premier calcul : inutile de le charger ici)
+        if "workers" in sys.modules:
+            sys.modules["workers"].cancel_all()
+        super().closeEvent(event)
+
     def show_menu(self):
         self.stacked_widget.setCurrentWidget(self.menu_page)
 
     def show_coordinate_converter(self):
-        self.stacked_widget.setCurrentWidget(self.coordinate_page)
+        self.stacked_widget.setCurrentWidget(self.page("coordinate"))
 
     def show_angle_converter(self):
-        self.stacked_widget.setCurrentWidget(self.angle_page)
+        self.stacked_widget.setCurrentWidget(self.page("angle"))
 
     def show_degree_converter(self):
-        self.stacked_widget.setCurrentWidget(self.degree_page)
+        self.stacked_widget.setCurrentWidget(self.page("degree"))
 
 
     def show_direct_problem(self):
         """Affiche la page de résolution du problème direct"""
-        self.stacked_widget.setCurrentWidget(self.direct_page)
+        self.stacked_widget.setCurrentWidget(self.page("direct"))
 
     def show_inverse_problem(self):
         """Affiche la page de résolution du problème inverse"""
-        self.stacked_widget.setCurrentWidget(self.inverse_page)
+        self.stacked_widget.setCurrentWidget(self.page("inverse"))
 
 class MenuPage(QWidget):
     def __init__(self, main_window):
@@ -0,0 +1,353 @@
+# batch_runner.py
+"""
+Traitements par lot sans interface graphique : lecture d'un fichier CSV par
+blocs de taille fixe, calcul vectorisé sur chaque bloc et écriture immédiate
+des résultats, de sorte que la mémoire utilisée ne dépend pas du nombre de
+lignes du fichier.
+
+Exemple :
+    python batch_runner.py direct points.csv resultats.csv --method puissant --angles dms
+    python batch_runner.py inverse bases.tsv resultats.tsv --method gauss
+    python batch_runner.py lines bases.csv lignes.geojson --tolerance 50
+"""
+import argparse
+import csv
+import itertools
+import math
+import sys
+import time
+import numpy as np
+from calculator_factory import DIRECT_METHODS, INVERSE_METHODS, direct_batch, inverse_batch
+from conversion_algorithms import DegreeConverter
+import densify
+from utils import BatchStatus
+
+
+DIRECT_INPUT_COLUMNS = ("phi1", "lambda1", "alpha12", "S")
+DIRECT_OUTPUT_COLUMNS = ("phi2", "lambda2", "alpha21", "status")
+INVERSE_INPUT_COLUMNS = ("phi1", "lambda1", "phi2", "lambda2")
+INVERSE_OUTPUT_COLUMNS = ("S", "alpha12", "alpha21", "status")
+
+# Formats d'export des lignes densifiées, selon l'extension du fichier de sortie
+LINE_FORMATS = {".geojson": "geojson", ".json": "geojson", ".kml": "kml"}
+
+# Nombre de lignes lues, calculées et écrites à la fois
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def detect_delimiter(path):
+    """Séparateur de colonnes déduit de l'extension (tabulation pour .tsv/.tab, virgule sinon)"""
+    return "\t" if path.lower().endswith((".tsv", ".tab")) else ","
+
+
+def read_chunks(handle, delimiter, chunk_size, header=True):
+    """
+    Lit un fichier délimité par blocs de chunk_size lignes.
+
+    Yields:
+        Listes de lignes (listes de chaînes), les lignes vides étant ignorées
+    """
+    reader = csv.reader(handle, delimiter=delimiter)
+    if header:
+        next(reader, None)
+    rows = (row for row in reader if row)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_columns(rows, count, angle_columns=(), angle_format="decimal"):
+    """
+    Convertit un bloc de lignes textuelles en colonnes float64.
+
+    Les angles des colonnes angle_columns sont lus en degrés décimaux ou en DMS
+    (voir DegreeConverter.parse_dms). Une ligne illisible ou incomplète ne
+    bloque pas le lot : ses valeurs deviennent NaN et elle est signalée dans le
+    masque retourné.
+
+    Returns:
+        Tuple (colonnes, invalid) : tableau (count, n) et masque booléen des lignes invalides
+    """
+    columns = np.full((count, len(rows)), np.nan)
+    invalid = np.zeros(len(rows), dtype=bool)
+
+    if angle_format == "decimal":
+        # Chemin rapide : conversion NumPy de tout le bloc en une fois
+        try:
+            columns[:] = np.array([row[:count] for row in rows], dtype=np.float64).T
+            return columns, invalid
+        except ValueError:
+            pass
+
+    for i, row in enumerate(rows):
+        try:
+            if len(row) < count:
+                raise ValueError
+            for j in range(count):
+                text = row[j].strip()
+                if j in angle_columns and angle_format == "dms":
+                    columns[j, i] = DegreeConverter.parse_dms(text)
+                else:
+                    columns[j, i] = float(text.replace(",", "."))
+        except ValueError:
+            columns[:, i] = np.nan
+            invalid[i] = True
+    return columns, invalid
+
+
+def write_rows(handle, columns, status, delimiter, precision=9):
+    """Écrit un bloc de résultats (colonnes float suivies du code d'état)"""
+    # Un formatage par ligne sur des listes Python : deux fois plus rapide que np.savetxt
+    line = delimiter.join([f"%.{precision}f"] * len(columns) + ["%d"]) + "\n"
+    handle.write("".join(map(line.__mod__, zip(*(c.tolist() for c in (*columns, status))))))
+
+
+def run_direct_csv(input_path, output_path, method="puissant", ellipsoid_name="Clarke 1880",
+                   angle_format="decimal", chunk_size=DEFAULT_CHUNK_SIZE, delimiter=None,
+                   header=True, progress=None):
+    """
+    Résout le problème direct pour chaque ligne d'un fichier CSV.
+
+    Colonnes d'entrée : phi1, lambda1, alpha12 (degrés décimaux ou DMS), S (mètres).
+    Colonnes de sortie : phi2, lambda2, alpha21 en degrés décimaux et le code
+    d'état BatchStatus de la ligne (0 si le calcul est valide).
+
+    Args:
+        input_path, output_path: Fichiers d'entrée et de sortie
+        method: "spherical", "puissant" ou "vincenty"
+        ellipsoid_name: Nom d'un ellipsoïde enregistré
+        angle_format: "decimal" ou "dms"
+        chunk_size: Nombre de lignes traitées à la fois
+        delimiter: Séparateur de colonnes (déduit de l'extension si absent)
+        header: True si la première ligne du fichier d'entrée est un en-tête
+        progress: Fonction appelée avec le nombre de lignes traitées après chaque bloc
+
+    Returns:
+        Statistiques du traitement (voir _summary)
+    """
+    if method not in DIRECT_METHODS:
+        raise ValueError(f"Méthode inconnue pour le problème direct : {method}")
+
+    def compute(phi1, lambda1, alpha12, s):
+        phi2, lambda2, alpha21, status = direct_batch(
+            method, ellipsoid_name, np.radians(phi1), np.radians(lambda1), np.radians(alpha12), s)
+        return (np.degrees(phi2), np.degrees(lambda2), np.degrees(alpha21)), status
+
+    return _run_csv(input_path, output_path, compute, len(DIRECT_INPUT_COLUMNS), (0, 1, 2),
+                    DIRECT_OUTPUT_COLUMNS, angle_format, chunk_size, delimiter, header, progress)
+
+
+def run_inverse_csv(input_path, output_path, method="gauss", ellipsoid_name="Clarke 1880",
+                    angle_format="decimal", chunk_size=DEFAULT_CHUNK_SIZE, delimiter=None,
+                    header=True, progress=None):
+    """
+    Résout le problème inverse pour chaque couple de points d'un fichier CSV.
+
+    Colonnes d'entrée : phi1, lambda1, phi2, lambda2 (degrés décimaux ou DMS).
+    Colonnes de sortie : S (mètres), alpha12, alpha21 (degrés décimaux) et le
+    code d'état BatchStatus de la ligne (0 si le calcul est valide).
+
+    Args:
+        method: "spherical", "gauss" ou "vincenty"
+        Autres arguments : voir run_direct_csv
+
+    Returns:
+        Statistiques du traitement (voir _summary)
+    """
+    if method not in INVERSE_METHODS:
+        raise ValueError(f"Méthode inconnue pour le problème inverse : {method}")
+
+    def compute(phi1, lambda1, phi2, lambda2):
+        s, alpha12, alpha21, status = inverse_batch(
+            method, ellipsoid_name, np.radians(phi1), np.radians(lambda1),
+            np.radians(phi2), np.radians(lambda2))
+        return (s, np.degrees(alpha12), np.degrees(alpha21)), status
+
+    return _run_csv(input_path, output_path, compute, len(INVERSE_INPUT_COLUMNS), (0, 1, 2, 3),
+                    INVERSE_OUTPUT_COLUMNS, angle_format, chunk_size, delimiter, header, progress)
+
+
+def run_lines_csv(input_path, output_path, method="vincenty", ellipsoid_name="Clarke 1880",
+                  tolerance=densify.DEFAULT_TOLERANCE, spacing=None, output_format=None,
+                  angle_format="decimal", chunk_size=DEFAULT_CHUNK_SIZE, delimiter=None,
+                  header=True, progress=None):
+    """
+    Exporte les géodésiques entre les couples de points d'un fichier CSV, en
+    GeoJSON ou en KML, densifiées à tolerance et/ou spacing mètres près (voir
+    densify.densify).
+
+    Colonnes d'entrée : phi1, lambda1, phi2, lambda2 (degrés décimaux ou DMS).
+    Chaque ligne devient une entité LineString portant son numéro de ligne
+    (« row ») et son code d'état BatchStatus (« status ») ; en KML, le nom
+    de la ligne est son numéro.
+
+    Args:
+        method: "spherical" ou "vincenty"
+        output_format: "geojson" ou "kml" (déduit de l'extension si absent)
+        Autres arguments : voir run_direct_csv
+
+    Returns:
+        Statistiques du traitement (voir _summary)
+    """
+    if method not in densify.DENSIFY_METHODS:
+        raise ValueError(f"Méthode inconnue pour la densification : {method}")
+    output_format = output_format or LINE_FORMATS.get(
+        output_path[output_path.rfind("."):].lower(), "geojson")
+    if output_format not in ("geojson", "kml"):
+        raise ValueError(f"Format d'export inconnu : {output_format}")
+    header_text, footer_text = ((densify.GEOJSON_HEADER, densify.GEOJSON_FOOTER) if output_format == "geojson"
+                                else (densify.KML_HEADER, densify.KML_FOOTER))
+
+    delimiter = delimiter or detect_delimiter(input_path)
+    status_counts = {}
+    rows = 0
+    written = False
+    start = time.perf_counter()
+
+    with open(input_path, newline="", encoding="utf-8") as source, \
+            open(output_path, "w", encoding="utf-8") as target:
+        target.write(header_text)
+        for chunk in read_chunks(source, delimiter, chunk_size, header):
+            columns, invalid = parse_columns(chunk, len(INVERSE_INPUT_COLUMNS), (0, 1, 2, 3), angle_format)
+            lat, lon, offsets, status = densify.densify(
+                *columns, ellipsoid_name, spacing=spacing, tolerance=tolerance, method=method)
+            status[invalid] = BatchStatus.INVALID_INPUT
+
+            # Les lignes non calculables ne sont pas exportées, mais comptées
+            valid = np.flatnonzero(densify.finite_lines(lat, lon, offsets))
+            lat, lon, offsets = densify.select_lines(lat, lon, offsets, valid)
+            numbers = (rows + valid + 1).tolist()
+            if output_format == "geojson":
+                features = densify.geojson_features(
+                    lat, lon, offsets, [{"row": n, "status": s} for n, s in zip(numbers, status[valid].tolist())])
+                if features:
+                    target.write((",\n" if written else "") + ",\n".join(features))
+                    written = True
+            else:
+                target.writelines(densify.kml_placemarks(lat, lon, offsets, numbers))
+            _count_status(status_counts, status)
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+        target.write(footer_text)
+
+    return _summary(rows, status_counts, time.perf_counter() - start)
+
+
+def _run_csv(input_path, output_path, compute, count, angle_columns, output_columns,
+             angle_format, chunk_size, delimiter, header, progress):
+    """
+    Boucle commune des traitements par lot : lecture d'un bloc, calcul, écriture.
+
+    compute reçoit les count colonnes d'entrée (float64) et retourne
+    (colonnes de sortie, status) ; les lignes illisibles reçoivent INVALID_INPUT.
+    """
+    delimiter = delimiter or detect_delimiter(input_path)
+    status_counts = {}
+    rows = 0
+    start = time.perf_counter()
+
+    with open(input_path, newline="", encoding="utf-8") as source, \
+            open(output_path, "w", newline="", encoding="utf-8") as target:
+        target.write(delimiter.join(output_columns) + "\n")
+        for chunk in read_chunks(source, delimiter, chunk_size, header):
+            columns, invalid = parse_columns(chunk, count, angle_columns, angle_format)
+            results, status = compute(*columns)
+            status[invalid] = BatchStatus.INVALID_INPUT
+
+            write_rows(target, results, status, delimiter)
+            _count_status(status_counts, status)
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+
+    return _summary(rows, status_counts, time.perf_counter() - start)
+
+
+def _count_status(status_counts, status):
+    """Cumule le nombre de lignes par code d'état"""
+    codes, counts = np.unique(status, return_counts=True)
+    for code, count in zip(codes.tolist(), counts.tolist()):
+        status_counts[code] = status_counts.get(code, 0) + count
+
+
+def _summary(rows, status_counts, seconds):
+    """Statistiques d'un traitement : lignes, erreurs, durée, débit et lignes par code d'état"""
+    return {
+        "rows": rows,
+        "errors": rows - status_counts.get(BatchStatus.OK, 0),
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds > 0 else math.inf,
+        "status_counts": dict(sorted(status_counts.items())),
+    }
+
+
+def print_summary(summary, stream=sys.stderr):
+    """Affiche le débit et la répartition des codes d'état d'un traitement"""
+    print(f"{summary['rows']} lignes en {summary['seconds']:.2f} s "
+          f"({summary['rows_per_second']:.0f} lignes/s), {summary['errors']} en erreur", file=stream)
+    for code, count in summary["status_counts"].items():
+        print(f"  état {code} ({BatchStatus.describe(code)}) : {count}", file=stream)
+
+
+def build_parser():
+    """Analyseur des arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Calculs géodésiques par lot sur fichiers CSV")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    direct = subparsers.add_parser("direct", help="Problème direct (phi1, lambda1, alpha12, S)")
+    direct.add_argument("input", help="Fichier CSV/TSV d'entrée")
+    direct.add_argument("output", help="Fichier de résultats")
+    direct.add_argument("--method", choices=DIRECT_METHODS, default="puissant")
+    _add_common_arguments(direct)
+
+    inverse = subparsers.add_parser("inverse", help="Problème inverse (phi1, lambda1, phi2, lambda2)")
+    inverse.add_argument("input", help="Fichier CSV/TSV d'entrée")
+    inverse.add_argument("output", help="Fichier de résultats")
+    inverse.add_argument("--method", choices=INVERSE_METHODS, default="gauss")
+    _add_common_arguments(inverse)
+
+    lines = subparsers.add_parser("lines", help="Géodésiques densifiées en GeoJSON/KML (phi1, lambda1, phi2, lambda2)")
+    lines.add_argument("input", help="Fichier CSV/TSV d'entrée")
+    lines.add_argument("output", help="Fichier .geojson ou .kml")
+    lines.add_argument("--method", choices=densify.DENSIFY_METHODS, default="vincenty")
+    lines.add_argument("--tolerance", type=float, default=densify.DEFAULT_TOLERANCE,
+                       help="Écart maximal au tracé de la géodésique, en mètres (0 pour l'ignorer)")
+    lines.add_argument("--spacing", type=float, help="Distance maximale entre deux sommets, en mètres")
+    lines.add_argument("--format", dest="output_format", choices=("geojson", "kml"),
+                       help="Format d'export (par défaut selon l'extension)")
+    _add_common_arguments(lines)
+    return parser
+
+
+def _add_common_arguments(parser):
+    """Options partagées par toutes les sous-commandes"""
+    parser.add_argument("--ellipsoid", default="Clarke 1880")
+    parser.add_argument("--angles", choices=("decimal", "dms"), default="decimal",
+                        help="Format des angles d'entrée")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--delimiter", help="Séparateur de colonnes (par défaut selon l'extension)")
+    parser.add_argument("--no-header", action="store_true",
+                        help="Le fichier d'entrée n'a pas de ligne d'en-tête")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "direct":
+        summary = run_direct_csv(args.input, args.output, args.method, args.ellipsoid, args.angles,
+                                 args.chunk_size, args.delimiter, not args.no_header)
+    elif args.command == "inverse":
+        summary = run_inverse_csv(args.input, args.output, args.method, args.ellipsoid, args.angles,
+                                  args.chunk_size, args.delimiter, not args.no_header)
+    else:
+        summary = run_lines_csv(args.input, args.output, args.method, args.ellipsoid, args.tolerance,
+                                args.spacing, args.output_format, args.angles, args.chunk_size,
+                                args.delimiter, not args.no_header)
+    print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+# batch_table.py
+"""
+Onglet « Lot » des pages des problèmes direct et inverse : lignes collées ou
+chargées depuis un fichier, calculées en arrière-plan (workers.py) et
+affichées dans un QTableView.
+
+Le modèle lit directement les colonnes NumPy des résultats : une cellule n'est
+mise en forme qu'au moment où elle est affichée ou copiée, sans objet par
+cellule, de sorte que la vue reste fluide avec un million de lignes.
+"""
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor, QKeySequence
+from PyQt5.QtWidgets import (QApplication, QFileDialog, QHBoxLayout, QHeaderView, QLabel,
+                             QPlainTextEdit, QPushButton, QShortcut, QTableView, QVBoxLayout,
+                             QWidget)
+from batch_runner import parse_columns
+from conversion_algorithms import DegreeConverter
+from utils import BatchStatus, split_fields
+from workers import DEFAULT_CHUNK_SIZE, Job, JobSlot
+
+
+# Séparateurs de champs acceptés (voir utils.split_fields), remplacés par des espaces
+_SEPARATORS_TO_SPACE = str.maketrans(",;\t", "   ")
+
+# Nombre maximal de lignes envoyées à la carte (au-delà, la page web ne suit plus)
+MAP_MAX_LINES = 50_000
+
+
+class ColumnTableModel(QAbstractTableModel):
+    """
+    Modèle de table sur des colonnes NumPy, remplies bloc par bloc (append).
+
+    Les colonnes sont allouées avec une capacité qui double à chaque
+    dépassement : l'ajout d'un bloc ne recopie pas tout le tableau.
+    La dernière colonne est le code BatchStatus de la ligne.
+    """
+
+    def __init__(self, headers, formats, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.formats = list(formats)
+        self.columns = None
+        self.rows = 0
+
+    def clear(self):
+        self.beginResetModel()
+        self.columns = None
+        self.rows = 0
+        self.endResetModel()
+
+    def append(self, chunk):
+        """Ajoute un bloc de lignes : une colonne (tableau) par en-tête"""
+        count = len(chunk[0])
+        if not count:
+            return
+        if self.columns is None:
+            self.columns = [np.empty(count, dtype=np.asarray(values).dtype) for values in chunk]
+        elif self.rows + count > len(self.columns[0]):
+            capacity = max(2 * len(self.columns[0]), self.rows + count)
+            self.columns = [np.concatenate((column[:self.rows], np.empty(capacity - self.rows, column.dtype)))
+                            for column in self.columns]
+        self.beginInsertRows(QModelIndex(), self.rows, self.rows + count - 1)
+        for column, values in zip(self.columns, chunk):
+            column[self.rows:self.rows + count] = values
+        self.rows += count
+        self.endInsertRows()
+
+    def column(self, j):
+        """Colonne j (vue sur les lignes remplies)"""
+        return self.columns[j][:self.rows] if self.columns is not None else np.empty(0)
+
+    @property
+    def status(self):
+        return self.column(len(self.headers) - 1)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            return self.formats[col] % self.columns[col][row]
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        code = int(self.columns[-1][row])
+        if role == Qt.ForegroundRole and code:
+            return QColor("#e74c3c")
+        if role == Qt.ToolTipRole and code:
+            return BatchStatus.describe(code)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+    def format_rows(self, rows, columns, delimiter="\t"):
+        """Texte des lignes rows (indices ou tranche) pour les colonnes demandées"""
+        line = delimiter.join(self.formats[j] for j in columns) + "\n"
+        return "".join(map(line.__mod__, zip(*(self.column(j)[rows].tolist() for j in columns))))
+
+
+def _is_header(row):
+    """Vrai si la première ligne collée est un en-tête (premier champ non numérique)"""
+    try:
+        DegreeConverter.parse_dms(row[0])
+        return False
+    except (ValueError, IndexError):
+        return True
+
+
+def parse_lines(lines, count, angle_columns):
+    """
+    Lit un bloc de lignes de texte en colonnes float64.
+
+    Chemin rapide : si chaque ligne a exactement count champs, tout le bloc
+    est converti par NumPy en une fois. Sinon, les lignes sont découpées une
+    à une (voir utils.split_fields) et lues en décimal, puis les lignes
+    illisibles sont relues en DMS.
+
+    Returns:
+        Tuple (colonnes, invalid) : voir batch_runner.parse_columns
+    """
+    text = "\n".join(lines).translate(_SEPARATORS_TO_SPACE)
+    if all(len(line.split()) == count for line in text.split("\n")):
+        try:
+            columns = np.array(text.split(), dtype=np.float64).reshape(len(lines), count).T.copy()
+            return columns, np.zeros(len(lines), dtype=bool)
+        except ValueError:
+            pass
+
+    rows = [split_fields(line) for line in lines]
+    columns, invalid = parse_columns(rows, count)
+    if invalid.any():
+        retry = np.flatnonzero(invalid)
+        columns[:, retry], invalid[retry] = parse_columns(
+            [rows[i] for i in retry], count, angle_columns, "dms")
+    return columns, invalid
+
+
+def run_batch(job, text, path, count, angle_columns, compute, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Fonction du Job de calcul d'un lot : lecture du texte collé ou du fichier,
+    puis calcul et livraison bloc par bloc (colonnes d'entrée, de sortie et
+    code d'état). Les lignes illisibles reçoivent INVALID_INPUT et des
+    résultats NaN.
+    """
+    if path is not None:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    lines = [line for line in text.splitlines() if line.strip()]
+    if lines and _is_header(split_fields(lines[0])):
+        del lines[0]
+
+    total = len(lines)
+    job.report_progress(0, total)
+    for start in range(0, total, chunk_size):
+        job.check_cancelled()
+        columns, invalid = parse_lines(lines[start:start + chunk_size], count, angle_columns)
+        *results, status = compute(*columns)
+        for values in results:
+            values[invalid] = np.nan
+        status[invalid] = BatchStatus.INVALID_INPUT
+        job.deliver(start, (*columns, *results, status))
+        job.report_progress(min(start + chunk_size, total), total)
+    return total
+
+
+def write_table(job, path, model_columns, formats, headers, delimiter, chunk_size=100_000):
+    """Fonction du Job d'export : écrit les colonnes par blocs dans un fichier délimité"""
+    total = len(model_columns[0])
+    line = delimiter.join(formats) + "\n"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write(delimiter.join(headers) + "\n")
+        for start in range(0, total, chunk_size):
+            job.check_cancelled()
+            f.write("".join(map(line.__mod__, zip(*(c[start:start + chunk_size].tolist()
+                                                    for c in model_columns)))))
+            job.report_progress(min(start + chunk_size, total), total)
+    return total
+
+
+class BatchPanel(QWidget):
+    """
+    Onglet de calcul par lot d'une page.
+
+    Args:
+        input_headers, output_headers: Noms des colonnes d'entrée et de sortie
+        formats: Formats % des colonnes d'entrée puis de sortie
+        angle_columns: Indices des colonnes d'entrée lues comme des angles (DMS accepté)
+        compute: compute(method, ellipsoid, *colonnes d'entrée) -> (*colonnes de sortie, status)
+        settings: Fonction retournant (méthode, ellipsoïde) choisis dans la page
+        line_columns: Colonnes (lat1, lon1, lat2, lon2) des lignes à afficher sur la carte
+        main_window: Fenêtre principale (avancement des calculs)
+        visualization: Carte de la page (GeodesicVisualization)
+    """
+
+    def __init__(self, input_headers, output_headers, formats, angle_columns, compute, settings,
+                 line_columns, main_window, visualization, parent=None):
+        super().__init__(parent)
+        self.input_headers = tuple(input_headers)
+        self.angle_columns = angle_columns
+        self.compute = compute
+        self.settings = settings
+        self.line_columns = line_columns
+        self.main_window = main_window
+        self.visualization = visualization
+        self.jobs = JobSlot()
+        self.export_jobs = JobSlot()
+        self.ellipsoid = None
+        self.model = ColumnTableModel((*input_headers, *output_headers, "status"), (*formats, "%d"), self)
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+
+        hint = QLabel(f"Une ligne par calcul : {', '.join(self.input_headers)} "
+                      "(séparés par des virgules, points-virgules, tabulations ou espaces ; "
+                      "angles en degrés décimaux ou DMS)")
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+
+        self.input_edit = QPlainTextEdit()
+        self.input_edit.setPlaceholderText("Coller les lignes ici, ou charger un fichier CSV/TSV")
+        self.input_edit.setMaximumHeight(120)
+        layout.addWidget(self.input_edit)
+
+        buttons = QHBoxLayout()
+        load_button = QPushButton("Charger un fichier…")
+        load_button.clicked.connect(self.load_file)
+        calc_button = QPushButton("Calculer le lot")
+        calc_button.clicked.connect(lambda: self.calculate(text=self.input_edit.toPlainText()))
+        buttons.addWidget(load_button)
+        buttons.addWidget(calc_button)
+        layout.addLayout(buttons)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setMinimumHeight(400)
+        # Hauteur de ligne fixe : la vue n'a pas à mesurer chaque ligne
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(24)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setDefaultSectionSize(130)
+        self.table.setStyleSheet("color: black; background-color: white;")
+        QShortcut(QKeySequence.Copy, self.table, self.copy_selection)
+        layout.addWidget(self.table)
+
+        actions = QHBoxLayout()
+        copy_button = QPushButton("Copier")
+        copy_button.setToolTip("Copie la sélection (ou tout le tableau) en texte tabulé")
+        copy_button.clicked.connect(self.copy_selection)
+        export_button = QPushButton("Exporter…")
+        export_button.clicked.connect(self.export)
+        map_button = QPushButton("Afficher sur la carte")
+        map_button.clicked.connect(self.show_on_map)
+        for button in (copy_button, export_button, map_button):
+            actions.addWidget(button)
+        layout.addLayout(actions)
+
+        self.setLayout(layout)
+
+    def load_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Charger des lignes", "",
+                                              "Fichiers délimités (*.csv *.tsv *.txt);;Tous les fichiers (*)")
+        if path:
+            self.calculate(path=path)
+
+    def calculate(self, text=None, path=None):
+        if not path and not (text or "").strip():
+            self.summary_label.setText("Aucune ligne à calculer")
+            return
+        method, self.ellipsoid = self.settings()
+
+        def compute(*columns):
+            return self.compute(method, self.ellipsoid, *columns)
+
+        self.model.clear()
+        self.summary_label.setText("Calcul en cours…")
+        job = Job(run_batch, text, path, len(self.input_headers), self.angle_columns, compute)
+        self.jobs.submit(job, self.show_summary, lambda message: self.summary_label.setText(f"Erreur: {message}"),
+                         on_batch=lambda start, chunk: self.model.append(chunk))
+        self.main_window.track_job(job)
+
+    def show_summary(self, total):
+        errors = int(np.count_nonzero(self.model.status))
+        self.summary_label.setText(f"{total} lignes calculées, {errors} en erreur")
+
+    def selected_rows_and_columns(self):
+        """Lignes et colonnes sélectionnées (tout le tableau si rien n'est sélectionné)"""
+        ranges = self.table.selectionModel().selection()
+        if ranges.isEmpty():
+            return slice(None), list(range(self.model.columnCount()))
+        rows = np.unique(np.concatenate([np.arange(r.top(), r.bottom() + 1) for r in ranges]))
+        columns = sorted({j for r in ranges for j in range(r.left(), r.right() + 1)})
+        return rows, columns
+
+    def copy_selection(self):
+        if not self.model.rows:
+            return
+        rows, columns = self.selected_rows_and_columns()
+        header = "\t".join(self.model.headers[j] for j in columns) + "\n"
+        QApplication.clipboard().setText(header + self.model.format_rows(rows, columns))
+
+    def export(self):
+        if not self.model.rows:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter les résultats", "",
+                                              "CSV (*.csv);;TSV (*.tsv)")
+        if not path:
+            return
+        delimiter = "\t" if path.lower().endswith((".tsv", ".tab")) else ","
+        columns = [self.model.column(j) for j in range(self.model.columnCount())]
+        job = Job(write_table, path, columns, self.model.formats, self.model.headers, delimiter)
+        self.export_jobs.submit(job, lambda total: self.summary_label.setText(f"{total} lignes exportées"),
+                                lambda message: self.summary_label.setText(f"Erreur: {message}"))
+        self.main_window.track_job(job)
+
+    def show_on_map(self):
+        if not self.model.rows:
+            return
+        # Lignes valides d'abord, puis limitées aux MAP_MAX_LINES premières
+        columns = [self.model.column(j) for j in self.line_columns]
+        ok = self.model.status == 0
+        for values in columns:
+            ok &= np.isfinite(values)
+        rows = np.flatnonzero(ok)
+        shown = rows[:MAP_MAX_LINES]
+        job = self.visualization.show_batch(*(values[shown] for values in columns), ellipsoid_name=self.ellipsoid)
+        if job is not None:
+            job.signals.failed.connect(lambda message: self.summary_label.setText(f"Erreur: {message}"))
+            self.main_window.track_job(job)
+        if len(rows) > MAP_MAX_LINES:
+            self.summary_label.setText(f"Carte : {MAP_MAX_LINES} premières lignes valides sur {len(rows)}")
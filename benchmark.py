@@ -0,0 +1,364 @@
+# benchmark.py
+"""
+Mesure des performances des calculateurs et des convertisseurs, sur des jeux
+de données synthétiques reproductibles (graine fixe) de 10^3 à 10^7 lignes.
+
+Chaque mesure porte sur un chemin :
+    scalar   appel de la fonction ponctuelle ligne par ligne (chemin de l'interface)
+    batch    appel de la version vectorisée, par blocs de block_rows lignes
+             (chemin des traitements par lot)
+
+Les résultats (ns/ligne, lignes/s) sont écrits en JSON avec le commit, la
+machine et les réglages de la mesure, pour comparer des mesures faites sur
+des commits ou des machines différents.
+
+Exemple :
+    python benchmark.py run --output mesures.json
+    python benchmark.py run --sizes 1000 100000 --filter gauss --filter rect_to_geo
+    python benchmark.py compare avant.json apres.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+from batch_runner import DEFAULT_CHUNK_SIZE, parse_columns
+from conversion_algorithms import AngleConverter, CoordinateConverter, DegreeConverter
+from gauss_calculator import GaussCalculator
+from puissant_calculator import PuissantCalculator
+from spherical_calculator import SphericalCalculator
+from vincenty_calculator import VincentyCalculator
+
+
+FORMAT_VERSION = 1
+
+DEFAULT_SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+DEFAULT_SEED = 20240101
+
+# Au-delà, les chemins ligne par ligne (plusieurs µs par ligne) ne sont pas mesurés
+SCALAR_MAX_ROWS = 100_000
+# Lecture de texte DMS : jeux de données limités pour la mémoire des chaînes
+TEXT_MAX_ROWS = 1_000_000
+# Taille des blocs des chemins vectorisés (mémoire des tableaux intermédiaires bornée)
+DEFAULT_BLOCK_ROWS = 1_000_000
+
+# Une mesure est répétée jusqu'à cumuler MIN_TIME secondes, au plus MAX_REPEATS fois
+DEFAULT_MIN_TIME = 0.5
+MAX_REPEATS = 1000
+
+
+def direct_dataset(rng, n):
+    """φ1, λ1, α12 (radians) et S (mètres, lignes courtes à moyennes, < 150 km)"""
+    return (np.radians(rng.uniform(-60.0, 60.0, n)), np.radians(rng.uniform(-180.0, 180.0, n)),
+            np.radians(rng.uniform(0.0, 360.0, n)), rng.uniform(1e3, 1.5e5, n))
+
+
+def inverse_dataset(rng, n):
+    """φ1, λ1, φ2, λ2 (radians), le second point à moins d'un degré du premier"""
+    phi1 = rng.uniform(-60.0, 60.0, n)
+    lambda1 = rng.uniform(-180.0, 180.0, n)
+    return (np.radians(phi1), np.radians(lambda1),
+            np.radians(phi1 + rng.uniform(-1.0, 1.0, n)), np.radians(lambda1 + rng.uniform(-1.0, 1.0, n)))
+
+
+def geo_dataset(rng, n):
+    """Latitude, longitude (degrés) et hauteur (mètres)"""
+    return rng.uniform(-90.0, 90.0, n), rng.uniform(-180.0, 180.0, n), rng.uniform(-100.0, 5000.0, n)
+
+
+def rect_dataset(rng, n, ellipsoid_name):
+    """X, Y, Z (mètres) des points de geo_dataset"""
+    return CoordinateConverter.geo_to_rect_batch(*geo_dataset(rng, n), ellipsoid_name)
+
+
+def angle_dataset(rng, n):
+    """Angles en degrés décimaux"""
+    return (rng.uniform(-360.0, 360.0, n),)
+
+
+def dms_dataset(rng, n):
+    """Degrés, minutes et secondes positifs"""
+    return (rng.integers(0, 90, n).astype(np.float64), rng.integers(0, 60, n).astype(np.float64),
+            rng.uniform(0.0, 60.0, n))
+
+
+def dms_text_dataset(rng, n):
+    """Angles DMS textuels avec hémisphère (« 33 30 44.2800 N »), une ligne CSV par angle"""
+    d, m, s = dms_dataset(rng, n)
+    hemispheres = np.where(rng.random(n) < 0.5, "N", "S").tolist()
+    return ([[f"{int(d_)} {int(m_)} {s_:.4f} {h}"] for d_, m_, s_, h in
+             zip(d.tolist(), m.tolist(), s.tolist(), hemispheres)],)
+
+
+DATASETS = {
+    "direct": direct_dataset,
+    "inverse": inverse_dataset,
+    "geo": geo_dataset,
+    "rect": rect_dataset,
+    "angle": angle_dataset,
+    "dms": dms_dataset,
+    "dms_text": dms_text_dataset,
+}
+
+
+def make_dataset(kind, n, seed, ellipsoid_name):
+    """Jeu de données reproductible : mêmes (kind, n, seed) -> mêmes valeurs"""
+    rng = np.random.default_rng([seed, n])
+    if kind == "rect":
+        return rect_dataset(rng, n, ellipsoid_name)
+    return DATASETS[kind](rng, n)
+
+
+def build_benchmarks(ellipsoid_name):
+    """
+    Liste des mesures : (nom, jeu de données, fonction ponctuelle, fonction
+    vectorisée, nombre maximal de lignes). Une fonction absente (None) n'a
+    pas de chemin correspondant.
+    """
+    spherical = SphericalCalculator(ellipsoid_name)
+    puissant = PuissantCalculator(ellipsoid_name)
+    gauss = GaussCalculator(ellipsoid_name)
+    vincenty = VincentyCalculator(ellipsoid_name)
+    benchmarks = [
+        ("spherical.direct", "direct", spherical.direct_problem, spherical.direct_problem_batch, None),
+        ("spherical.inverse", "inverse", spherical.inverse_problem, spherical.inverse_problem_batch, None),
+        ("puissant.direct", "direct", puissant.direct_problem, puissant.direct_problem_batch, None),
+        ("puissant.inverse", "inverse", puissant.inverse_problem, None, None),
+        ("gauss.inverse", "inverse", gauss.inverse_problem, gauss.inverse_problem_batch, None),
+        ("vincenty.direct", "direct", vincenty.direct_problem, vincenty.direct_problem_batch, None),
+        ("vincenty.inverse", "inverse", vincenty.inverse_problem, vincenty.inverse_problem_batch, None),
+        ("geo_to_rect", "geo",
+         lambda lat, lon, h: CoordinateConverter.geo_to_rect(lat, lon, h, ellipsoid_name),
+         lambda lat, lon, h: CoordinateConverter.geo_to_rect_batch(lat, lon, h, ellipsoid_name), None),
+    ]
+    for method in ("iterative", "vermeille", "bowring"):
+        benchmarks.append((
+            f"rect_to_geo.{method}", "rect",
+            lambda X, Y, Z, method=method: CoordinateConverter.rect_to_geo(X, Y, Z, ellipsoid_name, method=method),
+            lambda X, Y, Z, method=method: CoordinateConverter.rect_to_geo_batch(X, Y, Z, ellipsoid_name,
+                                                                                 method=method),
+            None))
+    benchmarks += [
+        ("angle.convert", "angle", lambda angle: AngleConverter.convert(angle, "Degrés", "Grades"), None, None),
+        ("dms.dd_to_dms", "angle", DegreeConverter.dd_to_dms, None, None),
+        ("dms.dms_to_dd", "dms", DegreeConverter.dms_to_dd, DegreeConverter.dms_to_dd, None),
+        ("coordinate.dd_to_dms", "angle", CoordinateConverter.dd_to_dms, None, None),
+        ("coordinate.dms_to_dd", "dms", CoordinateConverter.dms_to_dd, CoordinateConverter.dms_to_dd, None),
+        ("dms.parse", "dms_text", lambda row: DegreeConverter.parse_dms(row[0]),
+         lambda rows: parse_columns(rows, 1, (0,), "dms"), TEXT_MAX_ROWS),
+    ]
+    return benchmarks
+
+
+def time_call(function, min_time=DEFAULT_MIN_TIME, max_repeats=MAX_REPEATS):
+    """Durées (ns) d'appels répétés de function, jusqu'à cumuler min_time secondes"""
+    timings = []
+    while len(timings) < max_repeats and sum(timings) < min_time * 1e9:
+        start = time.perf_counter_ns()
+        function()
+        timings.append(time.perf_counter_ns() - start)
+    return timings
+
+
+def scalar_runner(function, columns):
+    """Appel de function ligne par ligne, sur des valeurs Python (comme depuis l'interface)"""
+    rows = list(zip(*(column.tolist() if isinstance(column, np.ndarray) else column for column in columns)))
+
+    def run():
+        for row in rows:
+            function(*row)
+    return run
+
+
+def block_runner(function, columns, block_rows):
+    """Appel de function par blocs de block_rows lignes"""
+    n = len(columns[0])
+
+    def run():
+        for start in range(0, n, block_rows):
+            function(*(column[start:start + block_rows] for column in columns))
+    return run
+
+
+def measure(name, path, rows, run, min_time):
+    """Mesure un chemin et retourne son enregistrement JSON"""
+    record = {"name": name, "path": path, "rows": rows}
+    try:
+        timings = time_call(run, min_time)
+    except Exception as e:
+        record["error"] = str(e) or type(e).__name__
+        return record
+    best = min(timings)
+    record.update({
+        "repeats": len(timings),
+        "best_s": best / 1e9,
+        "median_s": statistics.median(timings) / 1e9,
+        "ns_per_row": best / rows,
+        "rows_per_s": rows * 1e9 / best if best > 0 else math.inf,
+    })
+    return record
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, seed=DEFAULT_SEED, ellipsoid_name="Clarke 1880", filters=(),
+                   scalar_max_rows=SCALAR_MAX_ROWS, block_rows=DEFAULT_BLOCK_ROWS, min_time=DEFAULT_MIN_TIME,
+                   stream=None):
+    """
+    Exécute toutes les mesures (ou celles dont le nom contient l'un des filtres)
+    pour chaque taille de jeu de données.
+
+    :param stream: Flux où afficher chaque mesure au fil de l'eau (aucun affichage si None)
+    :return: Document JSON des résultats (voir describe_run)
+    """
+    benchmarks = [benchmark for benchmark in build_benchmarks(ellipsoid_name)
+                  if not filters or any(pattern in benchmark[0] for pattern in filters)]
+    results = []
+    for n in sorted(sizes):
+        datasets = {}
+        for name, kind, scalar, batch, max_rows in benchmarks:
+            if max_rows is not None and n > max_rows:
+                continue
+            if kind not in datasets:
+                datasets[kind] = make_dataset(kind, n, seed, ellipsoid_name)
+            columns = datasets[kind]
+            paths = []
+            if scalar is not None and n <= scalar_max_rows:
+                paths.append(("scalar", scalar_runner(scalar, columns)))
+            if batch is not None:
+                paths.append(("batch", block_runner(batch, columns, block_rows)))
+            for path, run in paths:
+                record = measure(name, path, n, run, min_time)
+                results.append(record)
+                if stream is not None:
+                    print(format_record(record), file=stream, flush=True)
+        del datasets
+    return describe_run(results, {
+        "sizes": sorted(sizes), "seed": seed, "ellipsoid": ellipsoid_name, "filters": list(filters),
+        "scalar_max_rows": scalar_max_rows, "text_max_rows": TEXT_MAX_ROWS, "block_rows": block_rows,
+        "dms_parse_chunk_rows": DEFAULT_CHUNK_SIZE, "min_time_s": min_time,
+    })
+
+
+def git_revision():
+    """Commit courant du dépôt et présence de modifications non validées, ou (None, None)"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=directory, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directory,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def describe_run(results, settings):
+    """Document JSON d'une exécution : contexte (commit, machine, réglages) et mesures"""
+    commit, dirty = git_revision()
+    return {
+        "format": "geotools-benchmark",
+        "version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "dirty": dirty,
+        "machine": {
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+        },
+        "settings": settings,
+        "results": results,
+    }
+
+
+def format_record(record):
+    """Ligne de texte d'une mesure"""
+    label = f"{record['name']:<22} {record['path']:<6} {record['rows']:>10}"
+    if "error" in record:
+        return f"{label}  erreur : {record['error']}"
+    return f"{label}  {record['ns_per_row']:>12.1f} ns/ligne  {record['rows_per_s']:>14,.0f} lignes/s"
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as handle:
+        document = json.load(handle)
+    if document.get("format") != "geotools-benchmark":
+        raise ValueError(f"Fichier de mesures invalide : {path}")
+    return document
+
+
+def compare_results(base, current):
+    """
+    Compare deux documents de mesures sur les mesures communes (nom, chemin, lignes).
+
+    :return: Liste de (nom, chemin, lignes, ns/ligne de base, ns/ligne courant, accélération)
+    """
+    base_index = {(r["name"], r["path"], r["rows"]): r for r in base["results"] if "error" not in r}
+    rows = []
+    for record in current["results"]:
+        key = (record["name"], record["path"], record["rows"])
+        if "error" in record or key not in base_index:
+            continue
+        before, after = base_index[key]["ns_per_row"], record["ns_per_row"]
+        rows.append((*key, before, after, before / after if after > 0 else math.inf))
+    return rows
+
+
+def build_parser():
+    """Analyseur des arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Mesure des performances des calculateurs et convertisseurs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Exécute les mesures et écrit les résultats en JSON")
+    run.add_argument("--output", "-o", help="Fichier JSON des résultats (par défaut, sortie standard)")
+    run.add_argument("--sizes", type=lambda text: int(float(text)), nargs="+", default=list(DEFAULT_SIZES),
+                     help="Nombres de lignes des jeux de données (ex. 1e3 1e6)")
+    run.add_argument("--filter", dest="filters", action="append", default=[],
+                     help="Ne mesurer que les noms contenant ce texte (option répétable)")
+    run.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run.add_argument("--ellipsoid", default="Clarke 1880")
+    run.add_argument("--scalar-max-rows", type=int, default=SCALAR_MAX_ROWS,
+                     help="Nombre maximal de lignes des mesures ligne par ligne")
+    run.add_argument("--block-rows", type=int, default=DEFAULT_BLOCK_ROWS,
+                     help="Taille des blocs des mesures vectorisées")
+    run.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                     help="Durée cumulée minimale de chaque mesure, en secondes")
+
+    compare = subparsers.add_parser("compare", help="Compare deux fichiers de mesures")
+    compare.add_argument("base", help="Mesures de référence (JSON)")
+    compare.add_argument("current", help="Mesures à comparer (JSON)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "compare":
+        base, current = load_results(args.base), load_results(args.current)
+        print(f"base : {base['commit'] or '?'} ({base['machine']['platform']})")
+        print(f"courant : {current['commit'] or '?'} ({current['machine']['platform']})")
+        for name, path, rows, before, after, speedup in compare_results(base, current):
+            print(f"{name:<22} {path:<6} {rows:>10}  {before:>12.1f} -> {after:>12.1f} ns/ligne  x{speedup:.2f}")
+        return 0
+
+    document = run_benchmarks(args.sizes, args.seed, args.ellipsoid, args.filters, args.scalar_max_rows,
+                              args.block_rows, args.min_time, stream=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(document, handle, indent=2)
+            handle.write("\n")
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# calculator_factory.py
+import numpy as np
+from ellipsoid import get_ellipsoid
+from utils import BatchStatus
+from spherical_calculator import SphericalCalculator
+from puissant_calculator import PuissantCalculator
+from gauss_calculator import GaussCalculator
+from vincenty_calculator import VincentyCalculator
+
+
+# Méthodes de calcul disponibles
+CALCULATOR_CLASSES = {
+    "spherical": SphericalCalculator,
+    "puissant": PuissantCalculator,
+    "gauss": GaussCalculator,
+    "vincenty": VincentyCalculator,
+}
+
+# Méthodes disponibles pour chaque problème
+DIRECT_METHODS = ("spherical", "puissant", "vincenty")
+INVERSE_METHODS = ("spherical", "gauss", "vincenty")
+
+# Instances déjà construites, indexées par (méthode, nom de l'ellipsoïde)
+_INSTANCES = {}
+
+
+def get_calculator(method, ellipsoid_name="Clarke 1880"):
+    """
+    Retourne le calculateur de la méthode demandée pour cet ellipsoïde.
+
+    Chaque couple (méthode, ellipsoïde) n'est construit qu'une seule fois :
+    les appels suivants, depuis l'interface comme depuis les traitements par
+    lot, réutilisent la même instance et ses constantes déjà calculées.
+
+    Args:
+        method: "spherical", "puissant", "gauss" ou "vincenty"
+        ellipsoid_name: Nom (ou alias) d'un ellipsoïde enregistré
+
+    Raises:
+        ValueError si la méthode ou l'ellipsoïde est inconnu
+    """
+    key = (method, ellipsoid_name)
+    calculator = _INSTANCES.get(key)
+    if calculator is None:
+        try:
+            calculator_class = CALCULATOR_CLASSES[method]
+        except KeyError:
+            raise ValueError(f"Méthode de calcul inconnue : {method}") from None
+
+        # Les alias d'un même ellipsoïde partagent la même instance
+        canonical_key = (method, get_ellipsoid(ellipsoid_name).name)
+        calculator = _INSTANCES.get(canonical_key)
+        if calculator is None:
+            calculator = calculator_class(canonical_key[1])
+            _INSTANCES[canonical_key] = calculator
+        _INSTANCES[key] = calculator
+    return calculator
+
+
+def clear_calculator_cache():
+    """Vide le cache des calculateurs (après l'enregistrement d'un ellipsoïde par exemple)"""
+    _INSTANCES.clear()
+
+
+def _with_status(results):
+    """
+    Ramène le résultat d'un calcul par lot à (r1, r2, r3, status) : les méthodes
+    sans contrôle propre (Puissant) reçoivent un état nul, et toute ligne non
+    finie est signalée quelle que soit la méthode.
+    """
+    r1, r2, r3 = results[:3]
+    status = results[3] if len(results) > 3 else np.zeros(np.shape(r1), dtype=np.uint8)
+    status[~(np.isfinite(r1) & np.isfinite(r2) & np.isfinite(r3))] |= BatchStatus.NON_FINITE
+    return r1, r2, r3, status
+
+
+def direct_batch(method, ellipsoid_name, phi1, lambda1, alpha12, s):
+    """
+    Problème direct par lot avec le calculateur mis en cache de la méthode
+
+    Returns:
+        Tuple (phi2, lambda2, alpha21, status) de tableaux (radians, codes BatchStatus)
+    """
+    if method not in DIRECT_METHODS:
+        raise ValueError(f"Méthode inconnue pour le problème direct : {method}")
+    calculator = get_calculator(method, ellipsoid_name)
+    return _with_status(calculator.direct_problem_batch(phi1, lambda1, alpha12, s))
+
+
+def inverse_batch(method, ellipsoid_name, phi1, lambda1, phi2, lambda2):
+    """
+    Problème inverse par lot avec le calculateur mis en cache de la méthode
+
+    Returns:
+        Tuple (s, alpha12, alpha21, status) de tableaux (mètres, radians, codes BatchStatus)
+    """
+    if method not in INVERSE_METHODS:
+        raise ValueError(f"Méthode inconnue pour le problème inverse : {method}")
+    calculator = get_calculator(method, ellipsoid_name)
+    return _with_status(calculator.inverse_problem_batch(phi1, lambda1, phi2, lambda2))
@@ -1,18 +1,33 @@
 import math
+import re
+import numpy as np
+from ellipsoid import get_ellipsoid
+
+
+# Types structurés des tampons de points (float64)
+GEO_POINT_DTYPE = np.dtype([("lat", np.float64), ("lon", np.float64), ("h", np.float64)])
+RECT_POINT_DTYPE = np.dtype([("X", np.float64), ("Y", np.float64), ("Z", np.float64)])
+
+# Méthodes disponibles pour la conversion rectangulaire → géographique
+RECT_TO_GEO_METHODS = ("iterative", "vermeille", "bowring")
+
+# Angle DMS textuel : signe ou hémisphère facultatifs, puis 1 à 3 nombres séparés
+# par des espaces, « : » ou les symboles ° ' " (ex. -33:30:44.28, 7°37'26.76" O).
+# Un « s » collé aux secondes (0s) les marque ; isolé en fin de texte, c'est le Sud.
+_DMS_PATTERN = re.compile(
+    r"""^\s*([NSEWOnsewo])?\s*([+-])?\s*(\d+(?:\.\d*)?)(?:[°d:\s]+(\d+(?:\.\d*)?))?"""
+    r"""(?:['′m:\s]+(\d+(?:\.\d*)?))?\s*(?:["″]|''|(?<=\d)s)?\s*([NSEWOnsewo])?\s*$"""
+)
 
 
 class EllipsoidData:
     @staticmethod
     def get_ellipsoid_params(ellipsoid_name):
-        ellipsoids = {
-            "Clark 1880": {"a": 6378249.145, "f": 1 / 293.4663},
-            "WGS84": {"a": 6378137.0, "f": 1 / 298.257223563},
-            "GRS80": {"a": 6378137.0, "f": 1 / 298.257222101}
-        }
-        params = ellipsoids.get(ellipsoid_name)
-        if params:
-            params["e_squared"] = 2 * params["f"] - params["f"] ** 2
-        return params
+        """Retourne l'ellipsoïde enregistré (voir ellipsoid.py), ou None s'il est inconnu"""
+        try:
+            return get_ellipsoid(ellipsoid_name)
+        except ValueError:
+            return None
 class CoordinateConverter:
     @staticmethod
     def dms_to_dd(degrees, minutes, seconds):
@@ -31,7 +46,7 @@ class CoordinateConverter:
         if not params:
             raise ValueError(f"Ellipsoïde non reconnu : {ellipsoid_name}")
 
-        a, e_squared = params["a"], params["e_squared"]
+        a, e_squared = params.a, params.e_squared
 
         lat_rad, lon_rad = math.radians(lat), math.radians(lon)
         sin_lat = math.sin(lat_rad)
@@ -48,7 +63,86 @@ class CoordinateConverter:
         return X, Y, Z
 
     @staticmethod
-    def rect_to_geo(X, Y, Z, ellipsoid_name, precision=1e-10):
+    def geo_to_rect_batch(lat, lon, h, ellipsoid_name, out=None):
+        """
+        Version vectorisée de geo_to_rect sur des tableaux NumPy.
+
+        Les paramètres de l'ellipsoïde sont lus une seule fois pour tout le lot
+        et les calculs intermédiaires réutilisent les tableaux de sortie.
+
+        :param lat, lon: Tableaux (ou scalaires) des latitudes et longitudes en degrés décimaux
+        :param h: Tableau (ou scalaire) des hauteurs ellipsoïdales en mètres
+        :param ellipsoid_name: Nom de l'ellipsoïde de référence
+        :param out: Tableaux de sortie fournis par l'appelant, soit un tuple
+                    (X, Y, Z), soit un tableau structuré de type RECT_POINT_DTYPE.
+                    Ils ne doivent pas partager leur mémoire avec les entrées.
+        :return: Tuple (X, Y, Z) de tableaux en mètres
+        """
+        params = EllipsoidData.get_ellipsoid_params(ellipsoid_name)
+        if not params:
+            raise ValueError(f"Ellipsoïde non reconnu : {ellipsoid_name}")
+
+        a, e_squared = params.a, params.e_squared
+
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        h = np.asarray(h, dtype=np.float64)
+        shape = np.broadcast_shapes(lat.shape, lon.shape, h.shape)
+
+        if out is None:
+            X, Y, Z = np.empty(shape), np.empty(shape), np.empty(shape)
+        elif isinstance(out, np.ndarray) and out.dtype.names:
+            X, Y, Z = out["X"], out["Y"], out["Z"]
+        else:
+            X, Y, Z = out
+
+        # Tableaux de travail à la forme commune des entrées (latitude ou hauteur scalaire)
+        lat_rad = np.radians(lat, out=np.empty(shape))
+        sin_lat = np.sin(lat_rad, out=np.empty(shape))
+        cos_lat = np.cos(lat_rad, out=lat_rad)
+
+        # N = a / sqrt(1 - e² sin²φ), calculé en place
+        N = np.square(sin_lat, out=np.empty(shape))
+        N *= -e_squared
+        N += 1
+        np.sqrt(N, out=N)
+        np.divide(a, N, out=N)
+
+        # Z = (N(1 - e²) + h) sin φ
+        np.multiply(N, params.one_minus_e_squared, out=Z)
+        Z += h
+        Z *= sin_lat
+
+        # (N + h) cos φ, partagé par X et Y
+        N += h
+        N *= cos_lat
+
+        lon_rad = np.radians(lon)
+        np.cos(lon_rad, out=X)
+        X *= N
+        np.sin(lon_rad, out=Y)
+        Y *= N
+
+        return X, Y, Z
+
+    @staticmethod
+    def geo_to_rect_points(points, ellipsoid_name, out=None):
+        """
+        Convertit un tableau structuré de points géographiques (champs lat, lon, h,
+        voir GEO_POINT_DTYPE) en coordonnées rectangulaires.
+
+        :param out: Tableau structuré RECT_POINT_DTYPE (ou tuple X, Y, Z) à remplir ;
+                    alloué si absent
+        :return: Le tableau structuré (ou le tuple) de sortie
+        """
+        if out is None:
+            out = np.empty(points.shape, dtype=RECT_POINT_DTYPE)
+        CoordinateConverter.geo_to_rect_batch(points["lat"], points["lon"], points["h"],
+                                              ellipsoid_name, out=out)
+        return out
+
+    @staticmethod
+    def rect_to_geo(X, Y, Z, ellipsoid_name, precision=1e-10, method="iterative"):
         """
         Convertit les coordonnées rectangulaires (X, Y, Z) en coordonnées géographiques
         en suivant strictement la démarche présentée dans le cours.
@@ -56,10 +150,23 @@ class CoordinateConverter:
         :param X, Y, Z: Coordonnées rectangulaires en mètres
         :param ellipsoid_name: Nom de l'ellipsoïde de référence
         :param precision: Précision souhaitée pour le calcul itératif
+        :param method: "iterative" (démarche du cours), ou l'une des méthodes
+                       directes à coût fixe "vermeille" ou "bowring"
         :return: Tuple (latitude, longitude, hauteur)
         """
         params = EllipsoidData.get_ellipsoid_params(ellipsoid_name)
-        a, e_squared = params["a"], params["e_squared"]
+        if not params:
+            raise ValueError(f"Ellipsoïde non reconnu : {ellipsoid_name}")
+        a, e_squared = params.a, params.e_squared
+
+        if method == "vermeille":
+            phi, lon, h = CoordinateConverter._vermeille(X, Y, Z, params)
+            return math.degrees(phi), math.degrees(lon), h
+        if method == "bowring":
+            phi, lon, h = CoordinateConverter._bowring(X, Y, Z, params)
+            return math.degrees(phi), math.degrees(lon), h
+        if method != "iterative":
+            raise ValueError(f"Méthode de conversion inconnue : {method}")
 
         # Calcul de la longitude
         lon = math.atan2(Y, X)
@@ -102,6 +209,221 @@ class CoordinateConverter:
 
         return lat, lon, h
 
+    @staticmethod
+    def _vermeille(X, Y, Z, ellipsoid):
+        """
+        Solution exacte non itérative de Vermeille (2004), valable pour tout point
+        situé à plus d'une quarantaine de kilomètres du centre de l'ellipsoïde.
+        Retourne (φ, λ) en radians et h en mètres.
+        """
+        a, e_squared = ellipsoid.a, ellipsoid.e_squared
+        e4 = e_squared ** 2
+        rho_squared = X ** 2 + Y ** 2
+        p = rho_squared / a ** 2
+        q = ellipsoid.one_minus_e_squared / a ** 2 * Z ** 2
+        r = (p + q - e4) / 6
+        s = e4 * p * q / (4 * r ** 3)
+        t = (1 + s + math.sqrt(s * (2 + s))) ** (1 / 3)
+        u = r * (1 + t + 1 / t)
+        v = math.sqrt(u ** 2 + e4 * q)
+        w = e_squared * (u + v - q) / (2 * v)
+        k = math.sqrt(u + v + w ** 2) - w
+        D = k * math.sqrt(rho_squared) / (k + e_squared)
+        D_Z = math.hypot(D, Z)
+
+        phi = 2 * math.atan2(Z, D + D_Z)
+        lon = math.atan2(Y, X)
+        h = (k + e_squared - 1) / k * D_Z
+        return phi, lon, h
+
+    @staticmethod
+    def _vermeille_batch(X, Y, Z, ellipsoid):
+        """Version vectorisée de _vermeille"""
+        a, e_squared = ellipsoid.a, ellipsoid.e_squared
+        e4 = e_squared ** 2
+        rho_squared = X ** 2 + Y ** 2
+        p = rho_squared / a ** 2
+        q = ellipsoid.one_minus_e_squared / a ** 2 * Z ** 2
+        r = (p + q - e4) / 6
+        s = e4 * p * q / (4 * r ** 3)
+        t = np.cbrt(1 + s + np.sqrt(s * (2 + s)))
+        u = r * (1 + t + 1 / t)
+        v = np.sqrt(u ** 2 + e4 * q)
+        w = e_squared * (u + v - q) / (2 * v)
+        k = np.sqrt(u + v + w ** 2) - w
+        D = k * np.sqrt(rho_squared) / (k + e_squared)
+        D_Z = np.hypot(D, Z)
+
+        phi = 2 * np.arctan2(Z, D + D_Z)
+        lon = np.arctan2(Y, X)
+        h = (k + e_squared - 1) / k * D_Z
+        return phi, lon, h
+
+    @staticmethod
+    def _bowring(X, Y, Z, ellipsoid):
+        """
+        Formule directe de Bowring (1976) en une seule étape, à partir de la
+        latitude paramétrique. Retourne (φ, λ) en radians et h en mètres.
+        """
+        a, b, e_squared = ellipsoid.a, ellipsoid.b, ellipsoid.e_squared
+        e_prime_squared = ellipsoid.e_prime_squared
+        p = math.hypot(X, Y)
+        theta = math.atan2(Z * a, p * b)
+
+        phi = math.atan2(Z + e_prime_squared * b * math.sin(theta) ** 3,
+                         p - e_squared * a * math.cos(theta) ** 3)
+        lon = math.atan2(Y, X)
+        sin_phi = math.sin(phi)
+        h = p * math.cos(phi) + Z * sin_phi - a * math.sqrt(1 - e_squared * sin_phi ** 2)
+        return phi, lon, h
+
+    @staticmethod
+    def _bowring_batch(X, Y, Z, ellipsoid):
+        """Version vectorisée de _bowring"""
+        a, b, e_squared = ellipsoid.a, ellipsoid.b, ellipsoid.e_squared
+        e_prime_squared = ellipsoid.e_prime_squared
+        p = np.hypot(X, Y)
+        theta = np.arctan2(Z * a, p * b)
+
+        phi = np.arctan2(Z + e_prime_squared * b * np.sin(theta) ** 3,
+                         p - e_squared * a * np.cos(theta) ** 3)
+        lon = np.arctan2(Y, X)
+        sin_phi = np.sin(phi)
+        h = p * np.cos(phi) + Z * sin_phi - a * np.sqrt(1 - e_squared * sin_phi ** 2)
+        return phi, lon, h
+
+    @staticmethod
+    def rect_to_geo_batch(X, Y, Z, ellipsoid_name, iterations=5, out=None, method="iterative"):
+        """
+        Version vectorisée de rect_to_geo sur des tableaux NumPy.
+
+        Reprend la démarche itérative du cours, mais avec un nombre fixe
+        d'itérations appliqué à toutes les lignes à la fois au lieu d'une boucle
+        ouverte par point. Chaque itération divise l'écart en latitude par
+        environ 1/e² ; avec la valeur par défaut (5 itérations) le résidu reste
+        sous 1e-13 rad de -5 km jusqu'à l'orbite géostationnaire, bien en deçà
+        de la précision 1e-10 rad de la version scalaire.
+
+        La hauteur est calculée par h = p·cos φ + Z·sin φ - a·sqrt(1 - e² sin²φ),
+        équivalente à p / cos φ - N mais définie aussi aux pôles.
+
+        :param X, Y, Z: Tableaux de coordonnées rectangulaires en mètres
+        :param ellipsoid_name: Nom de l'ellipsoïde de référence
+        :param iterations: Nombre d'itérations de raffinement de la latitude
+        :param out: Tableaux de sortie fournis par l'appelant, soit un tuple
+                    (lat, lon, h), soit un tableau structuré de type GEO_POINT_DTYPE
+        :param method: "iterative", "vermeille" ou "bowring" (voir rect_to_geo)
+        :return: Tuple (lat, lon, h, residual) : latitudes et longitudes en degrés,
+                 hauteurs en mètres, et écart |φ_k - φ_(k-1)| de la dernière
+                 itération en radians (nul pour les méthodes directes)
+        """
+        params = EllipsoidData.get_ellipsoid_params(ellipsoid_name)
+        if not params:
+            raise ValueError(f"Ellipsoïde non reconnu : {ellipsoid_name}")
+        if method not in RECT_TO_GEO_METHODS:
+            raise ValueError(f"Méthode de conversion inconnue : {method}")
+        if iterations < 1:
+            raise ValueError("Le nombre d'itérations doit être au moins égal à 1")
+
+        a, e_squared = params.a, params.e_squared
+
+        X = np.asarray(X, dtype=np.float64)
+        Y = np.asarray(Y, dtype=np.float64)
+        Z = np.asarray(Z, dtype=np.float64)
+        shape = np.broadcast_shapes(X.shape, Y.shape, Z.shape)
+
+        if out is None:
+            lat, lon, h = np.empty(shape), np.empty(shape), np.empty(shape)
+        elif isinstance(out, np.ndarray) and out.dtype.names:
+            lat, lon, h = out["lat"], out["lon"], out["h"]
+        else:
+            lat, lon, h = out
+
+        if method != "iterative":
+            closed_form = (CoordinateConverter._vermeille_batch if method == "vermeille"
+                           else CoordinateConverter._bowring_batch)
+            phi, lon[...], h[...] = closed_form(X, Y, Z, params)
+            np.degrees(phi, out=lat)
+            np.degrees(lon, out=lon)
+            return lat, lon, h, np.zeros(shape)
+
+        # Longitude
+        np.arctan2(Y, X, out=lon)
+
+        p = np.hypot(X, Y)
+
+        # Étape 0
+        phi = np.arctan2(Z / params.one_minus_e_squared, p)
+
+        # Étapes itératives : Z_i = Z + N·e²·sin φ, tg φ = Z_i / p
+        residual = np.empty(shape)
+        for _ in range(iterations):
+            sin_phi = np.sin(phi)
+            N_e_squared_sin = a * e_squared * sin_phi / np.sqrt(1 - e_squared * sin_phi ** 2)
+            phi_i = np.arctan2(Z + N_e_squared_sin, p)
+            np.subtract(phi_i, phi, out=residual)
+            phi = phi_i
+        np.abs(residual, out=residual)
+
+        # Hauteur ellipsoïdale
+        sin_phi = np.sin(phi)
+        np.multiply(p, np.cos(phi), out=h)
+        h += Z * sin_phi
+        h -= a * np.sqrt(1 - e_squared * sin_phi ** 2)
+
+        # Conversion en degrés
+        np.degrees(phi, out=lat)
+        np.degrees(lon, out=lon)
+
+        return lat, lon, h, residual
+
+    @staticmethod
+    def rect_to_geo_accuracy_report(ellipsoid_name, method, n=100000, seed=0,
+                                    heights=(-5000.0, 0.0, 1000.0, 10000.0, 1e6, 3.6e7)):
+        """
+        Compare une méthode directe ("vermeille" ou "bowring") à la démarche
+        itérative du cours sur un jeu de points synthétiques reproductible.
+
+        Les points sont tirés uniformément en latitude et longitude, pour chaque
+        hauteur de `heights`, puis convertis en X, Y, Z par geo_to_rect_batch.
+
+        :return: Dictionnaire {hauteur: {"lat_rad", "lon_rad", "h_m"}} donnant
+                 l'écart absolu maximal entre les deux méthodes pour chaque hauteur
+        """
+        rng = np.random.default_rng(seed)
+        report = {}
+        for height in heights:
+            lat = rng.uniform(-90.0, 90.0, n)
+            lon = rng.uniform(-180.0, 180.0, n)
+            X, Y, Z = CoordinateConverter.geo_to_rect_batch(lat, lon, height, ellipsoid_name)
+
+            reference = CoordinateConverter.rect_to_geo_batch(X, Y, Z, ellipsoid_name)
+            candidate = CoordinateConverter.rect_to_geo_batch(X, Y, Z, ellipsoid_name, method=method)
+            report[height] = {
+                "lat_rad": float(np.max(np.abs(np.radians(candidate[0] - reference[0])))),
+                "lon_rad": float(np.max(np.abs(np.radians(candidate[1] - reference[1])))),
+                "h_m": float(np.max(np.abs(candidate[2] - reference[2]))),
+            }
+        return report
+
+    @staticmethod
+    def rect_to_geo_points(points, ellipsoid_name, iterations=5, out=None, method="iterative"):
+        """
+        Convertit un tableau structuré de points rectangulaires (champs X, Y, Z,
+        voir RECT_POINT_DTYPE) en coordonnées géographiques.
+
+        :param out: Tableau structuré GEO_POINT_DTYPE (ou tuple lat, lon, h) à
+                    remplir ; alloué si absent
+        :param method: "iterative", "vermeille" ou "bowring" (voir rect_to_geo)
+        :return: Tuple (out, residual)
+        """
+        if out is None:
+            out = np.empty(points.shape, dtype=GEO_POINT_DTYPE)
+        residual = CoordinateConverter.rect_to_geo_batch(points["X"], points["Y"], points["Z"],
+                                                         ellipsoid_name, iterations, out=out,
+                                                         method=method)[3]
+        return out, residual
+
 class AngleConverter:
     @staticmethod
     def convert(angle, from_unit, to_unit):
@@ -135,4 +457,28 @@ class DegreeConverter:
 
     @staticmethod
     def dms_to_dd(d, m, s):
-        return d + m / 60 + s / 3600
\ No newline at end of file
+        return d + m / 60 + s / 3600
+
+    @staticmethod
+    def parse_dms(text):
+        """
+        Convertit un angle DMS textuel en degrés décimaux.
+
+        Formats acceptés : "33 30 44.28", "-33:30:44.28", "33°30'44.28\"S",
+        "W 7 37 26.76", "33 30 0 s"... Les hémisphères S, W et O donnent un
+        angle négatif ; un signe et un hémisphère ne peuvent pas être combinés.
+
+        :raises ValueError: si le texte n'est pas un angle DMS valide
+        """
+        match = _DMS_PATTERN.match(text)
+        if not match:
+            raise ValueError(f"Angle DMS invalide : {text!r}")
+        prefix, sign, d, m, s, suffix = match.groups()
+        # Un seul hémisphère, et jamais en plus d'un signe
+        if (prefix and suffix) or (sign and (prefix or suffix)):
+            raise ValueError(f"Angle DMS invalide : {text!r}")
+        value = DegreeConverter.dms_to_dd(float(d), float(m or 0), float(s or 0))
+        hemisphere = (prefix or suffix or "").upper()
+        if sign == "-" or hemisphere in ("S", "W", "O"):
+            value = -value
+        return value
@@ -1,8 +1,68 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QRadioButton, QPushButton, QTextEdit, \
-    QTabWidget, QComboBox, QGridLayout, QGroupBox, QFormLayout, QApplication, QMainWindow
+    QTabWidget, QComboBox, QGridLayout, QGroupBox, QFormLayout, QApplication, QMainWindow, QFileDialog, QProgressBar
 from PyQt5.QtGui import QDoubleValidator, QFont, QPalette, QColor
-from PyQt5.QtCore import Qt, QLocale
-from conversion_algorithms import CoordinateConverter
+from PyQt5.QtCore import Qt, QLocale, pyqtSignal
+import os
+import time
+import numpy as np
+from conversion_algorithms import CoordinateConverter, RECT_TO_GEO_METHODS
+from ellipsoid import get_ellipsoid
+from point_file import iter_convert_csv, iter_convert_file, read_header
+from workers import Job, JobSlot
+
+
+def convert_job(job, conversion, *args):
+    """Conversion exécutée hors du thread de l'interface"""
+    return conversion(*args)
+
+
+def convert_blocks(job, blocks):
+    """
+    Conversion d'un fichier hors du thread de l'interface : parcourt les blocs
+    (point_file.ConversionProgress) produits par iter_convert_file ou
+    iter_convert_csv (chacun déjà écrit sur le disque) et livre après chaque bloc le débit et les résidus
+    extrêmes du calcul itératif.
+    """
+    start = time.perf_counter()
+    stats = {"points": 0, "seconds": 0.0, "residual_min": None, "residual_max": None}
+    try:
+        for step in blocks:
+            if step.residual is not None:
+                residual = step.residual[np.isfinite(step.residual)]
+                if residual.size:
+                    low, high = float(residual.min()), float(residual.max())
+                    stats["residual_min"] = low if stats["residual_min"] is None else min(stats["residual_min"], low)
+                    stats["residual_max"] = high if stats["residual_max"] is None else max(stats["residual_max"], high)
+            stats["points"] = step.points
+            stats["seconds"] = time.perf_counter() - start
+            job.deliver(step.points, dict(stats))
+            job.report_progress(int(1000 * step.progress / step.total) if step.total else 1000, 1000)
+            job.check_cancelled()
+    finally:
+        blocks.close()
+    return stats
+
+
+class FileDropArea(QLabel):
+    """Zone acceptant le dépôt d'un fichier (glisser-déposer)"""
+    file_dropped = pyqtSignal(str)
+
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+        self.setAcceptDrops(True)
+        self.setAlignment(Qt.AlignCenter)
+        self.setWordWrap(True)
+        self.setMinimumHeight(100)
+        self.setStyleSheet("border: 2px dashed #3498db; border-radius: 8px; padding: 10px;")
+
+    def dragEnterEvent(self, event):
+        urls = event.mimeData().urls()
+        if urls and urls[0].isLocalFile():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        self.file_dropped.emit(event.mimeData().urls()[0].toLocalFile())
+        event.acceptProposedAction()
 
 
 class StyleHelper:
@@ -30,6 +90,11 @@ class CoordinateConverterApp(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
+        # Un calcul en cours par onglet
+        self.geo_to_rect_jobs = JobSlot()
+        self.rect_to_geo_jobs = JobSlot()
+        self.file_jobs = JobSlot()
+        self.batch_path = None
         self.initUI()
 
     def initUI(self):
@@ -132,6 +197,7 @@ class CoordinateConverterApp(QWidget):
         """)
         tabs.addTab(self.create_geo_to_rect_tab(), "Géographique → Cartésien")
         tabs.addTab(self.create_rect_to_geo_tab(), "Cartésien → Géographique")
+        tabs.addTab(self.create_batch_tab(), "Fichier (lot)")
 
         main_layout.addWidget(tabs)
         self.setLayout(main_layout)
@@ -233,6 +299,147 @@ class CoordinateConverterApp(QWidget):
         tab.setLayout(layout)
         return tab
 
+    def create_batch_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+
+        drop_area = FileDropArea("Déposer ici un fichier CSV (lat, lon, h ou X, Y, Z) "
+                                 "ou un fichier de points binaire (voir point_file.py)")
+        drop_area.file_dropped.connect(self.select_batch_file)
+        layout.addWidget(drop_area)
+
+        browse_button = QPushButton("Parcourir…")
+        browse_button.clicked.connect(self.browse_batch_file)
+        layout.addWidget(browse_button)
+
+        self.batch_file_label = QLabel("Aucun fichier sélectionné")
+        self.batch_file_label.setWordWrap(True)
+        layout.addWidget(self.batch_file_label)
+
+        options_group = QGroupBox("Conversion")
+        options_layout = QFormLayout()
+        direction_layout = QHBoxLayout()
+        self.batch_to_rect = QRadioButton("Géographique → Cartésien")
+        self.batch_to_geo = QRadioButton("Cartésien → Géographique")
+        self.batch_to_rect.setChecked(True)
+        direction_layout.addWidget(self.batch_to_rect)
+        direction_layout.addWidget(self.batch_to_geo)
+        options_layout.addRow("Sens:", direction_layout)
+
+        self.batch_ellipsoid_combo = QComboBox()
+        self.batch_ellipsoid_combo.addItems(["Clark 1880", "WGS84", "GRS80"])
+        options_layout.addRow("Ellipsoïde:", self.batch_ellipsoid_combo)
+
+        self.batch_method_combo = QComboBox()
+        self.batch_method_combo.addItems(RECT_TO_GEO_METHODS)
+        options_layout.addRow("Méthode (→ géographique):", self.batch_method_combo)
+        options_group.setLayout(options_layout)
+        layout.addWidget(options_group)
+
+        buttons = QHBoxLayout()
+        convert_button = QPushButton("Convertir le fichier")
+        convert_button.clicked.connect(self.convert_batch_file)
+        self.batch_cancel_button = QPushButton("Annuler")
+        self.batch_cancel_button.setEnabled(False)
+        self.batch_cancel_button.clicked.connect(self.cancel_batch_file)
+        buttons.addWidget(convert_button)
+        buttons.addWidget(self.batch_cancel_button)
+        layout.addLayout(buttons)
+
+        self.batch_progress = QProgressBar()
+        self.batch_progress.setRange(0, 1000)
+        self.batch_progress.setTextVisible(False)
+        layout.addWidget(self.batch_progress)
+
+        self.result_batch = QTextEdit()
+        self.result_batch.setReadOnly(True)
+        self.result_batch.setPlaceholderText("Débit et résidus de la conversion s'afficheront ici.")
+        layout.addWidget(self.result_batch)
+
+        tab.setLayout(layout)
+        return tab
+
+    def browse_batch_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Fichier de points", "",
+                                              "Points (*.csv *.tsv *.txt *.gpf);;Tous les fichiers (*)")
+        if path:
+            self.select_batch_file(path)
+
+    def select_batch_file(self, path):
+        """Fichier déposé ou choisi : un fichier binaire impose le sens et l'ellipsoïde de son en-tête"""
+        self.batch_path = path
+        try:
+            header = read_header(path)
+        except (ValueError, OSError):
+            header = None
+        self.batch_binary = header is not None
+        for widget in (self.batch_to_rect, self.batch_to_geo, self.batch_ellipsoid_combo):
+            widget.setEnabled(header is None)
+        if header is None:
+            self.batch_file_label.setText(f"Fichier CSV : {os.path.basename(path)} "
+                                          f"({os.path.getsize(path) / 1e6:.1f} Mo)")
+            return
+        (self.batch_to_rect if header.kind == "geo" else self.batch_to_geo).setChecked(True)
+        for i in range(self.batch_ellipsoid_combo.count()):
+            if get_ellipsoid(self.batch_ellipsoid_combo.itemText(i)).name == header.ellipsoid_name:
+                self.batch_ellipsoid_combo.setCurrentIndex(i)
+        self.batch_file_label.setText(f"Fichier de points : {os.path.basename(path)} — {header.count} points "
+                                      f"{'géographiques' if header.kind == 'geo' else 'cartésiens'}, "
+                                      f"{header.ellipsoid_name}")
+
+    def convert_batch_file(self):
+        if not self.batch_path:
+            self.result_batch.setPlainText("Erreur: Aucun fichier sélectionné")
+            return
+        to_rect = self.batch_to_rect.isChecked()
+        root, extension = os.path.splitext(self.batch_path)
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "Fichier de sortie", f"{root}{'_ecef' if to_rect else '_geo'}{extension}")
+        if not output_path:
+            return
+        if os.path.abspath(output_path) == os.path.abspath(self.batch_path):
+            self.result_batch.setPlainText("Erreur: Le fichier de sortie doit être différent du fichier d'entrée")
+            return
+
+        method = self.batch_method_combo.currentText()
+        if self.batch_binary:
+            blocks = iter_convert_file(self.batch_path, output_path, method)
+        else:
+            blocks = iter_convert_csv(self.batch_path, output_path, "rect" if to_rect else "geo",
+                                      self.batch_ellipsoid_combo.currentText(), method)
+        self.batch_output = output_path
+        self.batch_show_residuals = not to_rect and method == "iterative"
+        self.batch_progress.setValue(0)
+        self.batch_cancel_button.setEnabled(True)
+        self.result_batch.setPlainText("Conversion en cours…")
+
+        job = Job(convert_blocks, blocks)
+        job.signals.progress.connect(lambda done, total: self.file_jobs.job is job and self.batch_progress.setValue(done))
+        job.signals.cancelled.connect(lambda: self.finish_batch_file("Conversion annulée (fichier de sortie incomplet)"))
+        self.file_jobs.submit(job, self.show_batch_summary,
+                              lambda message: self.finish_batch_file(f"Erreur: {message}"),
+                              on_batch=lambda points, stats: self.result_batch.setPlainText(self.batch_readout(stats)))
+
+    def cancel_batch_file(self):
+        self.file_jobs.cancel()
+
+    def batch_readout(self, stats):
+        """Texte du débit et des résidus extrêmes d'une conversion"""
+        rate = stats["points"] / stats["seconds"] if stats["seconds"] > 0 else float("inf")
+        text = f"{stats['points']} points en {stats['seconds']:.2f} s ({rate:,.0f} points/s)".replace(",", " ")
+        if self.batch_show_residuals and stats["residual_max"] is not None:
+            text += (f"\nRésidus de la méthode itérative : min {stats['residual_min']:.3e} rad, "
+                     f"max {stats['residual_max']:.3e} rad")
+        return text
+
+    def show_batch_summary(self, stats):
+        self.batch_progress.setValue(1000)
+        self.finish_batch_file(f"{self.batch_readout(stats)}\nRésultats écrits dans {self.batch_output}")
+
+    def finish_batch_file(self, text):
+        self.batch_cancel_button.setEnabled(False)
+        self.result_batch.setPlainText(text)
+
     def create_input_fields(self):
         for i in reversed(range(self.input_grid.count())):
             self.input_grid.itemAt(i).widget().setParent(None)
@@ -328,12 +535,18 @@ class CoordinateConverterApp(QWidget):
                 lat = -lat
             if self.lon_direction.currentText() == "O":
                 lon = -lon
-
-            X, Y, Z = CoordinateConverter.geo_to_rect(lat, lon, h, ellipsoid)
-            result = f"X: {X:.3f} m\nY: {Y:.3f} m\nZ: {Z:.3f} m"
-            self.result_geo_to_rect.setPlainText(result)
         except ValueError as e:
             self.result_geo_to_rect.setPlainText(f"Erreur: {str(e)}")
+            return
+
+        job = Job(convert_job, CoordinateConverter.geo_to_rect, lat, lon, h, ellipsoid)
+        self.geo_to_rect_jobs.submit(job, self.show_geo_to_rect,
+                                     lambda message: self.result_geo_to_rect.setPlainText(f"Erreur: {message}"))
+        self.main_window.track_job(job)
+
+    def show_geo_to_rect(self, result):
+        X, Y, Z = result
+        self.result_geo_to_rect.setPlainText(f"X: {X:.3f} m\nY: {Y:.3f} m\nZ: {Z:.3f} m")
 
     def convert_rect_to_geo(self):
         try:
@@ -341,23 +554,29 @@ class CoordinateConverterApp(QWidget):
             Y = float(self.y_entry.text().replace(',', '.'))
             Z = float(self.z_entry.text().replace(',', '.'))
             ellipsoid = self.ellipsoid_combo_rect.currentText()
-
-            lat, lon, h = CoordinateConverter.rect_to_geo(X, Y, Z, ellipsoid)
-
-            lat_direction = "N" if lat >= 0 else "S"
-            lon_direction = "E" if lon >= 0 else "O"
-            lat, lon = abs(lat), abs(lon)
-
-            result = ""
-            if self.output_dms.isChecked():
-                lat_dms = CoordinateConverter.dd_to_dms(lat)
-                lon_dms = CoordinateConverter.dd_to_dms(lon)
-                result += f"Latitude: {lat_dms[0]}° {lat_dms[1]}' {lat_dms[2]:.2f}\" {lat_direction}\n"
-                result += f"Longitude: {lon_dms[0]}° {lon_dms[1]}' {lon_dms[2]:.2f}\" {lon_direction}\n"
-            else:
-                result += f"Latitude: {lat:.6f}° {lat_direction}\nLongitude: {lon:.6f}° {lon_direction}\n"
-
-            result += f"Hauteur: {h:.3f} m"
-            self.result_rect_to_geo.setPlainText(result)
         except ValueError as e:
-            self.result_rect_to_geo.setPlainText(f"Erreur: {str(e)}")
\ No newline at end of file
+            self.result_rect_to_geo.setPlainText(f"Erreur: {str(e)}")
+            return
+
+        job = Job(convert_job, CoordinateConverter.rect_to_geo, X, Y, Z, ellipsoid)
+        self.rect_to_geo_jobs.submit(job, self.show_rect_to_geo,
+                                     lambda message: self.result_rect_to_geo.setPlainText(f"Erreur: {message}"))
+        self.main_window.track_job(job)
+
+    def show_rect_to_geo(self, result):
+        lat, lon, h = result
+        lat_direction = "N" if lat >= 0 else "S"
+        lon_direction = "E" if lon >= 0 else "O"
+        lat, lon = abs(lat), abs(lon)
+
+        result = ""
+        if self.output_dms.isChecked():
+            lat_dms = CoordinateConverter.dd_to_dms(lat)
+            lon_dms = CoordinateConverter.dd_to_dms(lon)
+            result += f"Latitude: {lat_dms[0]}° {lat_dms[1]}' {lat_dms[2]:.2f}\" {lat_direction}\n"
+            result += f"Longitude: {lon_dms[0]}° {lon_dms[1]}' {lon_dms[2]:.2f}\" {lon_direction}\n"
+        else:
+            result += f"Latitude: {lat:.6f}° {lat_direction}\nLongitude: {lon:.6f}° {lon_direction}\n"
+
+        result += f"Hauteur: {h:.3f} m"
+        self.result_rect_to_geo.setPlainText(result)
\ No newline at end of file
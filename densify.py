@@ -0,0 +1,273 @@
+# densify.py
+"""
+Densification des lignes géodésiques : sommets intermédiaires calculés le long
+de la géodésique par le problème direct, pour que la carte et les exports
+(GeoJSON, KML) ne remplacent pas la ligne par un segment droit.
+
+Le nombre de sommets est choisi ligne par ligne :
+    - spacing : distance maximale entre deux sommets consécutifs (mètres) ;
+    - tolerance : écart maximal entre la géodésique et les segments tels
+      qu'ils sont tracés sur la carte (droites en Web Mercator, mètres).
+
+L'écart est d'abord mesuré au milieu de la ligne ; il décroît comme le carré
+de la longueur des segments, d'où n = ceil(sqrt(écart / tolerance)) segments.
+Une ligne courte garde ainsi ses deux seules extrémités. Les lignes découpées
+sont ensuite contrôlées au milieu de chaque segment et redécoupées si besoin
+(la courbure de la géodésique sur la carte n'est pas uniforme).
+
+Tous les calculs sont vectorisés (problèmes inverse et direct par lot) ; le résultat est
+un ensemble de tableaux à plat : la ligne i occupe les sommets
+offsets[i]:offsets[i + 1].
+
+Les longitudes sont rendues continues le long de chaque ligne (elles peuvent
+dépasser ±180° quand la ligne traverse l'antiméridien) pour être tracées sans
+saut.
+"""
+import json
+import math
+from xml.sax.saxutils import escape
+import numpy as np
+from calculator_factory import DIRECT_METHODS, INVERSE_METHODS, direct_batch, inverse_batch
+from ellipsoid import get_ellipsoid
+from utils import BatchStatus
+
+
+# Méthodes disposant à la fois du problème direct et du problème inverse
+DENSIFY_METHODS = tuple(m for m in DIRECT_METHODS if m in INVERSE_METHODS)
+
+# Codes qui empêchent de densifier une ligne. La limite de 200 km de la sphère
+# n'en fait pas partie : la ligne est densifiée, et le code reste signalé.
+_BLOCKING_STATUS = sum(flag for flag in BatchStatus.MESSAGES if flag != BatchStatus.DISTANCE_LIMIT_EXCEEDED)
+
+DEFAULT_TOLERANCE = 100.0  # mètres
+MAX_VERTICES = 1024  # par ligne, extrémités comprises
+REFINE_ITERATIONS = 3  # contrôles de l'écart au milieu des segments
+
+# Latitude limite de la projection Web Mercator utilisée pour mesurer l'écart
+_MERCATOR_LIMIT = math.radians(85.05)
+
+
+def _wrap(angle):
+    """Ramène une différence de longitudes (radians) dans [-π, π["""
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+def _mercator_y(phi):
+    return np.arcsinh(np.tan(np.clip(phi, -_MERCATOR_LIMIT, _MERCATOR_LIMIT)))
+
+
+def chord_error(phi1, lambda1, phi2, lambda2, phi_m, lambda_m, a):
+    """
+    Écart (mètres) entre le milieu de la géodésique (phi_m, lambda_m) et le
+    milieu du segment 1-2 tracé en droite sur la carte Web Mercator.
+
+    Angles en radians, lambda2 et lambda_m déjà rendues continues depuis lambda1.
+    """
+    phi_c = np.arctan(np.sinh((_mercator_y(phi1) + _mercator_y(phi2)) / 2))
+    lambda_c = (lambda1 + lambda2) / 2
+    return a * np.hypot(phi_m - phi_c, np.cos(phi_m) * (lambda_m - lambda_c))
+
+
+def segment_counts(s, error, spacing=None, tolerance=DEFAULT_TOLERANCE, max_vertices=MAX_VERTICES):
+    """
+    Nombre de segments par ligne (au moins 1, au plus max_vertices - 1)
+
+    Args:
+        s: Longueurs des lignes (mètres)
+        error: Écart au milieu de chaque ligne non densifiée (voir chord_error)
+        spacing, tolerance: Critères de densification (None pour l'ignorer)
+    """
+    counts = np.ones(np.shape(s))
+    if tolerance:
+        counts = np.maximum(counts, np.ceil(np.sqrt(error / tolerance)))
+    if spacing:
+        counts = np.maximum(counts, np.ceil(s / spacing))
+    counts[~np.isfinite(counts)] = 1
+    return np.clip(counts, 1, max_vertices - 1).astype(np.int64)
+
+
+def _sample_lines(method, ellipsoid_name, phi1, lambda1, alpha12, s, parts):
+    """
+    Points à la distance s * j / parts (j = 0 .. parts) de chaque ligne
+
+    Returns:
+        Tuple (phi, lambda, j, offsets, status) : points à plat (radians,
+        longitudes continues depuis lambda1), rang j de chaque point, bornes
+        des lignes et code BatchStatus cumulé par ligne
+    """
+    offsets = np.zeros(len(s) + 1, dtype=np.int64)
+    np.cumsum(parts + 1, out=offsets[1:])
+    line = np.repeat(np.arange(len(s)), parts + 1)
+    j = np.arange(offsets[-1]) - offsets[line]
+    phi, lam, _, point_status = direct_batch(
+        method, ellipsoid_name, phi1[line], lambda1[line], alpha12[line], s[line] * j / parts[line])
+    lam = lambda1[line] + _wrap(lam - lambda1[line])
+    status = np.bitwise_or.reduceat(point_status, offsets[:-1])
+    return phi, lam, j, offsets, status
+
+
+def densify(lat1, lon1, lat2, lon2, ellipsoid_name="Clarke 1880", spacing=None,
+            tolerance=DEFAULT_TOLERANCE, method="vincenty", max_vertices=MAX_VERTICES):
+    """
+    Densifie un lot de lignes géodésiques.
+
+    Le nombre de segments estimé au milieu de chaque ligne est contrôlé au
+    milieu de chacun de ses segments : les lignes qui dépassent encore la
+    tolérance sont redécoupées (REFINE_ITERATIONS fois au plus), les autres
+    gardent les sommets déjà calculés.
+
+    Args:
+        lat1, lon1, lat2, lon2: Extrémités des lignes (degrés décimaux, tableaux ou scalaires)
+        ellipsoid_name: Nom d'un ellipsoïde enregistré
+        spacing: Distance maximale entre deux sommets (mètres), None pour l'ignorer
+        tolerance: Écart maximal à la géodésique sur la carte (mètres), None pour l'ignorer
+        method: Méthode des problèmes inverse et direct (voir DENSIFY_METHODS)
+        max_vertices: Nombre maximal de sommets par ligne
+
+    Returns:
+        Tuple (lat, lon, offsets, status) : sommets en degrés décimaux, bornes
+        des lignes (longueur nombre de lignes + 1) et code BatchStatus par ligne.
+        Une ligne en erreur garde ses deux extrémités ; une ligne sphérique de
+        plus de 200 km est densifiée mais garde DISTANCE_LIMIT_EXCEEDED.
+    """
+    if method not in DENSIFY_METHODS:
+        raise ValueError(f"Méthode inconnue pour la densification : {method}")
+    if max_vertices < 2:
+        raise ValueError("max_vertices doit être au moins 2")
+    a = get_ellipsoid(ellipsoid_name).a
+
+    lat1, lon1, lat2, lon2 = (np.ravel(v).astype(np.float64)
+                              for v in np.broadcast_arrays(lat1, lon1, lat2, lon2))
+    phi1, lambda1, phi2 = np.radians(lat1), np.radians(lon1), np.radians(lat2)
+    lambda2 = lambda1 + _wrap(np.radians(lon2) - lambda1)
+
+    s, alpha12, _, status = inverse_batch(method, ellipsoid_name, phi1, lambda1, phi2, lambda2)
+    if tolerance:
+        phi_m, lambda_m, _, mid_status = direct_batch(method, ellipsoid_name, phi1, lambda1, alpha12, s / 2)
+        lambda_m = lambda1 + _wrap(lambda_m - lambda1)
+        error = chord_error(phi1, lambda1, phi2, lambda2, phi_m, lambda_m, a)
+        status |= mid_status
+    else:
+        error = np.zeros_like(s)
+    counts = segment_counts(s, error, spacing, tolerance, max_vertices)
+    counts[(status & _BLOCKING_STATUS) != 0] = 1
+
+    # Lignes à sommets intérieurs : (indices, phi, lambda) des sommets retenus
+    accepted = []
+    pending = np.flatnonzero(counts > 1)
+    for iteration in range(REFINE_ITERATIONS + 1):
+        if not pending.size:
+            break
+        n = counts[pending]
+        check = tolerance and iteration < REFINE_ITERATIONS
+        # En contrôle, les points impairs sont les milieux des segments
+        step = 2 if check else 1
+        phi, lam, j, _, sample_status = _sample_lines(
+            method, ellipsoid_name, phi1[pending], lambda1[pending], alpha12[pending], s[pending], n * step)
+        status[pending] |= sample_status
+        redo = np.zeros(len(pending), dtype=bool)
+        if check:
+            middle = np.flatnonzero(j % 2 == 1)
+            errors = chord_error(phi[middle - 1], lam[middle - 1], phi[middle + 1], lam[middle + 1],
+                                 phi[middle], lam[middle], a)
+            worst = np.maximum.reduceat(errors, np.cumsum(n) - n)
+            redo = (worst > tolerance) & (n < max_vertices - 1) & ((sample_status & _BLOCKING_STATUS) == 0)
+            counts[pending[redo]] = np.clip(np.ceil(n[redo] * np.sqrt(worst[redo] / tolerance)),
+                                            n[redo] + 1, max_vertices - 1)
+        vertex = j % step == 0
+        keep = np.repeat(~redo, n * step + 1) & vertex
+        accepted.append((pending[~redo], phi[keep], lam[keep]))
+        pending = pending[redo]
+
+    offsets = np.zeros(len(s) + 1, dtype=np.int64)
+    np.cumsum(counts + 1, out=offsets[1:])
+    lat = np.empty(offsets[-1])
+    lon = np.empty(offsets[-1])
+    for lines, phi, lam in accepted:
+        size = counts[lines] + 1
+        index = np.arange(len(phi)) + np.repeat(offsets[lines] - (np.cumsum(size) - size), size)
+        lat[index] = np.degrees(phi)
+        lon[index] = np.degrees(lam)
+    # Extrémités exactes (y compris pour les lignes sans sommet intérieur)
+    lat[offsets[:-1]], lon[offsets[:-1]] = lat1, lon1
+    lat[offsets[1:] - 1], lon[offsets[1:] - 1] = lat2, np.degrees(lambda2)
+    return lat, lon, offsets, status
+
+
+def iter_lines(lat, lon, offsets):
+    """Parcourt les lignes densifiées : tableaux (lat, lon) de chaque ligne"""
+    for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        yield lat[start:end], lon[start:end]
+
+
+def finite_lines(lat, lon, offsets):
+    """Masque des lignes dont tous les sommets sont finis"""
+    if len(offsets) < 2:
+        return np.zeros(0, dtype=bool)
+    return np.logical_and.reduceat(np.isfinite(lat) & np.isfinite(lon), offsets[:-1])
+
+
+def select_lines(lat, lon, offsets, lines):
+    """Extrait les lignes d'indices lines : tableaux (lat, lon, offsets) réindexés"""
+    size = offsets[lines + 1] - offsets[lines]
+    selected = np.zeros(len(lines) + 1, dtype=np.int64)
+    np.cumsum(size, out=selected[1:])
+    index = np.arange(selected[-1]) + np.repeat(offsets[lines] - selected[:-1], size)
+    return lat[index], lon[index], selected
+
+
+# Export
+
+GEOJSON_HEADER = '{"type": "FeatureCollection", "features": [\n'
+GEOJSON_FOOTER = "\n]}\n"
+
+KML_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n')
+KML_FOOTER = "</Document></kml>\n"
+
+
+def geojson_features(lat, lon, offsets, properties=None, precision=7):
+    """
+    Entités GeoJSON LineString (une chaîne par ligne, sans séparateur)
+
+    Args:
+        properties: Liste de dictionnaires (un par ligne) ou None
+    """
+    vertex = f"[%.{precision}f,%.{precision}f]"
+    coordinates = list(map(vertex.__mod__, zip(lon.tolist(), lat.tolist())))
+    features = []
+    for i, (start, end) in enumerate(zip(offsets[:-1].tolist(), offsets[1:].tolist())):
+        props = json.dumps(properties[i] if properties is not None else {}, ensure_ascii=False)
+        features.append('{"type": "Feature", "properties": %s, "geometry": '
+                        '{"type": "LineString", "coordinates": [%s]}}'
+                        % (props, ",".join(coordinates[start:end])))
+    return features
+
+
+def kml_placemarks(lat, lon, offsets, names=None, precision=7):
+    """Éléments KML Placemark/LineString (une chaîne par ligne)"""
+    vertex = f"%.{precision}f,%.{precision}f"
+    coordinates = list(map(vertex.__mod__, zip(lon.tolist(), lat.tolist())))
+    placemarks = []
+    for i, (start, end) in enumerate(zip(offsets[:-1].tolist(), offsets[1:].tolist())):
+        name = f"<name>{escape(str(names[i]))}</name>" if names is not None else ""
+        placemarks.append(f"<Placemark>{name}<LineString><tessellate>1</tessellate>"
+                          f"<coordinates>{' '.join(coordinates[start:end])}</coordinates>"
+                          f"</LineString></Placemark>\n")
+    return placemarks
+
+
+def write_geojson(path, lat, lon, offsets, properties=None):
+    """Écrit des lignes densifiées dans un fichier GeoJSON"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(GEOJSON_HEADER)
+        f.write(",\n".join(geojson_features(lat, lon, offsets, properties)))
+        f.write(GEOJSON_FOOTER)
+
+
+def write_kml(path, lat, lon, offsets, names=None):
+    """Écrit des lignes densifiées dans un fichier KML"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(KML_HEADER)
+        f.writelines(kml_placemarks(lat, lon, offsets, names))
+        f.write(KML_FOOTER)
@@ -1,21 +1,40 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QComboBox, QGroupBox,
-                             QFormLayout, QRadioButton, QButtonGroup, QScrollArea)
+                             QFormLayout, QRadioButton, QButtonGroup, QScrollArea,
+                             QTabWidget, QCheckBox)
 from PyQt5.QtGui import QDoubleValidator
 from PyQt5.QtCore import Qt
 import math
+from functools import partial
+import numpy as np
 from utils import GeodesicUtils
-from spherical_calculator import SphericalCalculator
-from puissant_calculator import PuissantCalculator
+from calculator_factory import direct_batch, get_calculator
+from batch_runner import DIRECT_INPUT_COLUMNS, DIRECT_OUTPUT_COLUMNS
+from batch_table import BatchPanel
 from geodesic_visualization import GeodesicVisualization
+from workers import Debouncer, Job, JobSlot
+
+
+def solve_direct(job, method, ellipsoid, phi1, lambda1, alpha12, s):
+    """Problème direct exécuté hors du thread de l'interface ; retourne (φ2, λ2, α21) en degrés"""
+    calculator = get_calculator(method, ellipsoid)
+    phi2, lambda2, alpha21 = calculator.direct_problem(phi1, lambda1, alpha12, s)
+    return math.degrees(phi2), math.degrees(lambda2), math.degrees(alpha21)
+
+
+def direct_columns(method, ellipsoid, phi1, lambda1, alpha12, s):
+    """Problème direct sur des colonnes en degrés (onglet Lot) ; retourne (φ2, λ2, α21, status)"""
+    phi2, lambda2, alpha21, status = direct_batch(
+        method, ellipsoid, np.radians(phi1), np.radians(lambda1), np.radians(alpha12), s)
+    return np.degrees(phi2), np.degrees(lambda2), np.degrees(alpha21), status
 
 
 class DirectProblemApp(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
-        self.spherical_calculator = SphericalCalculator()
-        self.puissant_calculator = PuissantCalculator()
+        self.jobs = JobSlot()
+        self.live_updates = Debouncer(lambda: self.calculate(live=True), parent=self)
         self.initUI()
 
     def initUI(self):
@@ -54,11 +73,14 @@ class DirectProblemApp(QWidget):
         self.method_group = QButtonGroup()
         self.sphere_radio = QRadioButton("Sur la sphère (rayon moyen)")
         self.ellipsoid_radio = QRadioButton("Sur l'ellipsoïde (Puissant)")
+        self.vincenty_radio = QRadioButton("Sur l'ellipsoïde (Vincenty)")
         self.sphere_radio.setChecked(True)
         self.method_group.addButton(self.sphere_radio)
         self.method_group.addButton(self.ellipsoid_radio)
+        self.method_group.addButton(self.vincenty_radio)
         method_layout.addWidget(self.sphere_radio)
         method_layout.addWidget(self.ellipsoid_radio)
+        method_layout.addWidget(self.vincenty_radio)
         method_group.setLayout(method_layout)
         left_layout.addWidget(method_group)
 
@@ -71,6 +93,26 @@ class DirectProblemApp(QWidget):
         ellipsoid_group.setLayout(ellipsoid_layout)
         left_layout.addWidget(ellipsoid_group)
 
+        # Onglets : calcul d'un point ou d'un lot de lignes
+        self.tabs = QTabWidget()
+        self.tabs.setStyleSheet("""
+            QTabWidget::pane {
+                border: 1px solid #3498db;
+                background-color: rgba(52, 73, 94, 0.7);
+            }
+            QTabBar::tab {
+                background-color: #2c3e50;
+                color: white;
+                padding: 8px 16px;
+                margin-right: 2px;
+            }
+            QTabBar::tab:selected {
+                background-color: #3498db;
+            }
+        """)
+        point_tab = QWidget()
+        point_layout = QVBoxLayout(point_tab)
+
         # Données d'entrée
         input_group = QGroupBox("Données d'entrée")
         input_layout = QFormLayout()
@@ -97,7 +139,7 @@ class DirectProblemApp(QWidget):
         input_layout.addRow("Distance S (m):", self.s_edit)
 
         input_group.setLayout(input_layout)
-        left_layout.addWidget(input_group)
+        point_layout.addWidget(input_group)
 
         # Bouton de calcul
         calc_button = QPushButton("Calculer")
@@ -110,7 +152,17 @@ class DirectProblemApp(QWidget):
             border-radius: 8px;
             font-size: 18px;
         """)
-        left_layout.addWidget(calc_button)
+        point_layout.addWidget(calc_button)
+
+        # Calcul en direct : recalcul à chaque modification, après une courte pause de saisie
+        self.live_check = QCheckBox("Calcul en direct")
+        self.live_check.setStyleSheet("color: white; font-size: 14px;")
+        self.live_check.toggled.connect(self.toggle_live)
+        point_layout.addWidget(self.live_check)
+        for edit in (self.phi1_edit, self.lambda1_edit, self.alpha12_edit, self.s_edit):
+            edit.textChanged.connect(self.input_changed)
+        self.method_group.buttonToggled.connect(self.input_changed)
+        self.ellipsoid_combo.currentIndexChanged.connect(self.input_changed)
 
         # Résultats
         results_group = QGroupBox("Résultats")
@@ -125,7 +177,9 @@ class DirectProblemApp(QWidget):
             results_layout.addWidget(label)
 
         results_group.setLayout(results_layout)
-        left_layout.addWidget(results_group)
+        point_layout.addWidget(results_group)
+        self.tabs.addTab(point_tab, "Point")
+        left_layout.addWidget(self.tabs)
 
         # Configuration du widget gauche et du scroll area
         left_widget.setLayout(left_layout)
@@ -182,6 +236,9 @@ class DirectProblemApp(QWidget):
         self.visualization = GeodesicVisualization(self)
         main_layout.addWidget(self.visualization, 3)  # Ratio 3 pour la carte
 
+        # Onglet de calcul par lot (il affiche ses lignes sur la carte de la page)
+        self.tabs.addTab(self.create_batch_panel(), "Lot")
+
         self.setLayout(main_layout)
 
 
@@ -328,46 +385,83 @@ class DirectProblemApp(QWidget):
                         background: none;
                     }
                 """)
-    def calculate(self):
+
+    def selected_method(self):
+        """Nom de la méthode de calcul sélectionnée (voir calculator_factory)"""
+        if self.sphere_radio.isChecked():
+            return "spherical"
+        if self.vincenty_radio.isChecked():
+            return "vincenty"
+        return "puissant"
+
+    def selected_ellipsoid(self):
+        return "Clarke 1880" if self.ellipsoid_combo.currentText() == "Clarke 1880" else "WGS84"
+
+    def create_batch_panel(self):
+        return BatchPanel(DIRECT_INPUT_COLUMNS, DIRECT_OUTPUT_COLUMNS[:3],
+                          ("%.9f", "%.9f", "%.9f", "%.4f", "%.9f", "%.9f", "%.9f"), (0, 1, 2),
+                          direct_columns, lambda: (self.selected_method(), self.selected_ellipsoid()),
+                          (0, 1, 4, 5), self.main_window, self.visualization)
+
+    def toggle_live(self, checked):
+        if checked:
+            self.calculate(live=True)
+        else:
+            self.live_updates.cancel()
+
+    def input_changed(self, *_):
+        """Entrées modifiées : en calcul en direct, le résultat affiché est périmé et le recalcul est reporté"""
+        if self.live_check.isChecked():
+            self.jobs.cancel()
+            self.live_updates.trigger()
+
+    def calculate(self, live=False):
+        """
+        Lance le calcul en arrière-plan. En calcul en direct (live=True), une
+        saisie incomplète efface les résultats au lieu d'afficher une erreur.
+        """
+        self.live_updates.cancel()
         try:
             # Récupération des entrées
-            phi1 = math.radians(float(self.phi1_edit.text().replace(',', '.')))
-            lambda1 = math.radians(float(self.lambda1_edit.text().replace(',', '.')))
+            lat1 = float(self.phi1_edit.text().replace(',', '.'))
+            lon1 = float(self.lambda1_edit.text().replace(',', '.'))
             alpha12 = math.radians(float(self.alpha12_edit.text().replace(',', '.')))
             s = float(self.s_edit.text().replace(',', '.'))
-
-            # Choix de l'ellipsoïde
-            ellipsoid = "Clarke 1880" if self.ellipsoid_combo.currentText() == "Clarke 1880" else "WGS84"
-
-            # Calcul selon la méthode choisie
-            if self.sphere_radio.isChecked():
-                calculator = SphericalCalculator(ellipsoid)
+        except ValueError:
+            if live:
+                self.jobs.cancel()
+                self.clear_results()
             else:
-                calculator = PuissantCalculator(ellipsoid)
-
-            # Calcul des résultats
-            phi2, lambda2, alpha21 = calculator.direct_problem(phi1, lambda1, alpha12, s)
-
-            # Conversion en degrés pour l'affichage
-            phi2_degrees = math.degrees(phi2)
-            lambda2_degrees = math.degrees(lambda2)
-            alpha21_degrees = math.degrees(alpha21)
-
-            # Affichage des résultats
-            self.lat2_result.setText(f"Latitude φ2: {phi2_degrees:.6f}°")
-            self.lon2_result.setText(f"Longitude λ2: {lambda2_degrees:.6f}°")
-            self.alpha21_result.setText(f"Azimut retour α21: {alpha21_degrees:.6f}°")
-
-            # Mise à jour de la visualisation
-            self.visualization.update_points(
-                float(self.phi1_edit.text()),
-                float(self.lambda1_edit.text()),
-                phi2_degrees,
-                lambda2_degrees
-            )
-
-        except ValueError as e:
-            error_msg = "Erreur: Vérifiez vos entrées"
-            self.lat2_result.setText(error_msg)
-            self.lon2_result.setText(error_msg)
-            self.alpha21_result.setText(error_msg)
\ No newline at end of file
+                self.show_error("Erreur: Vérifiez vos entrées")
+            return
+
+        # Choix de l'ellipsoïde
+        ellipsoid = self.selected_ellipsoid()
+
+        # Calcul en arrière-plan avec le calculateur de la méthode choisie (instance mise en cache)
+        job = Job(solve_direct, self.selected_method(), ellipsoid,
+                  math.radians(lat1), math.radians(lon1), alpha12, s)
+        self.jobs.submit(job, partial(self.show_results, lat1, lon1, ellipsoid),
+                         lambda message: self.show_error(f"Erreur: {message}"))
+        self.main_window.track_job(job)
+
+    def show_results(self, lat1, lon1, ellipsoid, result):
+        phi2_degrees, lambda2_degrees, alpha21_degrees = result
+
+        # Affichage des résultats
+        self.lat2_result.setText(f"Latitude φ2: {phi2_degrees:.6f}°")
+        self.lon2_result.setText(f"Longitude λ2: {lambda2_degrees:.6f}°")
+        self.alpha21_result.setText(f"Azimut retour α21: {alpha21_degrees:.6f}°")
+
+        # Mise à jour de la visualisation
+        self.visualization.update_points(lat1, lon1, phi2_degrees, lambda2_degrees, ellipsoid)
+
+    def clear_results(self):
+        self.lat2_result.setText("Latitude φ2: ")
+        self.lon2_result.setText("Longitude λ2: ")
+        self.alpha21_result.setText("Azimut retour α21: ")
+
+    def show_error(self, error_msg):
+        self.lat2_result.setText(error_msg)
+        self.lon2_result.setText(error_msg)
+        self.alpha21_result.setText(error_msg)
\ No newline at end of file
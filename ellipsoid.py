@@ -3,37 +3,120 @@ import math
 
 
 class Ellipsoid:
-    """Classe pour gérer les paramètres des ellipsoïdes"""
-
-    CLARKE_1880 = {
-        'name': 'Clarke 1880',
-        'a': 6378249.145,  # demi grand axe
-        'b': 6356514.870,  # demi petit axe
-        'f': 1 / 293.4663  # aplatissement
-    }
-
-    WGS84 = {
-        'name': 'WGS84',
-        'a': 6378137.0,
-        'b': 6356752.314245,
-        'f': 1 / 298.257223563
-    }
-
-    @staticmethod
-    def get_derived_params(ellipsoid):
-        """Calcule les paramètres dérivés de l'ellipsoïde"""
-        a = ellipsoid['a']
-        b = ellipsoid['b']
-        f = ellipsoid['f']
-
-        # Excentricité au carré
-        e_squared = 2 * f - f ** 2
+    """
+    Paramètres d'un ellipsoïde de référence.
+
+    Les instances sont immuables : tous les paramètres dérivés sont calculés
+    une seule fois à l'enregistrement, puis lus comme de simples attributs
+    par les calculateurs et les convertisseurs.
+    """
+
+    __slots__ = (
+        'name',
+        'a',  # demi grand axe
+        'f',  # aplatissement
+        'b',  # demi petit axe
+        'e_squared',  # première excentricité au carré
+        'e_prime_squared',  # seconde excentricité au carré
+        'n',  # troisième aplatissement (a - b) / (a + b)
+        'one_minus_e_squared',  # 1 - e²
+        'R_mean',  # rayon moyen des demi-axes (2a + b) / 3
+        'meridian_coefficients',  # (A0, A2, A4, A6) de l'arc de méridien
+    )
 
-        # Rayon moyen
-        R_mean = (2 * a + b) / 3
+    def __init__(self, name, a, f, b=None):
+        e_squared = 2 * f - f ** 2
+        if b is None:
+            b = a * (1 - f)
+        e4 = e_squared ** 2
+        e6 = e_squared ** 3
 
-        return {
-            **ellipsoid,
+        values = {
+            'name': name,
+            'a': a,
+            'f': f,
+            'b': b,
             'e_squared': e_squared,
-            'R_mean': R_mean
+            'e_prime_squared': e_squared / (1 - e_squared),
+            'n': f / (2 - f),
+            'one_minus_e_squared': 1 - e_squared,
+            'R_mean': (2 * a + b) / 3,
+            # Arc de méridien : a·(A0·φ - A2·sin 2φ + A4·sin 4φ - A6·sin 6φ)
+            'meridian_coefficients': (
+                1 - e_squared / 4 - 3 * e4 / 64 - 5 * e6 / 256,
+                3 / 8 * (e_squared + e4 / 4 + 15 * e6 / 128),
+                15 / 256 * (e4 + 3 * e6 / 4),
+                35 * e6 / 3072,
+            ),
         }
+        for key, value in values.items():
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"L'ellipsoïde {self.name} est immuable")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"L'ellipsoïde {self.name} est immuable")
+
+    def __repr__(self):
+        return f"Ellipsoid(name={self.name!r}, a={self.a!r}, f={self.f!r})"
+
+    def meridian_arc(self, phi):
+        """Longueur de l'arc de méridien de l'équateur à la latitude phi (radians)"""
+        A0, A2, A4, A6 = self.meridian_coefficients
+        return self.a * (A0 * phi - A2 * math.sin(2 * phi) +
+                         A4 * math.sin(4 * phi) - A6 * math.sin(6 * phi))
+
+
+# Registre des ellipsoïdes, indexé par nom (et par alias)
+_REGISTRY = {}
+
+
+def register_ellipsoid(name, a, f, b=None, aliases=()):
+    """
+    Enregistre un ellipsoïde à partir de son demi grand axe et de son aplatissement
+
+    Args:
+        name: Nom de l'ellipsoïde
+        a: Demi grand axe (mètres)
+        f: Aplatissement
+        b: Demi petit axe publié (mètres), déduit de a et f s'il est omis
+        aliases: Autres noms sous lesquels l'ellipsoïde peut être retrouvé
+
+    Returns:
+        L'instance Ellipsoid enregistrée
+
+    Raises:
+        ValueError si l'un des noms est déjà enregistré
+    """
+    for key in (name, *aliases):
+        if key in _REGISTRY:
+            raise ValueError(f"Ellipsoïde déjà enregistré : {key}")
+    ellipsoid = Ellipsoid(name, a, f, b)
+    for key in (name, *aliases):
+        _REGISTRY[key] = ellipsoid
+    return ellipsoid
+
+
+def get_ellipsoid(name):
+    """
+    Retourne l'ellipsoïde enregistré sous ce nom
+
+    Raises:
+        ValueError si l'ellipsoïde est inconnu
+    """
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Ellipsoïde non reconnu : {name}") from None
+
+
+def ellipsoid_names():
+    """Noms principaux des ellipsoïdes enregistrés (sans les alias)"""
+    return list(dict.fromkeys(ellipsoid.name for ellipsoid in _REGISTRY.values()))
+
+
+Ellipsoid.CLARKE_1880 = register_ellipsoid('Clarke 1880', 6378249.145, 1 / 293.4663, b=6356514.870, aliases=('Clark 1880',))
+Ellipsoid.WGS84 = register_ellipsoid('WGS84', 6378137.0, 1 / 298.257223563, b=6356752.314245)
+Ellipsoid.GRS80 = register_ellipsoid('GRS80', 6378137.0, 1 / 298.257222101)
+Ellipsoid.HAYFORD = register_ellipsoid('Hayford 1909', 6378388.0, 1 / 297.0, aliases=('Hayford', 'International 1924'))
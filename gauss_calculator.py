@@ -1,27 +1,30 @@
 # gauss_calculator.py
 import math
-from ellipsoid import Ellipsoid
-from utils import GeodesicUtils
+import numpy as np
+from ellipsoid import get_ellipsoid
+from utils import GeodesicUtils, BatchStatus
 
 
 class GaussCalculator:
-    def __init__(self, ellipsoid_name="Clarke 1880"):
-        if ellipsoid_name == "Clarke 1880":
-            self.ellipsoid = Ellipsoid.get_derived_params(Ellipsoid.CLARKE_1880)
-        else:
-            self.ellipsoid = Ellipsoid.get_derived_params(Ellipsoid.WGS84)
+    def __init__(self, ellipsoid_name="Clarke 1880", radii_table=None):
+        """
+        radii_table: table radii_table.RadiiTable facultative, utilisée par
+        inverse_problem_batch à la place des formes fermées de M et N
+        """
+        self.ellipsoid = get_ellipsoid(ellipsoid_name)
+        self.radii_table = radii_table
 
     def calculate_N(self, phi):
         """Calcule le rayon de courbure de la première verticale"""
-        e_squared = self.ellipsoid['e_squared']
-        a = self.ellipsoid['a']
+        e_squared = self.ellipsoid.e_squared
+        a = self.ellipsoid.a
         return a / math.sqrt(1 - e_squared * math.sin(phi) ** 2)
 
     def calculate_M(self, phi):
         """Calcule le rayon de courbure méridien"""
-        e_squared = self.ellipsoid['e_squared']
-        a = self.ellipsoid['a']
-        return a * (1 - e_squared) / (1 - e_squared * math.sin(phi) ** 2) ** (3 / 2)
+        e_squared = self.ellipsoid.e_squared
+        a = self.ellipsoid.a
+        return a * self.ellipsoid.one_minus_e_squared / (1 - e_squared * math.sin(phi) ** 2) ** (3 / 2)
 
     def inverse_problem(self, phi1, lambda1, phi2, lambda2):
         """
@@ -88,20 +91,102 @@ class GaussCalculator:
         Validation des résultats du calcul
         """
         # Vérification de la cohérence des azimuts
+        # (un point situé à l'est donne un azimut dans ]0, π[, à l'ouest dans ]π, 2π[)
         if phi1 > phi2 and delta_lambda > 0:
-            assert alpha12 > math.pi, "Azimut direct incorrect pour φ1 > φ2"
+            assert alpha12 < math.pi, "Azimut direct incorrect pour φ1 > φ2"
         if phi1 < phi2 and delta_lambda < 0:
-            assert alpha12 < math.pi, "Azimut direct incorrect pour φ1 < φ2"
+            assert alpha12 > math.pi, "Azimut direct incorrect pour φ1 < φ2"
 
         # Vérification de la distance
-        max_distance = math.pi * self.ellipsoid['a']  # Distance maximale théorique
+        max_distance = math.pi * self.ellipsoid.a  # Distance maximale théorique
         assert 0 < s < max_distance, f"Distance calculée ({s}) hors limites"
 
+    def inverse_problem_batch(self, phi1, lambda1, phi2, lambda2):
+        """
+        Version vectorisée de inverse_problem (Gauss Mid-Latitude, éq. 4.29/4.31)
+
+        Les contrôles de _validate_results sont appliqués ligne par ligne sous
+        forme de masque : une paire invalide ne lève pas d'exception mais reçoit
+        un code d'état non nul (voir utils.BatchStatus).
+
+        Args:
+            phi1, lambda1: Tableaux des coordonnées des points A (en radians)
+            phi2, lambda2: Tableaux des coordonnées des points B (en radians)
+
+        Returns:
+            s: Distances géodésiques (en mètres)
+            alpha12: Azimuts directs (en radians)
+            alpha21: Azimuts inverses (en radians)
+            status: Codes d'état par ligne (0 si la ligne est valide)
+        """
+        phi1, lambda1, phi2, lambda2 = np.broadcast_arrays(
+            *(np.asarray(v, dtype=np.float64) for v in (phi1, lambda1, phi2, lambda2))
+        )
+        e_squared = self.ellipsoid.e_squared
+        a = self.ellipsoid.a
+
+        # 1. Différences de coordonnées et latitude moyenne
+        delta_lambda = lambda2 - lambda1
+        delta_phi = phi2 - phi1
+        phi_m = (phi1 + phi2) / 2
+        half_delta_lambda = delta_lambda / 2
+
+        # 2. Rayons de courbure au point moyen (W² partagé par Nm et Mm)
+        sin_phi_m = np.sin(phi_m)
+        cos_phi_m = np.cos(phi_m)
+        if self.radii_table is None:
+            W_squared = 1 - e_squared * sin_phi_m ** 2
+            Nm = a / np.sqrt(W_squared)
+            Mm = a * self.ellipsoid.one_minus_e_squared / (W_squared * np.sqrt(W_squared))
+        else:
+            Mm, Nm = self.radii_table.radii(phi_m)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 3. delta_alpha/2 selon l'équation (4.29)
+            delta_alpha_2 = np.arctan2(np.tan(half_delta_lambda) * sin_phi_m,
+                                       np.cos(delta_phi / 2))
+
+            # 4. (alpha12 + delta_alpha/2) selon l'équation (4.31)
+            alpha12_plus_dalpha2 = np.arctan2(cos_phi_m * np.sin(half_delta_lambda),
+                                              np.sin(Mm * delta_phi / (2 * Nm)))
+            alpha12 = alpha12_plus_dalpha2 - delta_alpha_2
+
+            # 5. Distance S : moyenne des deux équations de (4.29)
+            s = (Nm * cos_phi_m * delta_lambda / np.sin(alpha12_plus_dalpha2) +
+                 Mm * np.cos(half_delta_lambda) * delta_phi / np.cos(alpha12_plus_dalpha2)) / 2
+
+        # 6. Azimut inverse et normalisation entre 0 et 2π
+        alpha21 = np.mod(alpha12 + math.pi + 2 * delta_alpha_2, 2 * math.pi)
+        alpha12 = np.mod(alpha12, 2 * math.pi)
+
+        status = self._validate_results_batch(s, alpha12, alpha21, phi1, phi2, delta_lambda)
+        return s, alpha12, alpha21, status
+
+    def _validate_results_batch(self, s, alpha12, alpha21, phi1, phi2, delta_lambda):
+        """
+        Équivalent vectorisé de _validate_results : retourne un code d'état par ligne
+        """
+        status = np.zeros(s.shape, dtype=np.uint8)
+
+        # Cohérence des azimuts
+        bad_azimuth = (((phi1 > phi2) & (delta_lambda > 0) & ~(alpha12 < math.pi)) |
+                       ((phi1 < phi2) & (delta_lambda < 0) & ~(alpha12 > math.pi)))
+        status[bad_azimuth] |= BatchStatus.AZIMUTH_INCONSISTENT
+
+        # Distance dans ]0, π·a[
+        max_distance = math.pi * self.ellipsoid.a
+        status[~((s > 0) & (s < max_distance))] |= BatchStatus.DISTANCE_OUT_OF_RANGE
+
+        # Valeurs non finies
+        finite = np.isfinite(s) & np.isfinite(alpha12) & np.isfinite(alpha21)
+        status[~finite] |= BatchStatus.NON_FINITE
+        return status
+
     def get_convergence(self, phi, alpha12):
         """
         Calcule la convergence des méridiens
         """
-        e_squared = self.ellipsoid['e_squared']
+        e_squared = self.ellipsoid.e_squared
         return math.atan(math.tan(phi) * math.sin(alpha12) /
                          math.sqrt(1 - e_squared * math.sin(phi) ** 2))
 
@@ -2,92 +2,222 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtCore import QUrl
-import os
+import base64
+import json
+import numpy as np
+from densify import densify
+from map_resources import MAP_URL, install_map_scheme_handler
+from workers import Debouncer, Job, JobSlot
+
+
+# Écart maximal (mètres) entre la géodésique et son tracé : ligne seule, lots
+LINE_TOLERANCE = 10.0
+BATCH_TOLERANCE = 1000.0
+
+# Délai (ms) regroupant les mises à jour rapprochées des points en un seul appel JavaScript
+MAP_UPDATE_MS = 100
+
+
+def encode_segments(lat1, lon1, lat2, lon2):
+    """
+    Code un lot de segments (degrés) pour drawBatch : float32 (lat1, lon1, lat2, lon2)
+    entrelacés, en base64. Les lignes non finies sont ignorées.
+
+    La précision du float32 (environ 1e-5°, soit un mètre) suffit à l'affichage
+    et divise par deux la taille du message.
+    """
+    segments = np.column_stack(np.broadcast_arrays(lat1, lon1, lat2, lon2)).astype(np.float32)
+    segments = segments[np.isfinite(segments).all(axis=1)]
+    return base64.b64encode(segments.tobytes()).decode("ascii")
+
+
+def encode_polylines(lat, lon, offsets):
+    """
+    Code des lignes densifiées (voir densify.densify) pour drawBatch : sommets
+    en float32 (lat, lon) entrelacés et bornes des lignes en uint32, en base64.
+    """
+    vertices = np.column_stack((lat, lon)).astype(np.float32)
+    return (base64.b64encode(vertices.tobytes()).decode("ascii"),
+            base64.b64encode(np.asarray(offsets, dtype=np.uint32).tobytes()).decode("ascii"))
+
+
+def geodesic_path(lat1, lon1, lat2, lon2, ellipsoid_name="Clarke 1880", tolerance=LINE_TOLERANCE):
+    """Sommets [[lat, lon], ...] de la géodésique entre deux points (degrés décimaux)"""
+    lat, lon, _, _ = densify(lat1, lon1, lat2, lon2, ellipsoid_name, tolerance=tolerance)
+    if not (np.isfinite(lat).all() and np.isfinite(lon).all()):
+        return None
+    return np.column_stack((lat, lon)).round(7).tolist()
+
+
+def densify_path_job(job, points, ellipsoid_name):
+    """Job : géodésique entre deux points (lat1, lon1, lat2, lon2), retournée avec eux"""
+    return points, geodesic_path(*points, ellipsoid_name)
+
+
+def densify_batch_job(job, lines, ellipsoid_name, tolerance):
+    """Job : lignes d'un lot (tableau n × 4, degrés) densifiées et codées par encode_polylines"""
+    lat, lon, offsets, _ = densify(*lines.T, ellipsoid_name, tolerance=tolerance)
+    job.check_cancelled()
+    return encode_polylines(lat, lon, offsets)
+
+
+class MapView(QWebEngineView):
+    """
+    Vue web de la carte, créée une seule fois pour toute l'application.
+
+    Les appels JavaScript faits avant la fin du chargement de la page sont mis
+    en attente puis exécutés dans l'ordre.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setMinimumHeight(800)  # Hauteur minimale augmentée
+        self.loaded = False
+        self.pending = []
+        self.loadFinished.connect(self.on_load_finished)
+
+        install_map_scheme_handler(self.page().profile())
+        self.setUrl(QUrl(MAP_URL))
+
+    def on_load_finished(self, ok):
+        self.loaded = ok
+        if ok:
+            for js_code in self.pending:
+                self.page().runJavaScript(js_code)
+            self.pending.clear()
+
+    def run_javascript(self, js_code):
+        if self.loaded:
+            self.page().runJavaScript(js_code)
+        else:
+            self.pending.append(js_code)
+
+
+_map_view = None
+
+
+def shared_map_view():
+    """Retourne la vue de carte partagée, créée au premier appel"""
+    global _map_view
+    if _map_view is None:
+        _map_view = MapView()
+    return _map_view
 
 
 class GeodesicVisualization(QWidget):
+    """
+    Emplacement de la carte dans une page.
+
+    Toutes les pages partagent la même vue web (shared_map_view) : elle est
+    rattachée à l'emplacement de la page visible, qui réaffiche alors ses
+    propres points.
+    """
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.points = None
+        self.path = None  # sommets de la géodésique entre les points
+        self.batch = None  # appel drawBatch du dernier lot affiché
+        self.ellipsoid_name = "Clarke 1880"
+        self.map_updates = Debouncer(self.draw_points, MAP_UPDATE_MS, self)
+        # Densification hors du thread de l'interface : géodésique des points, lot
+        self.path_jobs = JobSlot()
+        self.batch_jobs = JobSlot()
         self.initUI()
 
     def initUI(self):
         layout = QVBoxLayout()
         self.setMinimumWidth(600)  # Largeur minimale augmentée
 
-        # Créer la vue web
-        self.web_view = QWebEngineView()
-        self.web_view.setMinimumHeight(800)  # Hauteur minimale augmentée
-
-        # HTML pour la carte
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <link rel="stylesheet" href="https://unpkg.com/leaflet@1.7.1/dist/leaflet.css"/>
-            <script src="https://unpkg.com/leaflet@1.7.1/dist/leaflet.js"></script>
-            <style>
-                body, html {
-                    margin: 0;
-                    padding: 0;
-                    height: 100%;
-                    width: 100%;
-                }
-                #map { 
-                    height: 800px;
-                    width: 100%;
-                    margin: 0;
-                    padding: 0;
-                }
-            </style>
-        </head>
-        <body>
-            <div id="map"></div>
-            <script>
-                var map = L.map('map').setView([33.5123, -7.6241], 8);
-                L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
-                    attribution: '© OpenStreetMap contributors'
-                }).addTo(map);
-
-                var startMarker, endMarker, line;
-
-                window.updateMapFromPython = function(lat1, lon1, lat2, lon2) {
-                    if (startMarker) map.removeLayer(startMarker);
-                    if (endMarker) map.removeLayer(endMarker);
-                    if (line) map.removeLayer(line);
-
-                    startMarker = L.marker([lat1, lon1])
-                        .bindPopup('Point initial (φ1, λ1)')
-                        .addTo(map);
-                    endMarker = L.marker([lat2, lon2])
-                        .bindPopup('Point final (φ2, λ2)')
-                        .addTo(map);
-                    line = L.polyline([[lat1, lon1], [lat2, lon2]], {
-                        color: 'red',
-                        weight: 3
-                    }).addTo(map);
-
-                    map.fitBounds([[lat1, lon1], [lat2, lon2]], {padding: [50, 50]});
-                }
-            </script>
-        </body>
-        </html>
-        """
-
-        # Sauvegarder le HTML
-        html_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "map.html")
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html)
-
-        # Charger la carte
-        self.web_view.setUrl(QUrl.fromLocalFile(html_path))
-        layout.addWidget(self.web_view)
-
         # Supprimer les marges du layout
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
         self.setLayout(layout)
 
-    def update_points(self, lat1, lon1, lat2, lon2):
-        js_code = f"updateMapFromPython({lat1}, {lon1}, {lat2}, {lon2})"
-        self.web_view.page().runJavaScript(js_code)
\ No newline at end of file
+    @property
+    def web_view(self):
+        return shared_map_view()
+
+    def attach(self):
+        """Rattache la vue partagée à cet emplacement et y affiche les points de la page"""
+        view = shared_map_view()
+        if view.parent() is not self:
+            self.layout().addWidget(view)
+            view.show()
+            view.run_javascript("clearMap(); clearBatch()")
+            if self.batch is not None:
+                view.run_javascript(self.batch)
+            if self.map_updates.pending:
+                self.map_updates.flush()
+            elif self.points is not None and not self.path_jobs.busy:
+                view.run_javascript(self.points_call())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.attach()
+
+    def points_call(self):
+        """Appel JavaScript affichant les points de la page et la géodésique qui les relie"""
+        lat1, lon1, lat2, lon2 = self.points
+        return f"updateMapFromPython({lat1}, {lon1}, {lat2}, {lon2}, {json.dumps(self.path)})"
+
+    def update_points(self, lat1, lon1, lat2, lon2, ellipsoid_name="Clarke 1880"):
+        """
+        Affiche deux points et leur géodésique. Les mises à jour rapprochées
+        (recalcul en direct) sont regroupées : seule la dernière est tracée,
+        MAP_UPDATE_MS après la précédente.
+        """
+        self.points = (lat1, lon1, lat2, lon2)
+        self.ellipsoid_name = ellipsoid_name
+        self.map_updates.trigger()
+
+    def draw_points(self):
+        """Calcule la géodésique des points en arrière-plan ; show_path les trace ensuite"""
+        self.path_jobs.submit(Job(densify_path_job, self.points, self.ellipsoid_name), self.show_path)
+
+    def show_path(self, result):
+        points, path = result
+        if points != self.points:
+            return  # points modifiés depuis : une nouvelle mise à jour est en attente
+        self.path = path
+        if self.web_view.parent() is not self:
+            self.attach()
+            return
+        self.web_view.run_javascript(self.points_call())
+
+    def show_batch(self, lat1, lon1, lat2, lon2, show_points=True, ellipsoid_name="Clarke 1880",
+                   tolerance=BATCH_TOLERANCE):
+        """
+        Affiche un lot de lignes (tableaux de degrés décimaux) en un seul appel
+        JavaScript : une couche polyligne unique et les extrémités regroupées
+        selon le zoom, dessinées par le rendu canvas de Leaflet.
+
+        Les lignes suivent la géodésique à tolerance mètres près ; la
+        densification se fait alors en arrière-plan et le Job retourné permet
+        d'en suivre la fin. Avec tolerance=None, les lignes sont tracées en
+        segments droits, tout de suite (retourne None).
+        """
+        show = str(bool(show_points)).lower()
+        if tolerance is None:
+            self.batch_jobs.cancel()
+            self.draw_batch(f"drawBatch('{encode_segments(lat1, lon1, lat2, lon2)}', {show})")
+            return None
+        lines = np.column_stack(np.broadcast_arrays(lat1, lon1, lat2, lon2)).astype(np.float64)
+        lines = lines[np.isfinite(lines).all(axis=1)]
+        job = Job(densify_batch_job, lines, ellipsoid_name, tolerance)
+        self.batch_jobs.submit(
+            job, lambda encoded: self.draw_batch(f"drawBatch('{encoded[0]}', {show}, '{encoded[1]}')"))
+        return job
+
+    def draw_batch(self, js_code):
+        self.batch = js_code
+        if self.web_view.parent() is not self:
+            self.attach()
+            return
+        self.web_view.run_javascript(self.batch)
+
+    def clear_batch(self):
+        self.batch_jobs.cancel()
+        self.batch = None
+        self.web_view.run_javascript("clearBatch()")
\ No newline at end of file
@@ -0,0 +1,177 @@
+# geotools.py
+"""
+Interface en ligne de commande, sans Qt : calculs géodésiques ponctuels depuis
+un terminal ou un script.
+
+Seuls les modules de calcul nécessaires à la sous-commande demandée sont
+importés (jamais PyQt5 ni QtWebEngine), ce qui garde un démarrage court.
+
+Les angles d'entrée sont acceptés en degrés décimaux ou en DMS (voir
+DegreeConverter.parse_dms) ; un angle négatif en DMS s'écrit avec son
+hémisphère (« 33 30 44.28 S ») ou après « -- ».
+
+Sans valeurs sur la ligne de commande, les valeurs sont lues sur l'entrée
+standard, une ligne par calcul (champs séparés par des virgules, points-virgules
+ou tabulations, ou par des espaces pour les angles décimaux) : un seul
+processus traite alors autant de lignes que nécessaire.
+
+Exemples :
+    python -m geotools direct 33.5 -7.6 45 10000 --method vincenty
+    python -m geotools inverse "33 30 N" "7 36 W" "33 36 N" "7 30 W" --dms
+    python -m geotools geo2rect 33.5 -7.6 120 --ellipsoid WGS84
+    python -m geotools rect2geo 5300000 -700000 3500000 --method vermeille
+    python -m geotools angle 45.5 --from deg --to grad
+    cat lignes.csv | python -m geotools inverse --method gauss
+"""
+import argparse
+import math
+import sys
+from utils import split_fields
+
+
+# Unités de la sous-commande angle -> nom utilisé par AngleConverter
+ANGLE_UNITS = {"deg": "Degrés", "grad": "Grades", "rad": "Radians", "dms": "Degrés"}
+
+
+def parse_angle(text):
+    """Angle en degrés décimaux ou DMS -> degrés décimaux"""
+    from conversion_algorithms import DegreeConverter
+    return DegreeConverter.parse_dms(text)
+
+
+def parse_number(text):
+    """Nombre décimal, la virgule étant acceptée comme séparateur décimal"""
+    try:
+        return float(text.replace(",", "."))
+    except ValueError:
+        raise ValueError(f"Nombre invalide : {text!r}") from None
+
+
+def format_angle(degrees, dms=False):
+    """Degrés décimaux -> texte, en DMS (±D°M'S.SSSS") si demandé"""
+    if not dms:
+        return f"{degrees:.9f}"
+    # Arrondi sur le total des secondes pour ne jamais afficher 60"
+    seconds = round(abs(degrees) * 3600, 4)
+    d, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    sign = "-" if degrees < 0 else ""
+    return f"{sign}{int(d)}°{int(m)}'{s:.4f}\""
+
+
+def _direct(args, values):
+    from calculator_factory import get_calculator
+    phi1, lambda1, alpha12 = (math.radians(parse_angle(v)) for v in values[:3])
+    s = parse_number(values[3])
+    calculator = get_calculator(args.method, args.ellipsoid)
+    phi2, lambda2, alpha21 = calculator.direct_problem(phi1, lambda1, alpha12, s)
+    return [format_angle(math.degrees(angle), args.dms) for angle in (phi2, lambda2, alpha21)]
+
+
+def _inverse(args, values):
+    from calculator_factory import get_calculator
+    phi1, lambda1, phi2, lambda2 = (math.radians(parse_angle(v)) for v in values)
+    calculator = get_calculator(args.method, args.ellipsoid)
+    s, alpha12, alpha21 = calculator.inverse_problem(phi1, lambda1, phi2, lambda2)
+    return [f"{s:.4f}"] + [format_angle(math.degrees(angle), args.dms) for angle in (alpha12, alpha21)]
+
+
+def _geo2rect(args, values):
+    from conversion_algorithms import CoordinateConverter
+    lat, lon = (parse_angle(v) for v in values[:2])
+    X, Y, Z = CoordinateConverter.geo_to_rect(lat, lon, parse_number(values[2]), args.ellipsoid)
+    return [f"{X:.4f}", f"{Y:.4f}", f"{Z:.4f}"]
+
+
+def _rect2geo(args, values):
+    from conversion_algorithms import CoordinateConverter
+    X, Y, Z = (parse_number(v) for v in values)
+    lat, lon, h = CoordinateConverter.rect_to_geo(X, Y, Z, args.ellipsoid, method=args.method)
+    return [format_angle(lat, args.dms), format_angle(lon, args.dms), f"{h:.4f}"]
+
+
+def _angle(args, values):
+    from conversion_algorithms import AngleConverter
+    if args.from_unit in ("deg", "dms"):
+        angle = parse_angle(values[0])
+    else:
+        angle = parse_number(values[0])
+    result = AngleConverter.convert(angle, ANGLE_UNITS[args.from_unit], ANGLE_UNITS[args.to_unit])
+    if args.to_unit == "dms":
+        return [format_angle(result, dms=True)]
+    return [f"{result:.12g}"]
+
+
+# Sous-commande -> (fonction, noms des valeurs attendues)
+COMMANDS = {
+    "direct": (_direct, ("phi1", "lambda1", "alpha12", "S")),
+    "inverse": (_inverse, ("phi1", "lambda1", "phi2", "lambda2")),
+    "geo2rect": (_geo2rect, ("lat", "lon", "h")),
+    "rect2geo": (_rect2geo, ("X", "Y", "Z")),
+    "angle": (_angle, ("valeur",)),
+}
+
+
+def build_parser():
+    """Analyseur des arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(
+        prog="geotools", description="Calculs géodésiques en ligne de commande (sans interface graphique)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Méthodes listées en dur pour ne pas importer les calculateurs avant l'analyse
+    # des arguments (mêmes valeurs que calculator_factory et conversion_algorithms)
+    methods = {
+        "direct": (("spherical", "puissant", "vincenty"), "puissant", "Problème direct"),
+        "inverse": (("spherical", "gauss", "vincenty"), "gauss", "Problème inverse"),
+        "geo2rect": (None, None, "Géographiques (lat, lon, h) → rectangulaires (X, Y, Z)"),
+        "rect2geo": (("iterative", "vermeille", "bowring"), "iterative",
+                     "Rectangulaires (X, Y, Z) → géographiques (lat, lon, h)"),
+    }
+    for command, (choices, default, description) in methods.items():
+        names = COMMANDS[command][1]
+        sub = subparsers.add_parser(command, help=description)
+        sub.add_argument("values", nargs="*", metavar="valeur",
+                         help=f"{', '.join(names)} (lus sur l'entrée standard si absents)")
+        sub.add_argument("--ellipsoid", default="Clarke 1880")
+        if choices:
+            sub.add_argument("--method", choices=choices, default=default)
+        if command != "geo2rect":
+            sub.add_argument("--dms", action="store_true", help="Angles de sortie en DMS")
+
+    angle = subparsers.add_parser("angle", help="Conversion d'unités d'angle")
+    angle.add_argument("values", nargs="*", metavar="valeur")
+    angle.add_argument("--from", dest="from_unit", choices=tuple(ANGLE_UNITS), default="deg")
+    angle.add_argument("--to", dest="to_unit", choices=tuple(ANGLE_UNITS), default="dms")
+    return parser
+
+
+def run(args, values):
+    """Exécute un calcul et retourne la ligne de résultat"""
+    function, names = COMMANDS[args.command]
+    if len(values) != len(names):
+        raise ValueError(f"{len(names)} valeurs attendues ({', '.join(names)}), {len(values)} reçues")
+    return "\t".join(function(args, values))
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.values:
+        lines = [args.values]
+    else:
+        lines = (split_fields(line) for line in sys.stdin if line.strip())
+
+    errors = 0
+    for values in lines:
+        try:
+            print(run(args, values))
+        except (ValueError, ArithmeticError, AssertionError) as e:
+            # AssertionError : contrôles de cohérence des calculateurs (Gauss).
+            # Une ligne vide en sortie garde la correspondance avec les lignes d'entrée
+            print()
+            print(f"Erreur : {e}", file=sys.stderr)
+            errors += 1
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
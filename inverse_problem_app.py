@@ -1,21 +1,40 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QComboBox, QGroupBox,
-                             QFormLayout, QRadioButton, QButtonGroup, QScrollArea)
+                             QFormLayout, QRadioButton, QButtonGroup, QScrollArea,
+                             QTabWidget, QCheckBox)
 from PyQt5.QtGui import QDoubleValidator
 from PyQt5.QtCore import Qt
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from geodesic_visualization import GeodesicVisualization
-from spherical_calculator import SphericalCalculator
-from gauss_calculator import GaussCalculator
+from calculator_factory import get_calculator, inverse_batch
+from batch_runner import INVERSE_INPUT_COLUMNS, INVERSE_OUTPUT_COLUMNS
+from batch_table import BatchPanel
+from workers import Debouncer, Job, JobSlot
+from functools import partial
 import math
+import numpy as np
+
+
+def solve_inverse(job, method, ellipsoid, phi1, lambda1, phi2, lambda2):
+    """Problème inverse exécuté hors du thread de l'interface ; retourne (S, α12, α21), angles en degrés"""
+    calculator = get_calculator(method, ellipsoid)
+    s, alpha12, alpha21 = calculator.inverse_problem(phi1, lambda1, phi2, lambda2)
+    return s, math.degrees(alpha12), math.degrees(alpha21)
+
+
+def inverse_columns(method, ellipsoid, phi1, lambda1, phi2, lambda2):
+    """Problème inverse sur des colonnes en degrés (onglet Lot) ; retourne (S, α12, α21, status)"""
+    s, alpha12, alpha21, status = inverse_batch(
+        method, ellipsoid, np.radians(phi1), np.radians(lambda1), np.radians(phi2), np.radians(lambda2))
+    return s, np.degrees(alpha12), np.degrees(alpha21), status
 
 
 class InverseProblemApp(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
-        self.spherical_calculator = SphericalCalculator()
-        self.gauss_calculator = GaussCalculator()
+        self.jobs = JobSlot()
+        self.live_updates = Debouncer(lambda: self.calculate(live=True), parent=self)
         self.initUI()
 
     def initUI(self):
@@ -55,13 +74,16 @@ class InverseProblemApp(QWidget):
         self.method_group = QButtonGroup()
         self.sphere_radio = QRadioButton("Sphère moyenne")
         self.gauss_radio = QRadioButton("Méthode de Gauss")
+        self.vincenty_radio = QRadioButton("Méthode de Vincenty")
         self.gauss_radio.setChecked(True)
 
         self.method_group.addButton(self.sphere_radio)
         self.method_group.addButton(self.gauss_radio)
+        self.method_group.addButton(self.vincenty_radio)
 
         method_layout.addWidget(self.sphere_radio)
         method_layout.addWidget(self.gauss_radio)
+        method_layout.addWidget(self.vincenty_radio)
         method_group.setLayout(method_layout)
         left_layout.addWidget(method_group)
 
@@ -74,6 +96,26 @@ class InverseProblemApp(QWidget):
         ellipsoid_group.setLayout(ellipsoid_layout)
         left_layout.addWidget(ellipsoid_group)
 
+        # Onglets : calcul d'un point ou d'un lot de lignes
+        self.tabs = QTabWidget()
+        self.tabs.setStyleSheet("""
+            QTabWidget::pane {
+                border: 1px solid #3498db;
+                background-color: rgba(52, 73, 94, 0.7);
+            }
+            QTabBar::tab {
+                background-color: #2c3e50;
+                color: white;
+                padding: 8px 16px;
+                margin-right: 2px;
+            }
+            QTabBar::tab:selected {
+                background-color: #3498db;
+            }
+        """)
+        point_tab = QWidget()
+        point_layout = QVBoxLayout(point_tab)
+
         # Données du premier point
         p1_group = QGroupBox("Point Initial (P1)")
         p1_layout = QFormLayout()
@@ -90,7 +132,7 @@ class InverseProblemApp(QWidget):
         p1_layout.addRow("Longitude λ1 (°):", self.lambda1_edit)
 
         p1_group.setLayout(p1_layout)
-        left_layout.addWidget(p1_group)
+        point_layout.addWidget(p1_group)
 
         # Données du deuxième point
         p2_group = QGroupBox("Point Final (P2)")
@@ -107,7 +149,7 @@ class InverseProblemApp(QWidget):
         p2_layout.addRow("Longitude λ2 (°):", self.lambda2_edit)
 
         p2_group.setLayout(p2_layout)
-        left_layout.addWidget(p2_group)
+        point_layout.addWidget(p2_group)
 
         # Bouton de calcul
         calc_button = QPushButton("Calculer")
@@ -121,7 +163,17 @@ class InverseProblemApp(QWidget):
             font-size: 18px;
             margin: 10px;
         """)
-        left_layout.addWidget(calc_button)
+        point_layout.addWidget(calc_button)
+
+        # Calcul en direct : recalcul à chaque modification, après une courte pause de saisie
+        self.live_check = QCheckBox("Calcul en direct")
+        self.live_check.setStyleSheet("color: white; font-size: 14px;")
+        self.live_check.toggled.connect(self.toggle_live)
+        point_layout.addWidget(self.live_check)
+        for edit in (self.phi1_edit, self.lambda1_edit, self.phi2_edit, self.lambda2_edit):
+            edit.textChanged.connect(self.input_changed)
+        self.method_group.buttonToggled.connect(self.input_changed)
+        self.ellipsoid_combo.currentIndexChanged.connect(self.input_changed)
 
         # Groupe pour les résultats
         results_group = QGroupBox("Résultats")
@@ -140,7 +192,9 @@ class InverseProblemApp(QWidget):
             results_layout.addWidget(label)
 
         results_group.setLayout(results_layout)
-        left_layout.addWidget(results_group)
+        point_layout.addWidget(results_group)
+        self.tabs.addTab(point_tab, "Point")
+        left_layout.addWidget(self.tabs)
 
         # Configuration du widget gauche et du scroll area
         left_widget.setLayout(left_layout)
@@ -195,6 +249,9 @@ class InverseProblemApp(QWidget):
         self.visualization = GeodesicVisualization(self)
         main_layout.addWidget(self.visualization, 3)  # Ratio 3 pour la carte
 
+        # Onglet de calcul par lot (il affiche ses lignes sur la carte de la page)
+        self.tabs.addTab(self.create_batch_panel(), "Lot")
+
         self.setLayout(main_layout)
 
         # Styles globaux
@@ -341,53 +398,76 @@ class InverseProblemApp(QWidget):
                     }
                 """)
 
-    def calculate(self):
+    def selected_method(self):
+        """Nom de la méthode de calcul sélectionnée (voir calculator_factory)"""
+        if self.sphere_radio.isChecked():
+            return "spherical"
+        if self.vincenty_radio.isChecked():
+            return "vincenty"
+        return "gauss"
+
+    def create_batch_panel(self):
+        return BatchPanel(INVERSE_INPUT_COLUMNS, INVERSE_OUTPUT_COLUMNS[:3],
+                          ("%.9f", "%.9f", "%.9f", "%.9f", "%.4f", "%.9f", "%.9f"), (0, 1, 2, 3),
+                          inverse_columns, lambda: (self.selected_method(), self.ellipsoid_combo.currentText()),
+                          (0, 1, 2, 3), self.main_window, self.visualization)
+
+    def toggle_live(self, checked):
+        if checked:
+            self.calculate(live=True)
+        else:
+            self.live_updates.cancel()
+
+    def input_changed(self, *_):
+        """Entrées modifiées : en calcul en direct, le résultat affiché est périmé et le recalcul est reporté"""
+        if self.live_check.isChecked():
+            self.jobs.cancel()
+            self.live_updates.trigger()
+
+    def calculate(self, live=False):
+        """
+        Lance le calcul en arrière-plan. En calcul en direct (live=True), une
+        saisie incomplète efface les résultats au lieu d'afficher une erreur.
+        """
+        self.live_updates.cancel()
         try:
-            # Conversion des entrées en radians
-            phi1 = math.radians(float(self.phi1_edit.text().replace(',', '.')))
-            lambda1 = math.radians(float(self.lambda1_edit.text().replace(',', '.')))
-            phi2 = math.radians(float(self.phi2_edit.text().replace(',', '.')))
-            lambda2 = math.radians(float(self.lambda2_edit.text().replace(',', '.')))
-
-            # Sélection de l'ellipsoïde
-            ellipsoid = self.ellipsoid_combo.currentText()
-
-            # Calcul selon la méthode choisie
-            if self.sphere_radio.isChecked():
-                calculator = SphericalCalculator(ellipsoid)
-                s, alpha12, alpha21 = calculator.inverse_problem(
-                    phi1, lambda1, phi2, lambda2
-                )
-            else:
-                calculator = GaussCalculator(ellipsoid)
-                s, alpha12, alpha21 = calculator.inverse_problem(
-                    phi1, lambda1, phi2, lambda2
-                )
-
-            # Conversion des angles en degrés pour l'affichage
-            alpha12_deg = math.degrees(alpha12)
-            alpha21_deg = math.degrees(alpha21)
-
-            # Affichage des résultats
-            self.distance_result.setText(f"Distance S: {s:.3f} m")
-            self.alpha12_result.setText(f"Azimut direct α12: {alpha12_deg:.6f}°")
-            self.alpha21_result.setText(f"Azimut retour α21: {alpha21_deg:.6f}°")
-
-            # Mise à jour de la visualisation
-            self.visualization.update_points(
-                float(self.phi1_edit.text().replace(',', '.')),
-                float(self.lambda1_edit.text().replace(',', '.')),
-                float(self.phi2_edit.text().replace(',', '.')),
-                float(self.lambda2_edit.text().replace(',', '.'))
-            )
-
+            # Lecture des entrées (degrés décimaux)
+            points = tuple(float(edit.text().replace(',', '.')) for edit in
+                           (self.phi1_edit, self.lambda1_edit, self.phi2_edit, self.lambda2_edit))
         except ValueError as e:
-            error_msg = f"Erreur: {str(e)}" if str(e) else "Erreur: Vérifiez vos entrées"
-            self.distance_result.setText(error_msg)
-            self.alpha12_result.setText(error_msg)
-            self.alpha21_result.setText(error_msg)
-        except Exception as e:
-            error_msg = f"Erreur inattendue: {str(e)}"
-            self.distance_result.setText(error_msg)
-            self.alpha12_result.setText(error_msg)
-            self.alpha21_result.setText(error_msg)
\ No newline at end of file
+            if live:
+                self.jobs.cancel()
+                self.clear_results()
+            else:
+                self.show_error(f"Erreur: {str(e)}" if str(e) else "Erreur: Vérifiez vos entrées")
+            return
+
+        # Sélection de l'ellipsoïde
+        ellipsoid = self.ellipsoid_combo.currentText()
+
+        # Calcul en arrière-plan avec le calculateur de la méthode choisie (instance mise en cache)
+        job = Job(solve_inverse, self.selected_method(), ellipsoid, *(math.radians(v) for v in points))
+        self.jobs.submit(job, partial(self.show_results, points, ellipsoid),
+                         lambda message: self.show_error(f"Erreur: {message}"))
+        self.main_window.track_job(job)
+
+    def show_results(self, points, ellipsoid, result):
+        s, alpha12_deg, alpha21_deg = result
+
+        # Affichage des résultats
+        self.distance_result.setText(f"Distance S: {s:.3f} m")
+        self.alpha12_result.setText(f"Azimut direct α12: {alpha12_deg:.6f}°")
+        self.alpha21_result.setText(f"Azimut retour α21: {alpha21_deg:.6f}°")
+
+        # Mise à jour de la visualisation
+        self.visualization.update_points(*points, ellipsoid)
+
+    def clear_results(self):
+        self.distance_result.setText("Distance S: ")
+        self.alpha12_result.setText("Azimut direct α12: ")
+        self.alpha21_result.setText("Azimut retour α21: ")
+
+    def show_error(self, error_msg):
+        self.distance_result.setText(error_msg)
+        self.alpha12_result.setText(error_msg)
+        self.alpha21_result.setText(error_msg)
\ No newline at end of file
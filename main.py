@@ -1,9 +1,29 @@
+import time
+START = time.perf_counter()
+
 import sys
+from PyQt5.QtCore import Qt, QCoreApplication, QTimer
 from PyQt5.QtWidgets import QApplication
 from MainWindow import MainWindow
 
 if __name__ == "__main__":
+    # Autorise l'import de QtWebEngine après la création de QApplication,
+    # les pages avec carte n'étant construites qu'à leur première ouverture
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    # Le schéma geotools:// de la carte doit lui aussi être déclaré avant QApplication ;
+    # seule la bibliothèque QtWebEngineCore est chargée (map_scheme.py), pas le
+    # moteur Chromium. Son coût est mesuré et affiché avec la durée de démarrage.
+    scheme_start = time.perf_counter()
+    try:
+        from map_scheme import register_map_scheme
+        register_map_scheme()
+    except ImportError:
+        pass  # QtWebEngine indisponible : les pages sans carte restent utilisables
+    scheme_seconds = time.perf_counter() - scheme_start
     app = QApplication(sys.argv)
     main_window = MainWindow()
     main_window.show()
+    # Mesurée au premier passage dans la boucle d'événements, une fois le menu affiché
+    QTimer.singleShot(0, lambda: main_window.report_timing(
+        "démarrage", time.perf_counter() - START, {"QtWebEngineCore": scheme_seconds}))
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,280 @@
+# map_resources.py
+"""
+Ressources de la carte servies par le schéma d'URL geotools://
+
+    geotools://map/index.html       page de la carte, générée en mémoire
+    geotools://map/leaflet/...      Leaflet, livré dans Ressource/leaflet
+    geotools://tiles/{z}/{x}/{y}    tuiles, lues dans le cache local (tile_cache.py)
+                                    et téléchargées seulement en cas d'absence
+
+Rien n'est écrit dans le répertoire d'installation et la carte s'affiche sans
+réseau dès que les tuiles de la zone sont en cache.
+
+Le schéma doit être déclaré par register_map_scheme() (map_scheme.py) avant la
+création de QApplication (voir main.py), puis le gestionnaire est installé sur
+le profil par install_map_scheme_handler() au premier affichage d'une carte.
+"""
+import os
+import re
+from PyQt5 import sip
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QUrl
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestJob, QWebEngineUrlSchemeHandler
+from map_scheme import MAP_SCHEME, MAP_URL
+from tile_cache import TileCache, USER_AGENT
+
+
+MAP_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8"/>
+    <link rel="stylesheet" href="leaflet/leaflet.css"/>
+    <script src="leaflet/leaflet.js"></script>
+    <style>
+        body, html {
+            margin: 0;
+            padding: 0;
+            height: 100%;
+            width: 100%;
+        }
+        #map {
+            height: 100%;
+            width: 100%;
+            margin: 0;
+            padding: 0;
+        }
+    </style>
+</head>
+<body>
+    <div id="map"></div>
+    <script>
+        var map = L.map('map').setView([33.5123, -7.6241], 8);
+        L.tileLayer('geotools://tiles/{z}/{x}/{y}.png', {
+            maxZoom: 19,
+            attribution: '© OpenStreetMap contributors'
+        }).addTo(map);
+
+        var startMarker, endMarker, line;
+
+        window.clearMap = function() {
+            if (startMarker) map.removeLayer(startMarker);
+            if (endMarker) map.removeLayer(endMarker);
+            if (line) map.removeLayer(line);
+            startMarker = endMarker = line = null;
+        }
+
+        // path : sommets [[lat, lon], ...] de la géodésique densifiée (facultatif),
+        // longitudes continues au passage de l'antiméridien
+        window.updateMapFromPython = function(lat1, lon1, lat2, lon2, path) {
+            clearMap();
+            path = path || [[lat1, lon1], [lat2, lon2]];
+
+            startMarker = L.marker(path[0])
+                .bindPopup('Point initial (φ1, λ1)')
+                .addTo(map);
+            endMarker = L.marker(path[path.length - 1])
+                .bindPopup('Point final (φ2, λ2)')
+                .addTo(map);
+            line = L.polyline(path, {
+                color: 'red',
+                weight: 3
+            }).addTo(map);
+
+            map.fitBounds(line.getBounds(), {padding: [50, 50]});
+        }
+
+        // Lots de lignes géodésiques : une seule couche polyligne et des groupes de
+        // points, dessinés par le rendu canvas (pas d'élément DOM par objet)
+        var batchRenderer = L.canvas({padding: 0.5});
+        var batchLines = null, batchPoints = null;
+        var batchClusters = L.layerGroup().addTo(map);
+        var CLUSTER_CELL = 60;  // taille des cellules de regroupement, en pixels
+
+        function decodeBase64(payload) {
+            var binary = atob(payload), bytes = new Uint8Array(binary.length);
+            for (var i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+            return bytes.buffer;
+        }
+
+        window.clearBatch = function() {
+            if (batchLines) map.removeLayer(batchLines);
+            batchClusters.clearLayers();
+            batchLines = batchPoints = null;
+        }
+
+        // payload : base64 de float32, (lat1, lon1, lat2, lon2) par ligne, ou, si
+        // offsetsPayload (base64 de uint32) est fourni, sommets (lat, lon) des lignes
+        // densifiées, la ligne i occupant les sommets offsets[i] à offsets[i + 1] - 1
+        window.drawBatch = function(payload, showPoints, offsetsPayload) {
+            clearBatch();
+            var data = new Float32Array(decodeBase64(payload));
+            var offsets = offsetsPayload ? new Uint32Array(decodeBase64(offsetsPayload)) : null;
+            var count = offsets ? offsets.length - 1 : data.length / 4;
+            if (count <= 0) return;
+            var lines = new Array(count), ends = new Float32Array(4 * count);
+            for (var i = 0; i < count; i++) {
+                var first = offsets ? offsets[i] : 2 * i, last = offsets ? offsets[i + 1] - 1 : 2 * i + 1;
+                var vertices = new Array(last - first + 1);
+                for (var v = first; v <= last; v++) vertices[v - first] = [data[2 * v], data[2 * v + 1]];
+                lines[i] = vertices;
+                ends[4 * i] = data[2 * first]; ends[4 * i + 1] = data[2 * first + 1];
+                ends[4 * i + 2] = data[2 * last]; ends[4 * i + 3] = data[2 * last + 1];
+            }
+            batchLines = L.polyline(lines, {
+                renderer: batchRenderer, color: 'red', weight: 1, interactive: false
+            }).addTo(map);
+
+            if (showPoints) {
+                // Coordonnées Web Mercator normalisées [0, 1], calculées une seule fois
+                batchPoints = new Float64Array(ends.length);
+                for (var k = 0; k < ends.length; k += 2) {
+                    var lat = Math.max(-85.05, Math.min(85.05, ends[k])) * Math.PI / 180;
+                    batchPoints[k] = (ends[k + 1] + 180) / 360;
+                    batchPoints[k + 1] = (1 - Math.log(Math.tan(lat) + 1 / Math.cos(lat)) / Math.PI) / 2;
+                }
+            }
+            map.fitBounds(batchLines.getBounds(), {padding: [20, 20]});
+            updateClusters();
+        }
+
+        // Regroupe les extrémités visibles par cellules de CLUSTER_CELL pixels
+        function updateClusters() {
+            batchClusters.clearLayers();
+            if (!batchPoints) return;
+            var scale = 256 * Math.pow(2, map.getZoom());
+            var view = map.getPixelBounds();
+            var margin = CLUSTER_CELL;
+            var cells = {};
+            for (var k = 0; k < batchPoints.length; k += 2) {
+                var x = batchPoints[k] * scale, y = batchPoints[k + 1] * scale;
+                if (x < view.min.x - margin || x > view.max.x + margin ||
+                    y < view.min.y - margin || y > view.max.y + margin) continue;
+                var key = Math.floor(x / CLUSTER_CELL) + ':' + Math.floor(y / CLUSTER_CELL);
+                var cell = cells[key];
+                if (cell) { cell.n++; cell.x += x; cell.y += y; }
+                else cells[key] = {n: 1, x: x, y: y};
+            }
+            for (var key in cells) {
+                var cell = cells[key];
+                var latlng = map.unproject([cell.x / cell.n, cell.y / cell.n], map.getZoom());
+                var marker = L.circleMarker(latlng, {
+                    renderer: batchRenderer,
+                    radius: cell.n === 1 ? 4 : Math.min(30, 6 + 3 * Math.log(cell.n)),
+                    color: '#2c3e50', weight: 1, fillColor: '#3498db', fillOpacity: 0.7
+                });
+                if (cell.n > 1) {
+                    marker.bindTooltip(cell.n + ' points');
+                    marker.on('click', function(e) { map.setView(e.latlng, map.getZoom() + 2); });
+                }
+                batchClusters.addLayer(marker);
+            }
+        }
+        map.on('moveend', updateClusters);
+
+        // La vue est déplacée d'une page à l'autre : recalculer la taille de la carte
+        window.addEventListener('resize', function() { map.invalidateSize(); });
+    </script>
+</body>
+</html>
+"""
+
+# Chemin dans le schéma geotools://map -> (type MIME, contenu)
+RESOURCES = {
+    "/index.html": (b"text/html; charset=utf-8", MAP_HTML.encode("utf-8")),
+}
+
+# Fichiers de Leaflet livrés avec l'application, servis sous geotools://map/leaflet/
+LEAFLET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Ressource", "leaflet")
+
+MIME_TYPES = {".js": b"application/javascript", ".css": b"text/css", ".png": b"image/png"}
+
+_TILE_PATH = re.compile(r"^/(\d+)/(\d+)/(\d+)(?:\.png)?$")
+
+
+def static_resource(path):
+    """Retourne (type MIME, contenu) d'une ressource geotools://map, ou None si elle n'existe pas"""
+    resource = RESOURCES.get(path)
+    if resource is None and path.startswith("/leaflet/"):
+        file_path = os.path.normpath(os.path.join(LEAFLET_DIR, path[len("/leaflet/"):]))
+        mime_type = MIME_TYPES.get(os.path.splitext(file_path)[1])
+        if mime_type and file_path.startswith(LEAFLET_DIR + os.sep) and os.path.isfile(file_path):
+            with open(file_path, "rb") as f:
+                resource = (mime_type, f.read())
+            RESOURCES[path] = resource
+    return resource
+
+
+def reply_with(job, mime_type, content):
+    """Répond à une requête avec un contenu en mémoire"""
+    # Le tampon appartient à la requête et est détruit avec elle
+    buffer = QBuffer(job)
+    buffer.setData(QByteArray(content))
+    buffer.open(QIODevice.ReadOnly)
+    job.reply(mime_type, buffer)
+
+
+class MapSchemeHandler(QWebEngineUrlSchemeHandler):
+    """
+    Répond aux requêtes geotools:// : ressources de la page depuis la mémoire,
+    tuiles depuis le cache local ou, à défaut, depuis le serveur de tuiles
+    (téléchargement asynchrone, puis mise en cache).
+    """
+
+    def __init__(self, tile_cache=None, parent=None):
+        super().__init__(parent)
+        self.tile_cache = tile_cache or TileCache.default()
+        self.network = QNetworkAccessManager(self)
+
+    def requestStarted(self, job):
+        url = job.requestUrl()
+        if url.host() == "tiles":
+            match = _TILE_PATH.match(url.path())
+            if match:
+                self.request_tile(job, *(int(value) for value in match.groups()))
+                return
+        elif url.host() == "map":
+            resource = static_resource(url.path())
+            if resource is not None:
+                reply_with(job, *resource)
+                return
+        job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+
+    def request_tile(self, job, z, x, y):
+        data = self.tile_cache.get(z, x, y)
+        if data is not None:
+            reply_with(job, b"image/png", data)
+            return
+        tile_url = self.tile_cache.url(z, x, y)
+        if tile_url is None:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+            return
+        request = QNetworkRequest(QUrl(tile_url))
+        request.setRawHeader(b"User-Agent", USER_AGENT.encode())
+        reply = self.network.get(request)
+        reply.finished.connect(lambda: self.tile_downloaded(reply, job, z, x, y))
+
+    def tile_downloaded(self, reply, job, z, x, y):
+        ok = reply.error() == QNetworkReply.NoError
+        data = bytes(reply.readAll()) if ok else None
+        reply.deleteLater()
+        if ok:
+            self.tile_cache.put(z, x, y, data)
+        # La requête a pu être abandonnée entre-temps (carte déplacée)
+        if sip.isdeleted(job):
+            return
+        if ok:
+            reply_with(job, b"image/png", data)
+        else:
+            job.fail(QWebEngineUrlRequestJob.RequestFailed)
+
+
+_handler = None
+
+
+def install_map_scheme_handler(profile):
+    """Installe (une seule fois) le gestionnaire du schéma geotools:// sur un profil QtWebEngine"""
+    global _handler
+    if _handler is None:
+        _handler = MapSchemeHandler()
+        profile.installUrlSchemeHandler(MAP_SCHEME, _handler)
+    return _handler
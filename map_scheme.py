@@ -0,0 +1,22 @@
+# map_scheme.py
+"""
+Déclaration du schéma d'URL geotools:// de la carte (voir map_resources.py).
+
+Le schéma doit être déclaré avant la création de QApplication : ce module est
+donc importé au démarrage (main.py) et n'importe que QWebEngineUrlScheme. Seule
+la bibliothèque QtWebEngineCore est chargée ; QtWebEngineWidgets, le moteur
+Chromium, QtNetwork et le cache de tuiles ne le sont qu'à la première carte.
+"""
+from PyQt5.QtWebEngineCore import QWebEngineUrlScheme
+
+
+MAP_SCHEME = b"geotools"
+MAP_URL = "geotools://map/index.html"
+
+
+def register_map_scheme():
+    """Déclare le schéma geotools:// ; à appeler avant la création de QApplication"""
+    scheme = QWebEngineUrlScheme(MAP_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.CorsEnabled)
+    QWebEngineUrlScheme.registerScheme(scheme)
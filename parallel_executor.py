@@ -0,0 +1,211 @@
+# parallel_executor.py
+"""
+Exécution parallèle des calculs par lot sur un pool de processus.
+
+Les tableaux d'entrée et de sortie sont placés dans un bloc de mémoire partagée
+(multiprocessing.shared_memory) : les processus de travail n'échangent que le
+nom du bloc et les bornes de leur tranche, aucune ligne n'est sérialisée.
+Chaque tranche est écrite à sa place dans les tableaux de sortie, l'ordre des
+lignes est donc celui de l'entrée.
+
+Exemple :
+    with ParallelExecutor(workers=32) as executor:
+        phi2, lambda2, alpha21, status = executor.run(
+            "direct", phi1, lambda1, alpha12, s, method="puissant")
+        X, Y, Z = executor.run("geo_to_rect", lat, lon, h, ellipsoid_name="WGS84")
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from calculator_factory import DIRECT_METHODS, INVERSE_METHODS, direct_batch, inverse_batch
+from conversion_algorithms import CoordinateConverter, RECT_TO_GEO_METHODS
+from ellipsoid import get_ellipsoid
+
+
+# Opérations disponibles : nom -> (nombre d'entrées, nombre de sorties float64, code d'état)
+OPERATIONS = {
+    "direct": (4, 3, True),  # phi1, lambda1, alpha12, s -> phi2, lambda2, alpha21, status
+    "inverse": (4, 3, True),  # phi1, lambda1, phi2, lambda2 -> s, alpha12, alpha21, status
+    "geo_to_rect": (3, 3, False),  # lat, lon, h -> X, Y, Z
+    "rect_to_geo": (3, 4, False),  # X, Y, Z -> lat, lon, h, residual
+}
+
+# Méthodes acceptées et méthode par défaut de chaque opération
+_METHODS = {
+    "direct": (DIRECT_METHODS, "puissant"),
+    "inverse": (INVERSE_METHODS, "gauss"),
+    "geo_to_rect": ((None,), None),
+    "rect_to_geo": (RECT_TO_GEO_METHODS, "iterative"),
+}
+
+# Nombre maximal de lignes par tâche : borne la mémoire temporaire de chaque processus
+DEFAULT_CHUNK_ROWS = 250_000
+
+# En dessous de ce nombre de lignes, le calcul reste dans le processus appelant
+MIN_PARALLEL_ROWS = 100_000
+
+
+def _compute(operation, ellipsoid_name, options, inputs, outputs, status):
+    """Calcule une tranche et écrit les résultats dans les tableaux de sortie fournis"""
+    method = options.get("method")
+    if operation == "direct":
+        *results, status[...] = direct_batch(method, ellipsoid_name, *inputs)
+    elif operation == "inverse":
+        *results, status[...] = inverse_batch(method, ellipsoid_name, *inputs)
+    elif operation == "geo_to_rect":
+        CoordinateConverter.geo_to_rect_batch(*inputs, ellipsoid_name, out=tuple(outputs))
+        return
+    else:
+        results = CoordinateConverter.rect_to_geo_batch(
+            *inputs, ellipsoid_name, options.get("iterations", 5), out=tuple(outputs[:3]), method=method)
+    for output, result in zip(outputs, results):
+        if output is not result:
+            output[...] = result
+
+
+def _layout(buffer, operation, rows):
+    """Vues (entrées, sorties, état) sur un bloc de mémoire partagée"""
+    n_inputs, n_outputs, with_status = OPERATIONS[operation]
+    block = np.ndarray((n_inputs + n_outputs, rows), dtype=np.float64, buffer=buffer)
+    status = None
+    if with_status:
+        status = np.ndarray((rows,), dtype=np.uint8, buffer=buffer, offset=block.nbytes)
+    return block[:n_inputs], block[n_inputs:], status
+
+
+def _run_slice(name, operation, rows, start, stop, ellipsoid_name, options):
+    """Tâche exécutée par un processus de travail : calcule les lignes [start, stop)"""
+    shm = shared_memory.SharedMemory(name=name)
+    inputs = outputs = status = None
+    try:
+        inputs, outputs, status = _layout(shm.buf, operation, rows)
+        _compute(operation, ellipsoid_name, options,
+                 [column[start:stop] for column in inputs],
+                 [column[start:stop] for column in outputs],
+                 None if status is None else status[start:stop])
+    finally:
+        # Les vues doivent être libérées avant de fermer le bloc, y compris en cas d'erreur
+        inputs = outputs = status = None
+        shm.close()
+
+
+class ParallelExecutor:
+    """
+    Pool de processus réutilisable pour les calculs par lot.
+
+    Le pool est créé au premier appel parallèle et conservé jusqu'à close()
+    (ou la sortie du bloc with), ce qui évite de relancer les processus à
+    chaque lot. Les calculateurs sont mis en cache dans chaque processus par
+    calculator_factory.
+
+    Avec la méthode de démarrage « spawn » (Windows, macOS), seuls les
+    ellipsoïdes prédéfinis sont connus des processus de travail.
+    """
+
+    def __init__(self, workers=None, chunk_rows=DEFAULT_CHUNK_ROWS, min_parallel_rows=MIN_PARALLEL_ROWS):
+        """
+        Args:
+            workers: Nombre de processus (nombre de cœurs par défaut)
+            chunk_rows: Nombre maximal de lignes par tâche
+            min_parallel_rows: Taille de lot en dessous de laquelle on calcule sur place
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+        self.min_parallel_rows = min_parallel_rows
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Arrête les processus de travail"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def run(self, operation, *arrays, ellipsoid_name="Clarke 1880", method=None, iterations=5):
+        """
+        Exécute une opération par lot, répartie sur les processus de travail.
+
+        Args:
+            operation: "direct", "inverse", "geo_to_rect" ou "rect_to_geo"
+            arrays: Tableaux d'entrée de l'opération (mêmes unités que les méthodes
+                    par lot correspondantes), les scalaires étant diffusés
+            ellipsoid_name: Nom d'un ellipsoïde enregistré
+            method: Méthode de calcul ("puissant", "gauss", "vermeille"...) ;
+                    méthode par défaut de l'opération si absente
+            iterations: Nombre d'itérations de rect_to_geo (méthode itérative)
+
+        Returns:
+            Tuple des tableaux de sortie, dans l'ordre des lignes d'entrée :
+            (phi2, lambda2, alpha21, status), (s, alpha12, alpha21, status),
+            (X, Y, Z) ou (lat, lon, h, residual)
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Opération inconnue : {operation}")
+        n_inputs, n_outputs, with_status = OPERATIONS[operation]
+        if len(arrays) != n_inputs:
+            raise ValueError(f"L'opération {operation} attend {n_inputs} tableaux d'entrée")
+        methods, default_method = _METHODS[operation]
+        method = method or default_method
+        if method not in methods:
+            raise ValueError(f"Méthode inconnue pour l'opération {operation} : {method}")
+        options = {"method": method, "iterations": iterations}
+        # Erreur levée ici plutôt que dans chaque processus de travail
+        ellipsoid_name = get_ellipsoid(ellipsoid_name).name
+
+        arrays = np.broadcast_arrays(*(np.asarray(array, dtype=np.float64) for array in arrays))
+        shape = arrays[0].shape
+        rows = arrays[0].size
+
+        if self.workers == 1 or rows < self.min_parallel_rows:
+            outputs = [np.empty(shape) for _ in range(n_outputs)]
+            status = np.empty(shape, dtype=np.uint8) if with_status else None
+            _compute(operation, ellipsoid_name, options, arrays, outputs, status)
+            return (*outputs, status) if with_status else tuple(outputs)
+
+        size = (n_inputs + n_outputs) * rows * 8 + (rows if with_status else 0)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        inputs = outputs = status = None
+        try:
+            inputs, outputs, status = _layout(shm.buf, operation, rows)
+            for column, array in zip(inputs, arrays):
+                column[:] = array.ravel()
+
+            chunk = min(self.chunk_rows, math.ceil(rows / self.workers))
+            pool = self._get_pool()
+            futures = [pool.submit(_run_slice, shm.name, operation, rows, start,
+                                   min(start + chunk, rows), ellipsoid_name, options)
+                       for start in range(0, rows, chunk)]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+            results = [column.reshape(shape).copy() for column in outputs]
+            if with_status:
+                results.append(status.reshape(shape).copy())
+        finally:
+            inputs = outputs = status = None
+            shm.close()
+            shm.unlink()
+        return tuple(results)
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+
+def run_parallel(operation, *arrays, workers=None, **options):
+    """Exécute une opération par lot sur un pool de processus éphémère (voir ParallelExecutor.run)"""
+    with ParallelExecutor(workers) as executor:
+        return executor.run(operation, *arrays, **options)
@@ -0,0 +1,379 @@
+# point_file.py
+"""
+Format binaire de fichiers de points géographiques (lat, lon, h) ou
+rectangulaires (X, Y, Z), lu et écrit par numpy.memmap.
+
+Structure du fichier (petit-boutiste) :
+    - en-tête fixe de 64 octets (HEADER_DTYPE) : signature, version, type de
+      points, unités, nom de l'ellipsoïde et nombre de points ;
+    - tableau structuré de float64 (GEO_FILE_DTYPE ou RECT_FILE_DTYPE), un
+      enregistrement de 24 octets par point.
+
+Les conversions de fichier à fichier projettent les deux fichiers en mémoire
+et écrivent les résultats directement dans le fichier de sortie, bloc par
+bloc, sans passer par des tableaux intermédiaires de la taille du fichier.
+
+Exemple :
+    python point_file.py from-csv points.csv points.gpf --kind geo --ellipsoid WGS84
+    python point_file.py convert points.gpf ecef.gpf
+    python point_file.py info ecef.gpf
+    python point_file.py convert-csv points.csv ecef.csv --to rect --ellipsoid WGS84
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+import numpy as np
+from batch_runner import detect_delimiter, parse_columns, read_chunks, write_rows
+from conversion_algorithms import CoordinateConverter, RECT_TO_GEO_METHODS
+from ellipsoid import get_ellipsoid
+from utils import BatchStatus
+
+
+MAGIC = b"GEOPTS\r\n"
+VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u2"),
+    ("kind", "S4"),  # b"geo" ou b"rect"
+    ("angle_unit", "S4"),  # b"deg" ou b"rad" (points géographiques), vide sinon
+    ("length_unit", "S2"),  # b"m"
+    ("ellipsoid", "S32"),
+    ("count", "<u8"),
+    ("reserved", "S4"),
+])
+HEADER_SIZE = HEADER_DTYPE.itemsize  # 64 octets, les données restent alignées sur 8
+
+# Types des enregistrements dans le fichier (petit-boutiste explicite)
+GEO_FILE_DTYPE = np.dtype([("lat", "<f8"), ("lon", "<f8"), ("h", "<f8")])
+RECT_FILE_DTYPE = np.dtype([("X", "<f8"), ("Y", "<f8"), ("Z", "<f8")])
+FILE_DTYPES = {"geo": GEO_FILE_DTYPE, "rect": RECT_FILE_DTYPE}
+
+ANGLE_UNITS = ("deg", "rad")
+
+# Nombre de points convertis à la fois
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_CSV_CHUNK_ROWS = 100_000
+
+# Colonnes des fichiers CSV produits par iter_convert_csv, selon le type de points
+CSV_OUTPUT_COLUMNS = {"geo": ("lat", "lon", "h"), "rect": ("X", "Y", "Z")}
+
+# Avancement produit après chaque bloc par iter_convert_file et iter_convert_csv :
+#   points    nombre de points convertis depuis le début
+#   progress  avancement, dans l'unité de total (points pour un fichier de
+#             points, octets lus pour un CSV)
+#   total     valeur finale de progress (nombre de points, taille du CSV)
+#   residual  résidus du bloc en radians (rectangulaire → géographique),
+#             None pour géographique → rectangulaire
+ConversionProgress = namedtuple("ConversionProgress", ("points", "progress", "total", "residual"))
+
+
+class PointFileHeader:
+    """En-tête décodé d'un fichier de points"""
+
+    def __init__(self, kind, ellipsoid_name, count, angle_unit="deg", length_unit="m"):
+        if kind not in FILE_DTYPES:
+            raise ValueError(f"Type de points inconnu : {kind}")
+        if kind == "geo" and angle_unit not in ANGLE_UNITS:
+            raise ValueError(f"Unité d'angle inconnue : {angle_unit}")
+        self.kind = kind
+        self.ellipsoid_name = get_ellipsoid(ellipsoid_name).name
+        self.count = count
+        self.angle_unit = angle_unit if kind == "geo" else ""
+        self.length_unit = length_unit
+
+    def __repr__(self):
+        return (f"PointFileHeader(kind={self.kind!r}, ellipsoid_name={self.ellipsoid_name!r}, "
+                f"count={self.count!r}, angle_unit={self.angle_unit!r})")
+
+    @property
+    def dtype(self):
+        return FILE_DTYPES[self.kind]
+
+    def to_bytes(self):
+        header = np.zeros((), dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["kind"] = self.kind.encode()
+        header["angle_unit"] = self.angle_unit.encode()
+        header["length_unit"] = self.length_unit.encode()
+        header["ellipsoid"] = self.ellipsoid_name.encode("utf-8")
+        header["count"] = self.count
+        return header.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, path="<bytes>"):
+        if len(data) < HEADER_SIZE:
+            raise ValueError(f"Fichier de points invalide : {path}")
+        header = np.frombuffer(data[:HEADER_SIZE], dtype=HEADER_DTYPE)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError(f"Fichier de points invalide : {path}")
+        if header["version"] != VERSION:
+            raise ValueError(f"Version de fichier de points non prise en charge : {header['version']}")
+        return cls(header["kind"].decode(), header["ellipsoid"].decode("utf-8"), int(header["count"]),
+                   header["angle_unit"].decode(), header["length_unit"].decode())
+
+
+def read_header(path):
+    """Lit l'en-tête d'un fichier de points"""
+    with open(path, "rb") as handle:
+        return PointFileHeader.from_bytes(handle.read(HEADER_SIZE), path)
+
+
+def open_points(path, mode="r"):
+    """
+    Ouvre un fichier de points en projection mémoire.
+
+    Args:
+        path: Chemin du fichier
+        mode: "r" (lecture seule), "r+" (modification en place) ou "c" (copie à l'écriture)
+
+    Returns:
+        Tuple (header, points) : PointFileHeader et tableau structuré numpy.memmap
+    """
+    header = read_header(path)
+    if header.count == 0:
+        return header, np.empty(0, dtype=header.dtype)
+    return header, np.memmap(path, dtype=header.dtype, mode=mode, offset=HEADER_SIZE,
+                             shape=(header.count,))
+
+
+def create_points(path, kind, count, ellipsoid_name, angle_unit="deg"):
+    """
+    Crée un fichier de points de count enregistrements et le projette en mémoire
+    pour écriture (les valeurs sont initialement nulles).
+
+    Returns:
+        Tuple (header, points) comme open_points
+    """
+    header = PointFileHeader(kind, ellipsoid_name, count, angle_unit)
+    with open(path, "wb") as handle:
+        handle.write(header.to_bytes())
+        handle.truncate(HEADER_SIZE + count * header.dtype.itemsize)
+    return open_points(path, "r+")
+
+
+def write_points(path, points, kind, ellipsoid_name, angle_unit="deg"):
+    """
+    Écrit un tableau de points dans un fichier.
+
+    Args:
+        points: Tableau structuré (champs lat, lon, h ou X, Y, Z), par exemple
+                de type GEO_POINT_DTYPE ou RECT_POINT_DTYPE
+        kind: "geo" ou "rect"
+    """
+    header = PointFileHeader(kind, ellipsoid_name, len(points), angle_unit)
+    data = np.empty(len(points), dtype=header.dtype)
+    for name in header.dtype.names:
+        data[name] = points[name]
+    with open(path, "wb") as handle:
+        handle.write(header.to_bytes())
+        data.tofile(handle)
+    return header
+
+
+def iter_convert_file(input_path, output_path, method="iterative", iterations=5,
+                      chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Convertit un fichier de points bloc par bloc (voir convert_file).
+
+    Yields:
+        ConversionProgress après chaque bloc, avancement en nombre de points
+    """
+    if method not in RECT_TO_GEO_METHODS:
+        raise ValueError(f"Méthode de conversion inconnue : {method}")
+    header, source = open_points(input_path)
+    output_kind = "rect" if header.kind == "geo" else "geo"
+    _, target = create_points(output_path, output_kind, header.count, header.ellipsoid_name)
+
+    for begin in range(0, header.count, chunk_rows):
+        block = source[begin:begin + chunk_rows]
+        out = target[begin:begin + chunk_rows]
+        residual = None
+        if header.kind == "rect":
+            residual = CoordinateConverter.rect_to_geo_batch(
+                block["X"], block["Y"], block["Z"], header.ellipsoid_name, iterations, out=out, method=method)[3]
+        elif header.angle_unit == "rad":
+            CoordinateConverter.geo_to_rect_batch(np.degrees(block["lat"]), np.degrees(block["lon"]),
+                                                  block["h"], header.ellipsoid_name, out=out)
+        else:
+            CoordinateConverter.geo_to_rect_points(block, header.ellipsoid_name, out=out)
+        done = begin + len(block)
+        yield ConversionProgress(done, done, header.count, residual)
+
+    if isinstance(target, np.memmap):
+        target.flush()
+
+
+def convert_file(input_path, output_path, method="iterative", iterations=5,
+                 chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Convertit un fichier de points géographiques en fichier rectangulaire, ou
+    l'inverse, sur l'ellipsoïde indiqué dans l'en-tête du fichier d'entrée.
+
+    Les résultats sont écrits directement dans la projection mémoire du fichier
+    de sortie ; seuls les calculs intermédiaires d'un bloc sont alloués.
+
+    Args:
+        method, iterations: Méthode de rect_to_geo (ignorés pour geo → rect)
+        chunk_rows: Nombre de points convertis à la fois
+
+    Returns:
+        Tuple (header, seconds) : en-tête du fichier de sortie et durée en secondes
+    """
+    start = time.perf_counter()
+    for _ in iter_convert_file(input_path, output_path, method, iterations, chunk_rows):
+        pass
+    return read_header(output_path), time.perf_counter() - start
+
+
+def iter_convert_csv(input_path, output_path, output_kind, ellipsoid_name, method="iterative",
+                     iterations=5, delimiter=None, header=True, chunk_rows=DEFAULT_CSV_CHUNK_ROWS):
+    """
+    Convertit un fichier CSV de points vers un fichier CSV, bloc par bloc, en
+    écrivant chaque bloc dès qu'il est converti.
+
+    Entrée : lat, lon, h (angles en degrés décimaux ou DMS) si output_kind vaut
+    "rect", X, Y, Z sinon. Sortie : colonnes CSV_OUTPUT_COLUMNS[output_kind],
+    suivies du code BatchStatus de la ligne (INVALID_INPUT pour une ligne
+    illisible, NON_FINITE pour un résultat non fini).
+
+    Yields:
+        ConversionProgress après chaque bloc, avancement en octets lus
+    """
+    if output_kind not in FILE_DTYPES:
+        raise ValueError(f"Type de points inconnu : {output_kind}")
+    if method not in RECT_TO_GEO_METHODS:
+        raise ValueError(f"Méthode de conversion inconnue : {method}")
+    delimiter = delimiter or detect_delimiter(input_path)
+    size = os.path.getsize(input_path)
+    points = 0
+
+    with open(input_path, newline="", encoding="utf-8") as source, \
+            open(output_path, "w", newline="", encoding="utf-8") as target:
+        target.write(delimiter.join(CSV_OUTPUT_COLUMNS[output_kind] + ("status",)) + "\n")
+        for chunk in read_chunks(source, delimiter, chunk_rows, header):
+            columns, invalid = parse_columns(chunk, 3)
+            if output_kind == "rect" and invalid.any():
+                retry = np.flatnonzero(invalid)
+                columns[:, retry], invalid[retry] = parse_columns([chunk[i] for i in retry], 3, (0, 1), "dms")
+            residual = None
+            if output_kind == "rect":
+                results = CoordinateConverter.geo_to_rect_batch(*columns, ellipsoid_name)
+            else:
+                *results, residual = CoordinateConverter.rect_to_geo_batch(
+                    *columns, ellipsoid_name, iterations, method=method)
+            status = np.zeros(len(chunk), dtype=np.uint8)
+            status[~np.isfinite(np.vstack(results)).all(axis=0)] = BatchStatus.NON_FINITE
+            status[invalid] = BatchStatus.INVALID_INPUT
+            write_rows(target, results, status, delimiter, precision=4 if output_kind == "rect" else 9)
+            points += len(chunk)
+            # Position approximative (lecture anticipée du tampon), suffisante pour l'avancement
+            yield ConversionProgress(points, min(source.buffer.tell(), size), size, residual)
+
+
+def csv_to_points(csv_path, output_path, kind, ellipsoid_name, angle_format="decimal",
+                  delimiter=None, header=True, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Convertit un fichier CSV (lat, lon, h ou X, Y, Z) en fichier de points.
+
+    Le CSV est lu par blocs et ajouté au fichier binaire au fur et à mesure ;
+    le nombre de points est inscrit dans l'en-tête à la fin. Les lignes
+    illisibles sont conservées sous forme de NaN pour garder la correspondance
+    des numéros de ligne.
+
+    Args:
+        kind: "geo" (angles en degrés décimaux ou DMS selon angle_format) ou "rect"
+
+    Returns:
+        Tuple (header, invalid) : en-tête écrit et nombre de lignes illisibles
+    """
+    dtype = PointFileHeader(kind, ellipsoid_name, 0).dtype
+    angle_columns = (0, 1) if kind == "geo" else ()
+    delimiter = delimiter or detect_delimiter(csv_path)
+    count = invalid_rows = 0
+
+    with open(csv_path, newline="", encoding="utf-8") as source, open(output_path, "wb") as target:
+        target.write(bytes(HEADER_SIZE))
+        for chunk in read_chunks(source, delimiter, chunk_rows, header):
+            columns, invalid = parse_columns(chunk, 3, angle_columns,
+                                             angle_format if kind == "geo" else "decimal")
+            data = np.empty(len(chunk), dtype=dtype)
+            for name, column in zip(dtype.names, columns):
+                data[name] = column
+            data.tofile(target)
+            count += len(chunk)
+            invalid_rows += int(invalid.sum())
+
+        file_header = PointFileHeader(kind, ellipsoid_name, count)
+        target.seek(0)
+        target.write(file_header.to_bytes())
+    return file_header, invalid_rows
+
+
+def build_parser():
+    """Analyseur des arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Fichiers binaires de points géographiques ou rectangulaires")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    from_csv = subparsers.add_parser("from-csv", help="Convertit un CSV en fichier de points")
+    from_csv.add_argument("input", help="Fichier CSV/TSV (lat, lon, h ou X, Y, Z)")
+    from_csv.add_argument("output", help="Fichier de points")
+    from_csv.add_argument("--kind", choices=tuple(FILE_DTYPES), required=True)
+    from_csv.add_argument("--ellipsoid", default="Clarke 1880")
+    from_csv.add_argument("--angles", choices=("decimal", "dms"), default="decimal")
+    from_csv.add_argument("--delimiter")
+    from_csv.add_argument("--no-header", action="store_true")
+
+    convert = subparsers.add_parser("convert", help="Conversion géographique ↔ rectangulaire")
+    convert.add_argument("input")
+    convert.add_argument("output")
+    convert.add_argument("--method", choices=RECT_TO_GEO_METHODS, default="iterative")
+    convert.add_argument("--iterations", type=int, default=5)
+    convert.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+
+    convert_csv = subparsers.add_parser("convert-csv", help="Conversion géographique ↔ rectangulaire de CSV à CSV")
+    convert_csv.add_argument("input", help="Fichier CSV/TSV (lat, lon, h ou X, Y, Z)")
+    convert_csv.add_argument("output")
+    convert_csv.add_argument("--to", dest="output_kind", choices=tuple(FILE_DTYPES), required=True)
+    convert_csv.add_argument("--ellipsoid", default="Clarke 1880")
+    convert_csv.add_argument("--method", choices=RECT_TO_GEO_METHODS, default="iterative")
+    convert_csv.add_argument("--iterations", type=int, default=5)
+    convert_csv.add_argument("--delimiter")
+    convert_csv.add_argument("--no-header", action="store_true")
+
+    info = subparsers.add_parser("info", help="Affiche l'en-tête d'un fichier de points")
+    info.add_argument("input")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "from-csv":
+        header, invalid = csv_to_points(args.input, args.output, args.kind, args.ellipsoid,
+                                        args.angles, args.delimiter, not args.no_header)
+        print(f"{header.count} points écrits, {invalid} lignes illisibles", file=sys.stderr)
+    elif args.command == "convert":
+        header, seconds = convert_file(args.input, args.output, args.method, args.iterations,
+                                       args.chunk_rows)
+        rate = header.count / seconds if seconds > 0 else float("inf")
+        print(f"{header.count} points convertis en {seconds:.2f} s ({rate:.0f} points/s)",
+              file=sys.stderr)
+    elif args.command == "convert-csv":
+        start = time.perf_counter()
+        points = 0
+        for step in iter_convert_csv(args.input, args.output, args.output_kind, args.ellipsoid,
+                                     args.method, args.iterations, args.delimiter, not args.no_header):
+            points = step.points
+        seconds = time.perf_counter() - start
+        rate = points / seconds if seconds > 0 else float("inf")
+        print(f"{points} points convertis en {seconds:.2f} s ({rate:.0f} points/s)", file=sys.stderr)
+    else:
+        print(read_header(args.input))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
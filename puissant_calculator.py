@@ -1,23 +1,26 @@
 # puissant_calculator.py
 import math
-from ellipsoid import Ellipsoid
+import numpy as np
+from ellipsoid import get_ellipsoid
 from utils import GeodesicUtils
 
 
 class PuissantCalculator:
-    def __init__(self, ellipsoid_name="Clarke 1880"):
+    def __init__(self, ellipsoid_name="Clarke 1880", radii_table=None):
         """
         Initialize the Puissant calculator with the chosen ellipsoid
+
+        radii_table: optional radii_table.RadiiTable used by direct_problem_batch
+        in place of the closed forms of M and N
         """
-        # Select base ellipsoid
-        if ellipsoid_name == "Clarke 1880":
-            self.ellipsoid = Ellipsoid.get_derived_params(Ellipsoid.CLARKE_1880)
-        else:
-            self.ellipsoid = Ellipsoid.get_derived_params(Ellipsoid.WGS84)
+        # Registered ellipsoid, derived parameters already computed
+        self.ellipsoid = get_ellipsoid(ellipsoid_name)
 
         # Store frequently used parameters
-        self.e_squared = self.ellipsoid['e_squared']  # Using e_squared instead of e2
-        self.a = self.ellipsoid['a']
+        self.e_squared = self.ellipsoid.e_squared  # Using e_squared instead of e2
+        self.a = self.ellipsoid.a
+        self.a_one_minus_e_squared = self.a * self.ellipsoid.one_minus_e_squared
+        self.radii_table = radii_table
 
     def calculate_N(self, phi):
         """Calculate the radius of curvature in the prime vertical"""
@@ -25,7 +28,7 @@ class PuissantCalculator:
 
     def calculate_M(self, phi):
         """Calculate the meridian radius of curvature"""
-        return self.a * (1 - self.e_squared) / (1 - self.e_squared * math.sin(phi) ** 2) ** (3 / 2)
+        return self.a_one_minus_e_squared / (1 - self.e_squared * math.sin(phi) ** 2) ** (3 / 2)
 
     def direct_problem(self, phi1, lambda1, alpha12, S):
         """
@@ -78,10 +81,9 @@ class PuissantCalculator:
         # 9. Calcul de l'azimut retour selon la formule 4.21
         phi_m = (phi1 + phi2) / 2
 
-        # Calcul de Δα en utilisant la formule de cotangente
-        cotg_delta_lambda_2 = math.cos(delta_lambda / 2) / math.sin(delta_lambda / 2)
-        cotg_delta_alpha_2 = (math.cos(delta_phi / 2) / math.sin(phi_m)) * cotg_delta_lambda_2
-        delta_alpha = 2 * math.atan(1 / cotg_delta_alpha_2)
+        # Calcul de Δα par la formule de cotangente, écrite sous la forme
+        # tg(Δα/2) = sin φm · tg(Δλ/2) / cos(Δφ/2) qui reste définie pour Δλ = 0
+        delta_alpha = 2 * math.atan(math.sin(phi_m) * math.tan(delta_lambda / 2) / math.cos(delta_phi / 2))
 
         # Calcul de l'azimut de retour
         alpha21 = alpha12 - math.pi + delta_alpha  # On utilise - pi (180°)
@@ -89,6 +91,85 @@ class PuissantCalculator:
         # Normalisation de l'azimut entre 0 et 2π
         alpha21 = alpha21 % (2 * math.pi)
         return phi2, lambda2, alpha21
+
+    def direct_problem_batch(self, phi1, lambda1, alpha12, S):
+        """
+        Version vectorisée de direct_problem : chaque terme de Puissant est
+        calculé sur des tableaux NumPy entiers au lieu d'une ligne à la fois.
+
+        Parameters:
+        phi1: latitudes initiales (radians, tableau)
+        lambda1: longitudes initiales (radians, tableau)
+        alpha12: azimuts initiaux (radians, tableau)
+        S: distances (mètres, tableau)
+
+        Returns:
+        phi2, lambda2, alpha21: tableaux des coords finales et azimuts retour (radians)
+        """
+        phi1, lambda1, alpha12, S = np.broadcast_arrays(
+            *(np.asarray(v, dtype=np.float64) for v in (phi1, lambda1, alpha12, S))
+        )
+        e_squared = self.e_squared
+
+        # Termes trigonométriques calculés une seule fois par ligne
+        sin_phi1 = np.sin(phi1)
+        cos_phi1 = np.cos(phi1)
+        tan_phi1 = sin_phi1 / cos_phi1
+        sin_alpha = np.sin(alpha12)
+        cos_alpha = np.cos(alpha12)
+        sin2_alpha = sin_alpha ** 2
+
+        # 1. Rayons de courbure au point P1 (W1² = 1 - e² sin²φ1 partagé par M1 et N1)
+        if self.radii_table is None:
+            W1_squared = 1 - e_squared * sin_phi1 ** 2
+            N1 = self.a / np.sqrt(W1_squared)
+            M1 = self.a_one_minus_e_squared / (W1_squared * np.sqrt(W1_squared))
+        else:
+            M1, N1 = self.radii_table.radii(phi1)
+
+        # 2. Coefficients de Puissant
+        B = 1 / M1
+        D = tan_phi1 / (2 * M1 * N1)
+        E = (1 + 3 * tan_phi1 ** 2) / (6 * N1 ** 2)
+
+        # 3. Terme h
+        h = (S / M1) * cos_alpha
+
+        # 4. Δφ (formule 4.19)
+        S_squared = S ** 2
+        delta_phi = (S * cos_alpha * B -
+                     S_squared * sin2_alpha * D -
+                     h * S_squared * sin2_alpha * E)
+
+        # 5. Latitude du point final
+        phi2 = phi1 + delta_phi
+
+        # 6. N2 et 1/(N2 cos φ2) au point P2
+        if self.radii_table is None:
+            cos_phi2 = np.cos(phi2)
+            N2 = self.a / np.sqrt(1 - e_squared * np.sin(phi2) ** 2)
+            inv_N2_cos_phi2 = 1 / (N2 * cos_phi2)
+        else:
+            N2, inv_N2_cos_phi2 = self.radii_table.prime_vertical(phi2)
+
+        # 7. Δλ (formule 4.20), avec 1/cos²φ2 = (N2 / (N2 cos φ2))²
+        delta_lambda = S * inv_N2_cos_phi2 * sin_alpha * (
+                1 - (S_squared / (6 * N2 ** 2)) * (1 - sin2_alpha * (N2 * inv_N2_cos_phi2) ** 2)
+        )
+
+        # 8. Longitude finale
+        lambda2 = lambda1 + delta_lambda
+
+        # 9. Azimut retour (formule 4.21), sous la même forme que direct_problem :
+        # tg(Δα/2) = sin φm · tg(Δλ/2) / cos(Δφ/2), définie pour Δλ = 0
+        phi_m = (phi1 + phi2) / 2
+        delta_alpha = 2 * np.arctan(np.sin(phi_m) * np.tan(delta_lambda / 2) / np.cos(delta_phi / 2))
+
+        alpha21 = np.mod(alpha12 - math.pi + delta_alpha, 2 * math.pi)
+        # np.mod arrondit un angle négatif infime à 2π : ramené à 0
+        alpha21 = np.where(alpha21 == 2 * math.pi, 0.0, alpha21)
+        return phi2, lambda2, alpha21
+
     def inverse_problem(self, phi1, lambda1, phi2, lambda2):
         """
         Solve the inverse geodetic problem using Puissant's formulas
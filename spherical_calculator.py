@@ -1,7 +1,8 @@
 #spherical_calculator.py
 import math
-from ellipsoid import Ellipsoid
-from utils import GeodesicUtils
+import numpy as np
+from ellipsoid import get_ellipsoid
+from utils import GeodesicUtils, BatchStatus
 
 
 class SphericalCalculator:
@@ -11,19 +12,26 @@ class SphericalCalculator:
         Initialise le calculateur sphérique avec l'ellipsoïde choisi
         pour obtenir le rayon moyen
         """
-        # Choisir l'ellipsoïde de base
-        base_ellipsoid = Ellipsoid.CLARKE_1880 if ellipsoid_name == "Clarke 1880" else Ellipsoid.WGS84
-
-        # Obtenir l'ellipsoïde avec les paramètres dérivés
-        self.ellipsoid = Ellipsoid.get_derived_params(base_ellipsoid)
+        # Obtenir l'ellipsoïde enregistré (paramètres dérivés déjà calculés)
+        self.ellipsoid = get_ellipsoid(ellipsoid_name)
 
         # Obtenir le rayon moyen
-        self.R = self.ellipsoid['R_mean']
+        self.R = self.ellipsoid.R_mean
 
     def check_distance(self, s: float) -> None:
         if s > 200000:  # 200 km
             raise ValueError("La distance doit être inférieure à 200 km pour le calcul sur sphère")
 
+    def check_distance_batch(self, s: np.ndarray) -> np.ndarray:
+        """
+        Équivalent vectorisé de check_distance : au lieu de lever une ValueError,
+        retourne un code d'état par ligne (BatchStatus.DISTANCE_LIMIT_EXCEEDED
+        pour les distances supérieures à 200 km)
+        """
+        status = np.zeros(np.shape(s), dtype=np.uint8)
+        status[s > 200000] |= BatchStatus.DISTANCE_LIMIT_EXCEEDED
+        return status
+
     def direct_problem(self, phi1: float, lambda1: float, alpha12: float, s: float) -> tuple:
         """
         Résout le problème direct sur la sphère
@@ -46,20 +54,67 @@ class SphericalCalculator:
         )
         lambda2 = lambda1 + delta_lambda
 
-        # Calcul de α21
+        # Calcul de α21, comme dans inverse_problem (à partir de Δλ et φ2)
         alpha21 = math.atan2(
-            math.sin(alpha12),
-            math.cos(phi1) * math.tan(phi2) - math.sin(phi1) * math.cos(alpha12)
-        ) + math.pi
+            -math.sin(delta_lambda),
+            math.tan(phi1) * math.cos(phi2) - math.sin(phi2) * math.cos(delta_lambda)
+        )
+        alpha21 %= 2 * math.pi
 
         return phi2, lambda2, alpha21
 
+    def direct_problem_batch(self, phi1, lambda1, alpha12, s) -> tuple:
+        """
+        Version vectorisée de direct_problem sur des tableaux NumPy
+        Paramètres en radians, distances en mètres
+
+        Les lignes dont la distance dépasse 200 km sont calculées quand même
+        et signalées dans le tableau d'état retourné.
+
+        Retourne (phi2, lambda2, alpha21, status)
+        """
+        phi1, lambda1, alpha12, s = np.broadcast_arrays(
+            *(np.asarray(v, dtype=np.float64) for v in (phi1, lambda1, alpha12, s))
+        )
+        status = self.check_distance_batch(s)
+
+        # Distance angulaire
+        sigma = s / self.R
+        sin_sigma = np.sin(sigma)
+        cos_sigma = np.cos(sigma)
+        sin_phi1 = np.sin(phi1)
+        cos_phi1 = np.cos(phi1)
+        sin_alpha12 = np.sin(alpha12)
+        cos_alpha12 = np.cos(alpha12)
+
+        # Calcul de φ2
+        sin_phi2 = sin_phi1 * cos_sigma + cos_phi1 * sin_sigma * cos_alpha12
+        phi2 = np.arcsin(np.clip(sin_phi2, -1.0, 1.0))
+
+        # Calcul de Δλ
+        delta_lambda = np.arctan2(sin_sigma * sin_alpha12,
+                                  cos_phi1 * cos_sigma - sin_phi1 * sin_sigma * cos_alpha12)
+        lambda2 = lambda1 + delta_lambda
+
+        # Calcul de α21, comme dans inverse_problem (à partir de Δλ et φ2)
+        alpha21 = np.arctan2(-np.sin(delta_lambda),
+                             np.tan(phi1) * np.cos(phi2) - np.sin(phi2) * np.cos(delta_lambda))
+        alpha21 = np.mod(alpha21, 2 * math.pi)
+        # np.mod arrondit un angle négatif infime à 2π : ramené à 0
+        alpha21 = np.where(alpha21 == 2 * math.pi, 0.0, alpha21)
+
+        status[~(np.isfinite(phi2) & np.isfinite(lambda2) & np.isfinite(alpha21))] |= BatchStatus.NON_FINITE
+        return phi2, lambda2, alpha21, status
+
     def inverse_problem(self, phi1, lambda1, phi2, lambda2):
         """
         Calcule selon les formules du cours :
         - Distance : cos(σ12) = sin(φ1)sin(φ2) + cos(φ1)cos(φ2)cos(Δλ)
         - Azimut direct : cot(A12) = [tan(φ2)cos(φ1)/sin(Δλ)] - sin(φ1)cot(Δλ)
         - Azimut retour : cot(A21) = -[tan(φ1)cos(φ2)/sin(Δλ)] + sin(φ2)cot(Δλ)
+
+        Les azimuts sont calculés par atan2 sur le numérateur et le dénominateur
+        de la cotangente, ce qui donne le bon quadrant, dans [0, 2π).
         """
         # Calcul de la distance
         cos_sigma = math.sin(phi1) * math.sin(phi2) + \
@@ -70,14 +125,52 @@ class SphericalCalculator:
         # Différence de longitude
         delta_lambda = lambda2 - lambda1
 
-        # Azimut direct A12
-        cot_A12 = (math.tan(phi2) * math.cos(phi1)) / math.sin(delta_lambda) - \
-                  math.sin(phi1) / math.tan(delta_lambda)
-        alpha12 = math.atan(1 / cot_A12)
+        # Azimut direct A12 : cot(A12) = [tan(φ2)cos(φ1) - sin(φ1)cos(Δλ)] / sin(Δλ)
+        alpha12 = math.atan2(math.sin(delta_lambda),
+                             math.tan(phi2) * math.cos(phi1) - math.sin(phi1) * math.cos(delta_lambda))
+        alpha12 %= 2 * math.pi
 
-        # Azimut retour A21
-        cot_A21 = -(math.tan(phi1) * math.cos(phi2)) / math.sin(delta_lambda) + \
-                  math.sin(phi2) / math.tan(delta_lambda)
-        alpha21 = math.atan(1 / cot_A21)
+        # Azimut retour A21 : cot(A21) = [tan(φ1)cos(φ2) - sin(φ2)cos(Δλ)] / -sin(Δλ)
+        alpha21 = math.atan2(-math.sin(delta_lambda),
+                             math.tan(phi1) * math.cos(phi2) - math.sin(phi2) * math.cos(delta_lambda))
+        alpha21 %= 2 * math.pi
 
-        return s, alpha12, alpha21
\ No newline at end of file
+        return s, alpha12, alpha21
+
+    def inverse_problem_batch(self, phi1, lambda1, phi2, lambda2):
+        """
+        Version vectorisée de inverse_problem sur des tableaux NumPy
+
+        Les paires plus éloignées que 200 km sont signalées dans le tableau
+        d'état au lieu d'être rejetées, ce qui permet de présélectionner des
+        millions de paires en quelques opérations vectorielles.
+
+        Retourne (s, alpha12, alpha21, status)
+        """
+        phi1, lambda1, phi2, lambda2 = np.broadcast_arrays(
+            *(np.asarray(v, dtype=np.float64) for v in (phi1, lambda1, phi2, lambda2))
+        )
+        delta_lambda = lambda2 - lambda1
+        sin_phi1 = np.sin(phi1)
+        cos_phi1 = np.cos(phi1)
+        sin_phi2 = np.sin(phi2)
+        cos_phi2 = np.cos(phi2)
+        sin_delta_lambda = np.sin(delta_lambda)
+        cos_delta_lambda = np.cos(delta_lambda)
+
+        # Distance (cos σ12 borné pour absorber les erreurs d'arrondi)
+        cos_sigma = sin_phi1 * sin_phi2 + cos_phi1 * cos_phi2 * cos_delta_lambda
+        s = np.arccos(np.clip(cos_sigma, -1.0, 1.0)) * self.R
+
+        # Azimuts par atan2 (bon quadrant, dans [0, 2π)), comme inverse_problem
+        alpha12 = np.arctan2(sin_delta_lambda, np.tan(phi2) * cos_phi1 - sin_phi1 * cos_delta_lambda)
+        # (np.mod arrondit un angle négatif infime à 2π : ramené à 0)
+        alpha12 %= 2 * np.pi
+        alpha12 = np.where(alpha12 == 2 * np.pi, 0.0, alpha12)
+        alpha21 = np.arctan2(-sin_delta_lambda, np.tan(phi1) * cos_phi2 - sin_phi2 * cos_delta_lambda)
+        alpha21 %= 2 * np.pi
+        alpha21 = np.where(alpha21 == 2 * np.pi, 0.0, alpha21)
+
+        status = self.check_distance_batch(s)
+        status[~(np.isfinite(s) & np.isfinite(alpha12) & np.isfinite(alpha21))] |= BatchStatus.NON_FINITE
+        return s, alpha12, alpha21, status
\ No newline at end of file
@@ -0,0 +1,72 @@
+# test_conversion_algorithms.py
+import numpy as np
+import pytest
+from conversion_algorithms import GEO_POINT_DTYPE, RECT_POINT_DTYPE, RECT_TO_GEO_METHODS, CoordinateConverter
+
+RNG = np.random.default_rng(4)
+LAT = RNG.uniform(-89, 89, (3, 4))
+LON = RNG.uniform(-180, 180, (3, 4))
+H = RNG.uniform(-500, 9000, (3, 4))
+
+# Entrées scalaire, 1-D, 2-D et transposée (non contiguë)
+SHAPES = {
+    "scalar": lambda a: a[0, 0],
+    "1d": lambda a: a[0],
+    "2d": lambda a: a,
+    "transposed": lambda a: a.T,
+}
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_geo_to_rect_batch_matches_scalar(shape):
+    inputs = [SHAPES[shape](a) for a in (LAT, LON, H)]
+    X, Y, Z = CoordinateConverter.geo_to_rect_batch(*inputs, "WGS84")
+    assert X.shape == np.shape(inputs[0])
+    for index in np.ndindex(X.shape):
+        expected = CoordinateConverter.geo_to_rect(*(float(np.asarray(a)[index]) for a in inputs), "WGS84")
+        assert (X[index], Y[index], Z[index]) == pytest.approx(expected, abs=1e-6)
+
+
+def test_geo_to_rect_batch_broadcasts_scalar_height():
+    X, Y, Z = CoordinateConverter.geo_to_rect_batch(LAT.T, LON.T, 120.0, "WGS84")
+    expected = CoordinateConverter.geo_to_rect_batch(LAT.T, LON.T, np.full(LAT.T.shape, 120.0), "WGS84")
+    for a, b in zip((X, Y, Z), expected):
+        assert np.array_equal(a, b)
+
+
+@pytest.mark.parametrize("method", RECT_TO_GEO_METHODS)
+@pytest.mark.parametrize("shape", SHAPES)
+def test_rect_to_geo_batch_matches_scalar(shape, method):
+    inputs = [SHAPES[shape](a) for a in CoordinateConverter.geo_to_rect_batch(LAT, LON, H, "WGS84")]
+    lat, lon, h, residual = CoordinateConverter.rect_to_geo_batch(*inputs, "WGS84", method=method)
+    assert lat.shape == np.shape(inputs[0])
+    assert np.all(residual < 1e-12)
+    for index in np.ndindex(lat.shape):
+        expected = CoordinateConverter.rect_to_geo(*(float(np.asarray(a)[index]) for a in inputs), "WGS84",
+                                                   method=method)
+        assert lat[index] == pytest.approx(expected[0], abs=1e-9)
+        assert lon[index] == pytest.approx(expected[1], abs=1e-9)
+        assert h[index] == pytest.approx(expected[2], abs=1e-4)
+
+
+def test_points_round_trip_and_non_finite_rows():
+    points = np.empty(5, dtype=GEO_POINT_DTYPE)
+    points["lat"], points["lon"], points["h"] = np.linspace(-60, 60, 5), 10.0, 50.0
+    points["lat"][2] = np.nan
+    rect = CoordinateConverter.geo_to_rect_points(points, "Clarke 1880")
+    geo, residual = CoordinateConverter.rect_to_geo_points(rect, "Clarke 1880")
+    finite = np.isfinite(points["lat"])
+    assert np.allclose(geo["lat"][finite], points["lat"][finite], atol=1e-9)
+    assert np.allclose(geo["h"][finite], 50.0, atol=1e-4)
+    assert np.isnan(geo["lat"][2]) and np.isnan(residual[2])
+
+
+@pytest.mark.parametrize("method", RECT_TO_GEO_METHODS)
+def test_rect_to_geo_points_method(method):
+    rect = np.empty(LAT.size, dtype=RECT_POINT_DTYPE)
+    CoordinateConverter.geo_to_rect_batch(LAT.ravel(), LON.ravel(), H.ravel(), "WGS84", out=rect)
+    geo, residual = CoordinateConverter.rect_to_geo_points(rect, "WGS84", method=method)
+    expected = CoordinateConverter.rect_to_geo_batch(rect["X"], rect["Y"], rect["Z"], "WGS84", method=method)
+    for name, values in zip(("lat", "lon", "h"), expected):
+        assert np.array_equal(geo[name], values)
+    assert np.array_equal(residual, expected[3])
@@ -0,0 +1,26 @@
+# test_densify.py
+import numpy as np
+import pytest
+from densify import DENSIFY_METHODS, densify
+from utils import BatchStatus
+
+
+@pytest.mark.parametrize("method", DENSIFY_METHODS)
+@pytest.mark.parametrize("end", [(39.0, -1.0), (41.0, -1.0), (39.0, 1.0), (41.0, 1.0)])
+def test_midpoint_lies_between_endpoints(method, end):
+    # Lignes dans les quatre quadrants, dont le sud-ouest et le nord-ouest
+    lat2, lon2 = end
+    lat, lon, offsets, status = densify(40.0, 0.0, lat2, lon2, method=method, tolerance=1.0)
+    assert status.tolist() == [0]
+    assert len(lat) > 2
+    middle = len(lat) // 2
+    assert min(40.0, lat2) < lat[middle] < max(40.0, lat2)
+    assert min(0.0, lon2) < lon[middle] < max(0.0, lon2)
+    assert np.all(np.abs(np.diff(lat)) <= abs(lat2 - 40.0))
+
+
+def test_spherical_long_line_is_densified_and_flagged():
+    lat, lon, offsets, status = densify(40.0, 0.0, 30.0, -20.0, method="spherical")
+    assert status[0] & BatchStatus.DISTANCE_LIMIT_EXCEEDED
+    assert offsets[1] > 2
+    assert np.all(np.diff(lat) < 0) and np.all(np.diff(lon) < 0)
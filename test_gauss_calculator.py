@@ -0,0 +1,64 @@
+# test_gauss_calculator.py
+import math
+import numpy as np
+import pytest
+from gauss_calculator import GaussCalculator
+from radii_table import get_radii_table
+from utils import BatchStatus
+
+RNG = np.random.default_rng(2)
+PHI1 = np.radians(RNG.uniform(-70, 70, (3, 4)))
+LAMBDA1 = np.radians(RNG.uniform(-180, 180, (3, 4)))
+PHI2 = PHI1 + np.radians(RNG.uniform(-0.5, 0.5, (3, 4)))
+LAMBDA2 = LAMBDA1 + np.radians(RNG.uniform(-0.5, 0.5, (3, 4)))
+
+# Entrées scalaire, 1-D, 2-D et transposée (non contiguë)
+SHAPES = {
+    "scalar": lambda a: a[0, 0],
+    "1d": lambda a: a[0],
+    "2d": lambda a: a,
+    "transposed": lambda a: a.T,
+}
+
+
+def angle_difference(a, b):
+    return np.abs((np.asarray(a) - np.asarray(b) + math.pi) % (2 * math.pi) - math.pi)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_inverse_batch_matches_scalar(shape):
+    calculator = GaussCalculator()
+    inputs = [SHAPES[shape](a) for a in (PHI1, LAMBDA1, PHI2, LAMBDA2)]
+    s, alpha12, alpha21, status = calculator.inverse_problem_batch(*inputs)
+    assert np.shape(s) == np.shape(inputs[0])
+    assert np.all(status == BatchStatus.OK)
+    for index in np.ndindex(np.shape(s)):
+        expected = calculator.inverse_problem(*(float(np.asarray(a)[index]) for a in inputs))
+        assert np.asarray(s)[index] == pytest.approx(expected[0], rel=1e-12)
+        assert angle_difference(np.asarray(alpha12)[index], expected[1]) < 1e-12
+        assert angle_difference(np.asarray(alpha21)[index], expected[2]) < 1e-12
+
+
+def test_radii_table_matches_closed_forms():
+    exact = GaussCalculator().inverse_problem_batch(PHI1.T, LAMBDA1.T, PHI2.T, LAMBDA2.T)
+    table = GaussCalculator(radii_table=get_radii_table()).inverse_problem_batch(PHI1.T, LAMBDA1.T, PHI2.T, LAMBDA2.T)
+    assert np.allclose(exact[0], table[0], rtol=1e-9)
+    assert np.all(angle_difference(exact[1], table[1]) < 1e-9)
+    assert np.array_equal(exact[3], table[3])
+
+
+def test_status_flags_match_scalar_validation():
+    calculator = GaussCalculator()
+    rows = np.radians([
+        [-51.18387696, -174.01385974, -70.30507575, -10.93512973],  # azimut incohérent
+        [33.5, -7.6, 33.5, -7.6],  # points confondus
+        [33.5, -7.6, 33.6, -7.5],
+    ])
+    s, alpha12, alpha21, status = calculator.inverse_problem_batch(*rows.T)
+    assert status[0] & BatchStatus.AZIMUTH_INCONSISTENT
+    assert status[1] & BatchStatus.DISTANCE_OUT_OF_RANGE
+    assert status[1] & BatchStatus.NON_FINITE
+    assert status[2] == BatchStatus.OK
+    for row in rows[:2]:
+        with pytest.raises((AssertionError, ArithmeticError)):
+            calculator.inverse_problem(*map(float, row))
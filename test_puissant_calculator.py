@@ -0,0 +1,59 @@
+# test_puissant_calculator.py
+import math
+import numpy as np
+import pytest
+from calculator_factory import direct_batch
+from puissant_calculator import PuissantCalculator
+from radii_table import get_radii_table
+from utils import BatchStatus
+
+RNG = np.random.default_rng(1)
+PHI1 = np.radians(RNG.uniform(-70, 70, (3, 4)))
+LAMBDA1 = np.radians(RNG.uniform(-180, 180, (3, 4)))
+ALPHA12 = np.radians(RNG.uniform(0, 360, (3, 4)))
+S = RNG.uniform(1e3, 1e5, (3, 4))
+
+# Entrées scalaire, 1-D, 2-D et transposée (non contiguë)
+SHAPES = {
+    "scalar": lambda a: a[0, 0],
+    "1d": lambda a: a[0],
+    "2d": lambda a: a,
+    "transposed": lambda a: a.T,
+}
+
+
+def angle_difference(a, b):
+    return np.abs((np.asarray(a) - np.asarray(b) + math.pi) % (2 * math.pi) - math.pi)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_direct_batch_matches_scalar(shape):
+    calculator = PuissantCalculator()
+    inputs = [SHAPES[shape](a) for a in (PHI1, LAMBDA1, ALPHA12, S)]
+    phi2, lambda2, alpha21 = calculator.direct_problem_batch(*inputs)
+    assert phi2.shape == np.shape(inputs[0])
+    assert np.all((alpha21 >= 0) & (alpha21 < 2 * math.pi))
+    for index in np.ndindex(phi2.shape):
+        expected = calculator.direct_problem(*(float(np.asarray(a)[index]) for a in inputs))
+        assert phi2[index] == pytest.approx(expected[0], abs=1e-12)
+        assert angle_difference(lambda2[index], expected[1]) < 1e-12
+        assert angle_difference(alpha21[index], expected[2]) < 1e-12
+
+
+def test_radii_table_matches_closed_forms():
+    exact = PuissantCalculator().direct_problem_batch(PHI1.T, LAMBDA1.T, ALPHA12.T, S.T)
+    table = PuissantCalculator(radii_table=get_radii_table()).direct_problem_batch(PHI1.T, LAMBDA1.T, ALPHA12.T, S.T)
+    for a, b in zip(exact, table):
+        assert np.all(angle_difference(a, b) < 1e-9)
+
+
+def test_back_azimuth_stays_below_two_pi():
+    # Départ plein sud dans l'hémisphère sud : Δα infime et négatif, l'azimut retour vaut 0 et non 2π
+    alpha21 = PuissantCalculator().direct_problem_batch(-0.6, 0.0, np.full(1000, math.pi), np.linspace(1, 1e5, 1000))[2]
+    assert np.all((alpha21 >= 0) & (alpha21 < 2 * math.pi))
+
+
+def test_status_flags():
+    phi1 = np.array([0.5, np.nan])
+    phi2, lambda2, alpha21, status = direct_batch("puissant", "Clarke 1880", phi1, 0.1, 0.3, 1e4)
+    assert status.tolist() == [BatchStatus.OK, BatchStatus.NON_FINITE]
@@ -0,0 +1,87 @@
+# test_spherical_calculator.py
+import math
+import numpy as np
+import pytest
+from spherical_calculator import SphericalCalculator
+from utils import BatchStatus
+
+RNG = np.random.default_rng(3)
+PHI1 = np.radians(RNG.uniform(-70, 70, (3, 4)))
+LAMBDA1 = np.radians(RNG.uniform(-180, 180, (3, 4)))
+ALPHA12 = np.radians(RNG.uniform(0, 360, (3, 4)))
+S = RNG.uniform(1e3, 1.9e5, (3, 4))
+
+# Entrées scalaire, 1-D, 2-D et transposée (non contiguë)
+SHAPES = {
+    "scalar": lambda a: a[0, 0],
+    "1d": lambda a: a[0],
+    "2d": lambda a: a,
+    "transposed": lambda a: a.T,
+}
+
+
+def angle_difference(a, b):
+    return np.abs((np.asarray(a) - np.asarray(b) + math.pi) % (2 * math.pi) - math.pi)
+
+
+def test_back_azimuth():
+    calculator = SphericalCalculator()
+    phi2, lambda2, alpha21 = calculator.direct_problem(math.radians(33.5), 0.0, math.radians(45), 10000)
+    assert math.degrees(alpha21) == pytest.approx(225.04, abs=0.01)
+    batch = calculator.direct_problem_batch(math.radians(33.5), 0.0, math.radians(45), 10000)
+    assert float(batch[2]) == pytest.approx(alpha21, abs=1e-12)
+
+
+def test_back_azimuth_stays_below_two_pi():
+    calculator = SphericalCalculator()
+    alpha21 = calculator.direct_problem_batch(math.radians(33.5), -0.1, math.pi, np.linspace(1, 1e5, 1000))[2]
+    assert np.all((alpha21 >= 0) & (alpha21 < 2 * math.pi))
+    s, alpha12, alpha21, status = calculator.inverse_problem_batch(0.5, 0.1, 0.5 - np.linspace(1e-9, 1e-3, 1000), 0.1)
+    assert np.all((alpha12 >= 0) & (alpha12 < 2 * math.pi))
+    assert np.all((alpha21 >= 0) & (alpha21 < 2 * math.pi))
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_direct_batch_matches_scalar_and_inverse(shape):
+    calculator = SphericalCalculator()
+    inputs = [SHAPES[shape](a) for a in (PHI1, LAMBDA1, ALPHA12, S)]
+    phi2, lambda2, alpha21, status = calculator.direct_problem_batch(*inputs)
+    assert phi2.shape == np.shape(inputs[0])
+    assert np.all(status == BatchStatus.OK)
+    assert np.all((alpha21 >= 0) & (alpha21 < 2 * math.pi))
+    for index in np.ndindex(phi2.shape):
+        row = [float(np.asarray(a)[index]) for a in inputs]
+        expected = calculator.direct_problem(*row)
+        assert phi2[index] == pytest.approx(expected[0], abs=1e-12)
+        assert angle_difference(lambda2[index], expected[1]) < 1e-12
+        assert angle_difference(alpha21[index], expected[2]) < 1e-12
+        # L'azimut retour du direct est celui de l'inverse
+        s, alpha12, back = calculator.inverse_problem(row[0], row[1], expected[0], expected[1])
+        assert s == pytest.approx(row[3], rel=1e-6)
+        assert angle_difference(alpha12, row[2]) < 1e-6
+        assert angle_difference(back, expected[2]) < 1e-6
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_inverse_batch_matches_scalar(shape):
+    calculator = SphericalCalculator()
+    phi2, lambda2, _, _ = calculator.direct_problem_batch(PHI1, LAMBDA1, ALPHA12, S)
+    inputs = [SHAPES[shape](a) for a in (PHI1, LAMBDA1, phi2, lambda2)]
+    s, alpha12, alpha21, status = calculator.inverse_problem_batch(*inputs)
+    assert s.shape == np.shape(inputs[0])
+    assert np.all(status == BatchStatus.OK)
+    for index in np.ndindex(s.shape):
+        expected = calculator.inverse_problem(*(float(np.asarray(a)[index]) for a in inputs))
+        assert s[index] == pytest.approx(expected[0], rel=1e-9)
+        assert angle_difference(alpha12[index], expected[1]) < 1e-12
+        assert angle_difference(alpha21[index], expected[2]) < 1e-12
+
+
+def test_status_flags():
+    calculator = SphericalCalculator()
+    phi1 = np.array([0.5, 0.5, np.nan])
+    s = np.array([1e5, 3e5, 1e5])
+    status = calculator.direct_problem_batch(phi1, 0.1, 0.3, s)[3]
+    assert status.tolist() == [BatchStatus.OK, BatchStatus.DISTANCE_LIMIT_EXCEEDED, BatchStatus.NON_FINITE]
+    with pytest.raises(ValueError):
+        calculator.direct_problem(0.5, 0.1, 0.3, 3e5)
@@ -0,0 +1,75 @@
+# test_vincenty_calculator.py
+import math
+import numpy as np
+import pytest
+from utils import BatchStatus
+from vincenty_calculator import VincentyCalculator
+
+RNG = np.random.default_rng(10)
+PHI1, PHI2 = np.radians(RNG.uniform(-80, 80, (2, 3, 4)))
+LAMBDA1, LAMBDA2 = np.radians(RNG.uniform(-180, 180, (2, 3, 4)))
+ALPHA12 = np.radians(RNG.uniform(0, 360, (3, 4)))
+S = RNG.uniform(1e3, 5e6, (3, 4))
+
+# Entrées scalaire, 1-D, 2-D et transposée (non contiguë)
+SHAPES = {
+    "scalar": lambda a: a[0, 0],
+    "1d": lambda a: a[0],
+    "2d": lambda a: a,
+    "transposed": lambda a: a.T,
+}
+
+
+def angle_difference(a, b):
+    return np.abs((np.asarray(a) - np.asarray(b) + math.pi) % (2 * math.pi) - math.pi)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_direct_batch_matches_scalar(shape):
+    calculator = VincentyCalculator()
+    inputs = [SHAPES[shape](a) for a in (PHI1, LAMBDA1, ALPHA12, S)]
+    phi2, lambda2, alpha21, status, iterations = calculator.direct_problem_batch(*inputs)
+    assert phi2.shape == np.shape(inputs[0])
+    assert np.all(status == BatchStatus.OK)
+    assert np.all(iterations > 1)
+    for index in np.ndindex(phi2.shape):
+        expected = calculator.direct_problem(*(float(np.asarray(a)[index]) for a in inputs))
+        assert phi2[index] == pytest.approx(expected[0], abs=1e-11)
+        assert angle_difference(lambda2[index], expected[1]) < 1e-11
+        assert angle_difference(alpha21[index], expected[2]) < 1e-11
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_inverse_batch_matches_scalar(shape):
+    calculator = VincentyCalculator()
+    inputs = [SHAPES[shape](a) for a in (PHI1, LAMBDA1, PHI2, LAMBDA2)]
+    s, alpha12, alpha21, status, iterations = calculator.inverse_problem_batch(*inputs)
+    assert s.shape == np.shape(inputs[0])
+    assert np.all(status == BatchStatus.OK)
+    assert np.all(iterations > 1)
+    for index in np.ndindex(s.shape):
+        expected = calculator.inverse_problem(*(float(np.asarray(a)[index]) for a in inputs))
+        assert s[index] == pytest.approx(expected[0], rel=1e-12, abs=1e-6)
+        assert angle_difference(alpha12[index], expected[1]) < 1e-11
+        assert angle_difference(alpha21[index], expected[2]) < 1e-11
+
+
+@pytest.mark.parametrize("shape", ["scalar", "transposed"])
+def test_not_converged_flag_reaches_caller(shape):
+    calculator = VincentyCalculator(max_iterations=1)
+    direct = calculator.direct_problem_batch(*(SHAPES[shape](a) for a in (PHI1, LAMBDA1, ALPHA12, S)))
+    inverse = calculator.inverse_problem_batch(*(SHAPES[shape](a) for a in (PHI1, LAMBDA1, PHI2, LAMBDA2)))
+    for status, iterations in (direct[3:], inverse[3:]):
+        assert np.all(status & BatchStatus.NOT_CONVERGED)
+        assert np.all(iterations == 1)
+
+
+def test_non_finite_rows_are_flagged():
+    calculator = VincentyCalculator()
+    phi2 = np.array([0.5, np.nan, 0.5])
+    lambda2 = np.array([0.5, 0.5, np.nan])
+    s, alpha12, alpha21, status, iterations = calculator.inverse_problem_batch(0.1, 0.1, phi2, lambda2)
+    assert np.isfinite(s[0]) and status[0] == BatchStatus.OK
+    assert np.all(np.isnan(s[1:]))
+    assert np.all(status[1:] & BatchStatus.NON_FINITE)
+    assert np.all(iterations[1:] == 0)
@@ -0,0 +1,303 @@
+# tile_cache.py
+"""
+Cache local des tuiles de la carte au format MBTiles (base SQLite).
+
+La carte lit ses tuiles dans ce cache via le schéma geotools://tiles (voir
+map_resources.py) et ne les télécharge qu'en cas d'absence. La taille du
+cache est bornée : au-delà de max_bytes, les tuiles les moins récemment
+utilisées sont supprimées.
+
+Le cache peut être pré-rempli pour une emprise et une plage de zooms, avant
+un départ sur le terrain sans réseau :
+    python tile_cache.py seed --bbox -8.0 33.3 -7.3 33.8 --zoom 8 14
+    python tile_cache.py info
+
+Emplacement et taille par défaut : ~/.geotools/tiles.mbtiles et 500 Mo,
+modifiables par les variables d'environnement GEOTOOLS_TILE_CACHE et
+GEOTOOLS_TILE_CACHE_MB. Le serveur de tuiles est réglé par GEOTOOLS_TILE_URL
+(chaîne vide : aucun téléchargement, cache seul).
+"""
+import argparse
+import math
+import os
+import sqlite3
+import sys
+import time
+import urllib.request
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".geotools", "tiles.mbtiles")
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+
+# Identification exigée par la politique d'usage des serveurs OpenStreetMap
+USER_AGENT = "GeoTools/1.0 (outil de geodesie)"
+
+# Au-delà, seed demande force=True (les serveurs publics interdisent le téléchargement massif)
+MAX_SEED_TILES = 50_000
+
+# Zoom maximal des tuiles OpenStreetMap
+MAX_ZOOM = 19
+
+
+def tile_range(bbox, zoom):
+    """
+    Indices des tuiles (Web Mercator, schéma XYZ) couvrant une emprise à un zoom donné
+
+    Args:
+        bbox: (lon_min, lat_min, lon_max, lat_max) en degrés décimaux
+
+    Returns:
+        Tuple (x_min, x_max, y_min, y_max), bornes incluses
+    """
+    lon_min, lat_min, lon_max, lat_max = bbox
+    if lon_min > lon_max or lat_min > lat_max:
+        raise ValueError("Emprise invalide : (lon_min, lat_min, lon_max, lat_max) attendu")
+    n = 2 ** zoom
+
+    def column(lon):
+        return min(n - 1, max(0, int((lon + 180.0) / 360.0 * n)))
+
+    def row(lat):
+        lat = max(-85.0511287798, min(85.0511287798, lat))
+        phi = math.radians(lat)
+        return min(n - 1, max(0, int((1 - math.asinh(math.tan(phi)) / math.pi) / 2 * n)))
+
+    return column(lon_min), column(lon_max), row(lat_max), row(lat_min)
+
+
+def count_tiles(bbox, zoom_min, zoom_max):
+    """Nombre de tuiles couvrant une emprise sur une plage de zooms"""
+    total = 0
+    for zoom in range(zoom_min, zoom_max + 1):
+        x_min, x_max, y_min, y_max = tile_range(bbox, zoom)
+        total += (x_max - x_min + 1) * (y_max - y_min + 1)
+    return total
+
+
+def download_tile(url_template, z, x, y, timeout=10):
+    """Télécharge une tuile et retourne son contenu"""
+    request = urllib.request.Request(url_template.format(z=z, x=x, y=y),
+                                     headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+class TileCache:
+    """
+    Cache de tuiles MBTiles à taille bornée.
+
+    La table tiles suit la spécification MBTiles (lignes au schéma TMS) ;
+    la table tile_usage ajoutée à côté mémorise la taille et la date de
+    dernière utilisation de chaque tuile pour l'éviction.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, tile_url=DEFAULT_TILE_URL):
+        """
+        Args:
+            path: Fichier MBTiles (créé s'il n'existe pas)
+            max_bytes: Taille maximale des tuiles en cache, en octets
+            tile_url: Modèle d'URL {z}/{x}/{y} du serveur de tuiles, ou None pour
+                      n'utiliser que le cache
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.tile_url = tile_url or None
+        self.connection = sqlite3.connect(path, timeout=30)
+        # WAL : la carte peut lire pendant qu'un pré-remplissage écrit, et chaque
+        # mise à jour de last_used ne coûte pas une synchronisation complète du disque
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+                PRIMARY KEY (zoom_level, tile_column, tile_row));
+            CREATE TABLE IF NOT EXISTS tile_usage (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER,
+                size INTEGER, last_used REAL,
+                PRIMARY KEY (zoom_level, tile_column, tile_row));
+            CREATE INDEX IF NOT EXISTS tile_usage_last_used ON tile_usage (last_used);
+        """)
+        self.connection.executemany("INSERT OR IGNORE INTO metadata VALUES (?, ?)", [
+            ("name", "GeoTools"), ("format", "png"), ("type", "baselayer"), ("version", "1"),
+        ])
+        self.connection.commit()
+        self.size_bytes = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM tile_usage").fetchone()[0]
+
+    @classmethod
+    def default(cls):
+        """Cache par défaut, réglé par les variables d'environnement GEOTOOLS_TILE_*"""
+        path = os.environ.get("GEOTOOLS_TILE_CACHE", DEFAULT_CACHE_PATH)
+        max_mb = os.environ.get("GEOTOOLS_TILE_CACHE_MB")
+        max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+        return cls(path, max_bytes, os.environ.get("GEOTOOLS_TILE_URL", DEFAULT_TILE_URL))
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _key(z, x, y):
+        """Clé MBTiles : la ligne est comptée depuis le sud (schéma TMS)"""
+        return z, x, (2 ** z - 1) - y
+
+    def url(self, z, x, y):
+        """URL de la tuile sur le serveur, ou None en mode cache seul"""
+        return self.tile_url.format(z=z, x=x, y=y) if self.tile_url else None
+
+    def get(self, z, x, y):
+        """Contenu de la tuile en cache, ou None"""
+        key = self._key(z, x, y)
+        row = self.connection.execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            key).fetchone()
+        if row is None:
+            return None
+        self.connection.execute(
+            "UPDATE tile_usage SET last_used = ? WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (time.time(), *key))
+        self.connection.commit()
+        return row[0]
+
+    def contains(self, z, x, y):
+        return self.connection.execute(
+            "SELECT 1 FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            self._key(z, x, y)).fetchone() is not None
+
+    def put(self, z, x, y, data, commit=True):
+        """Ajoute (ou remplace) une tuile, puis libère de la place si la taille maximale est dépassée"""
+        key = self._key(z, x, y)
+        previous = self.connection.execute(
+            "SELECT size FROM tile_usage WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            key).fetchone()
+        self.connection.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", (*key, data))
+        self.connection.execute("INSERT OR REPLACE INTO tile_usage VALUES (?, ?, ?, ?, ?)",
+                                (*key, len(data), time.time()))
+        self.size_bytes += len(data) - (previous[0] if previous else 0)
+        if self.size_bytes > self.max_bytes:
+            self.evict()
+        if commit:
+            self.connection.commit()
+
+    def evict(self, target_ratio=0.9):
+        """Supprime les tuiles les moins récemment utilisées jusqu'à target_ratio·max_bytes"""
+        target = self.max_bytes * target_ratio
+        rows = self.connection.execute(
+            "SELECT zoom_level, tile_column, tile_row, size FROM tile_usage ORDER BY last_used")
+        removed = []
+        for z, x, tms_row, size in rows:
+            if self.size_bytes <= target:
+                break
+            removed.append((z, x, tms_row))
+            self.size_bytes -= size
+        for table in ("tiles", "tile_usage"):
+            self.connection.executemany(
+                f"DELETE FROM {table} WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?", removed)
+        self.connection.commit()
+        return len(removed)
+
+    def tile_count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    def seed(self, bbox, zoom_min, zoom_max, force=False, delay=0.0, progress=None,
+             fetch=download_tile):
+        """
+        Télécharge les tuiles absentes du cache pour une emprise et une plage de zooms.
+
+        Args:
+            bbox: (lon_min, lat_min, lon_max, lat_max) en degrés décimaux
+            force: Autorise plus de MAX_SEED_TILES tuiles
+            delay: Pause entre deux téléchargements, en secondes
+            progress: Fonction appelée avec (tuiles traitées, total)
+            fetch: Fonction de téléchargement (url_template, z, x, y) -> bytes
+
+        Returns:
+            Dictionnaire {"total", "downloaded", "cached", "failed"}
+        """
+        if not self.tile_url:
+            raise ValueError("Aucun serveur de tuiles configuré pour le pré-remplissage")
+        if not 0 <= zoom_min <= zoom_max <= MAX_ZOOM:
+            raise ValueError(f"Plage de zooms invalide (0 à {MAX_ZOOM})")
+        total = count_tiles(bbox, zoom_min, zoom_max)
+        if total > MAX_SEED_TILES and not force:
+            raise ValueError(f"{total} tuiles demandées (plus de {MAX_SEED_TILES}) : "
+                             "réduire l'emprise ou les zooms, ou forcer")
+        if total * 20 * 1024 > self.max_bytes:
+            print(f"Attention : {total} tuiles risquent de dépasser la taille du cache", file=sys.stderr)
+
+        stats = {"total": total, "downloaded": 0, "cached": 0, "failed": 0}
+        done = 0
+        for zoom in range(zoom_min, zoom_max + 1):
+            x_min, x_max, y_min, y_max = tile_range(bbox, zoom)
+            for x in range(x_min, x_max + 1):
+                for y in range(y_min, y_max + 1):
+                    if self.contains(zoom, x, y):
+                        stats["cached"] += 1
+                    else:
+                        try:
+                            self.put(zoom, x, y, fetch(self.tile_url, zoom, x, y), commit=False)
+                            stats["downloaded"] += 1
+                        except OSError:
+                            stats["failed"] += 1
+                        if delay:
+                            time.sleep(delay)
+                    done += 1
+                    if progress:
+                        progress(done, total)
+            self.connection.commit()
+        return stats
+
+
+def build_parser():
+    """Analyseur des arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Cache local des tuiles de la carte (MBTiles)")
+    parser.add_argument("--cache", default=os.environ.get("GEOTOOLS_TILE_CACHE", DEFAULT_CACHE_PATH))
+    parser.add_argument("--max-size-mb", type=float,
+                        default=float(os.environ.get("GEOTOOLS_TILE_CACHE_MB", DEFAULT_MAX_BYTES / 1024 ** 2)))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed = subparsers.add_parser("seed", help="Pré-remplit le cache pour une emprise")
+    seed.add_argument("--bbox", type=float, nargs=4, required=True,
+                      metavar=("LON_MIN", "LAT_MIN", "LON_MAX", "LAT_MAX"))
+    seed.add_argument("--zoom", type=int, nargs=2, required=True, metavar=("MIN", "MAX"))
+    seed.add_argument("--url", default=os.environ.get("GEOTOOLS_TILE_URL", DEFAULT_TILE_URL),
+                      help="Modèle d'URL du serveur de tuiles ({z}/{x}/{y})")
+    seed.add_argument("--delay", type=float, default=0.0, help="Pause entre deux tuiles (secondes)")
+    seed.add_argument("--force", action="store_true", help=f"Autorise plus de {MAX_SEED_TILES} tuiles")
+
+    subparsers.add_parser("info", help="Affiche l'état du cache")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    max_bytes = int(args.max_size_mb * 1024 * 1024)
+    if args.command == "seed":
+        cache = TileCache(args.cache, max_bytes, args.url)
+
+        def progress(done, total):
+            if done % 100 == 0 or done == total:
+                print(f"\r{done}/{total} tuiles", end="", file=sys.stderr)
+
+        try:
+            stats = cache.seed(tuple(args.bbox), args.zoom[0], args.zoom[1], args.force, args.delay,
+                               progress)
+        except ValueError as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            return 1
+        print(file=sys.stderr)
+        print(f"{stats['downloaded']} téléchargées, {stats['cached']} déjà en cache, "
+              f"{stats['failed']} en échec", file=sys.stderr)
+    else:
+        cache = TileCache(args.cache, max_bytes, None)
+    print(f"{cache.path} : {cache.tile_count()} tuiles, "
+          f"{cache.size_bytes / 1024 ** 2:.1f} Mo / {cache.max_bytes / 1024 ** 2:.0f} Mo")
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
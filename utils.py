@@ -1,5 +1,10 @@
 import math
+import re
 from typing import Tuple
+from ellipsoid import get_ellipsoid
+
+
+_FIELD_SEPARATORS = re.compile(r"[,;\t]")
 
 
 class GeodesicUtils:
@@ -14,30 +19,43 @@ class GeodesicUtils:
         return angle
 
 
-class Ellipsoid:
-    """Définition des ellipsoïdes de référence"""
-
-    CLARKE_1880 = {
-        'a': 6378249.145,  # demi grand axe
-        'b': 6356514.870,  # demi petit axe
-        'e_squared': 0.006803481,  # première excentricité au carré
-        'e_prime_squared': 0.006847161  # seconde excentricité au carré
-    }
-
-    WGS84 = {
-        'a': 6378137.0,  # demi grand axe
-        'b': 6356752.314,  # demi petit axe
-        'e_squared': 0.006694380,  # première excentricité au carré
-        'e_prime_squared': 0.006739497  # seconde excentricité au carré
+class BatchStatus:
+    """Codes d'état par ligne des calculs vectorisés (combinables bit à bit)"""
+
+    OK = 0
+    AZIMUTH_INCONSISTENT = 1  # azimut direct incohérent avec le sens de Δφ/Δλ
+    DISTANCE_OUT_OF_RANGE = 2  # distance nulle, négative ou supérieure à π·a
+    NON_FINITE = 4  # résultat NaN ou infini (points confondus, pôles...)
+    DISTANCE_LIMIT_EXCEEDED = 8  # distance au-delà du domaine de validité de la méthode
+    NOT_CONVERGED = 16  # nombre maximal d'itérations atteint sans convergence
+    INVALID_INPUT = 32  # ligne d'entrée illisible ou incomplète
+
+    MESSAGES = {
+        AZIMUTH_INCONSISTENT: "Azimut direct incohérent",
+        DISTANCE_OUT_OF_RANGE: "Distance hors limites",
+        NON_FINITE: "Résultat non fini",
+        DISTANCE_LIMIT_EXCEEDED: "Distance au-delà de la limite de la méthode",
+        NOT_CONVERGED: "Pas de convergence",
+        INVALID_INPUT: "Entrée invalide",
     }
 
     @staticmethod
-    def get_derived_params(ellipsoid: dict) -> dict:
-        """Calcule les paramètres dérivés de l'ellipsoïde"""
-        ellipsoid = ellipsoid.copy()
-        # Rayon moyen des demi-axes
-        ellipsoid['R_mean'] = (2 * ellipsoid['a'] + ellipsoid['b']) / 3
-        return ellipsoid
+    def describe(code: int) -> str:
+        """Retourne le libellé des erreurs contenues dans un code d'état"""
+        code = int(code)
+        if code == BatchStatus.OK:
+            return "OK"
+        return ", ".join(message for flag, message in BatchStatus.MESSAGES.items() if code & flag)
+
+
+def split_fields(line):
+    """
+    Découpe une ligne de texte en champs : séparés par des virgules,
+    points-virgules ou tabulations s'il y en a, sinon par des espaces
+    """
+    if _FIELD_SEPARATORS.search(line):
+        return [field.strip() for field in _FIELD_SEPARATORS.split(line)]
+    return line.split()
 
 
 class SphericalCalculator:
@@ -47,12 +65,9 @@ class SphericalCalculator:
         """
         Initialise le calculateur avec l'ellipsoïde choisi
         Args:
-            ellipsoid_name: Nom de l'ellipsoïde ("Clarke 1880" ou "WGS84")
+            ellipsoid_name: Nom d'un ellipsoïde enregistré ("Clarke 1880", "WGS84"...)
         """
-        if ellipsoid_name == "Clarke 1880":
-            self.ellipsoid = Ellipsoid.get_derived_params(Ellipsoid.CLARKE_1880)
-        else:
-            self.ellipsoid = Ellipsoid.get_derived_params(Ellipsoid.WGS84)
+        self.ellipsoid = get_ellipsoid(ellipsoid_name)
 
     def check_distance(self, s: float) -> None:
         """
@@ -79,7 +94,7 @@ class SphericalCalculator:
             Tuple (phi2, lambda2, alpha21) en radians
         """
         self.check_distance(s)
-        R = self.ellipsoid['R_mean']
+        R = self.ellipsoid.R_mean
 
         # Conversion de la distance linéaire en distance angulaire
         sigma = s / R
@@ -114,12 +129,9 @@ class PuissantCalculator:
         """
         Initialise le calculateur avec l'ellipsoïde choisi
         Args:
-            ellipsoid_name: Nom de l'ellipsoïde ("Clarke 1880" ou "WGS84")
+            ellipsoid_name: Nom d'un ellipsoïde enregistré ("Clarke 1880", "WGS84"...)
         """
-        if ellipsoid_name == "Clarke 1880":
-            self.ellipsoid = Ellipsoid.get_derived_params(Ellipsoid.CLARKE_1880)
-        else:
-            self.ellipsoid = Ellipsoid.get_derived_params(Ellipsoid.WGS84)
+        self.ellipsoid = get_ellipsoid(ellipsoid_name)
 
     def check_distance(self, s: float) -> None:
         """
@@ -134,14 +146,14 @@ class PuissantCalculator:
 
     def calculate_N(self, phi: float) -> float:
         """Calcule le rayon de courbure de la première verticale"""
-        e_squared = self.ellipsoid['e_squared']
-        a = self.ellipsoid['a']
+        e_squared = self.ellipsoid.e_squared
+        a = self.ellipsoid.a
         return a / math.sqrt(1 - e_squared * math.sin(phi) ** 2)
 
     def calculate_M(self, phi: float) -> float:
         """Calcule le rayon de courbure méridien"""
-        e_squared = self.ellipsoid['e_squared']
-        a = self.ellipsoid['a']
+        e_squared = self.ellipsoid.e_squared
+        a = self.ellipsoid.a
         return a * (1 - e_squared) / (1 - e_squared * math.sin(phi) ** 2) ** (3 / 2)
 
     def direct_problem(self, phi1: float, lambda1: float, alpha12: float, s: float) -> Tuple[float, float, float]:
@@ -165,8 +177,8 @@ class PuissantCalculator:
 
         # Coefficients de Puissant
         B = 1 / M1
-        C = (3 / 2) * self.ellipsoid['e_squared'] * math.sin(phi1) * math.cos(phi1) / \
-            (1 - self.ellipsoid['e_squared'] * math.sin(phi1) ** 2)
+        C = (3 / 2) * self.ellipsoid.e_squared * math.sin(phi1) * math.cos(phi1) / \
+            (1 - self.ellipsoid.e_squared * math.sin(phi1) ** 2)
         D = math.tan(phi1) / (2 * M1 * N1)
         E = (1 + 3 * math.tan(phi1) ** 2) / (6 * N1 ** 2)
         h = (s / M1) * math.cos(alpha12)
@@ -0,0 +1,339 @@
+# vincenty_calculator.py
+import math
+import numpy as np
+from ellipsoid import get_ellipsoid
+from utils import BatchStatus
+
+
+class VincentyCalculator:
+    """
+    Problèmes direct et inverse par les formules itératives de Vincenty (1975),
+    valables à toutes les distances (précision millimétrique), sauf convergence
+    lente ou impossible pour l'inverse entre points quasi antipodaux.
+    """
+
+    def __init__(self, ellipsoid_name="Clarke 1880", tolerance=1e-12, max_iterations=200):
+        """
+        Args:
+            ellipsoid_name: Nom d'un ellipsoïde enregistré
+            tolerance: Écart de convergence sur λ (inverse) ou σ (direct), en radians
+            max_iterations: Nombre maximal d'itérations
+        """
+        self.ellipsoid = get_ellipsoid(ellipsoid_name)
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+        self.a = self.ellipsoid.a
+        self.b = self.ellipsoid.b
+        self.f = self.ellipsoid.f
+        # (a² - b²) / b², pour u² = cos²α · e'²
+        self.e_prime_squared = (self.a ** 2 - self.b ** 2) / self.b ** 2
+
+    @staticmethod
+    def _flat_inputs(*values):
+        """
+        Entrées des versions vectorisées : forme commune et copies à plat
+        (1-D, contiguës), sur lesquelles les itérations écrivent par indices.
+        Les résultats sont remis à la forme commune par reshape à la fin.
+        """
+        values = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in values))
+        shape = values[0].shape
+        return shape, [np.array(v, dtype=np.float64, order="C", copy=True).reshape(-1) for v in values]
+
+    @staticmethod
+    def _coefficients_A_B(u_squared):
+        """Coefficients A et B de Vincenty (fonctionne sur scalaires et tableaux)"""
+        A = 1 + u_squared / 16384 * (4096 + u_squared * (-768 + u_squared * (320 - 175 * u_squared)))
+        B = u_squared / 1024 * (256 + u_squared * (-128 + u_squared * (74 - 47 * u_squared)))
+        return A, B
+
+    @staticmethod
+    def _delta_sigma(B, sin_sigma, cos_sigma, cos_2sigma_m):
+        """Terme Δσ de Vincenty (fonctionne sur scalaires et tableaux)"""
+        cos2_2sigma_m = cos_2sigma_m ** 2
+        return B * sin_sigma * (cos_2sigma_m + B / 4 * (
+            cos_sigma * (-1 + 2 * cos2_2sigma_m) -
+            B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos2_2sigma_m)))
+
+    def direct_problem(self, phi1, lambda1, alpha12, s):
+        """
+        Résout le problème direct par la méthode de Vincenty
+
+        Args:
+            phi1, lambda1: Coordonnées du point initial (radians)
+            alpha12: Azimut direct (radians)
+            s: Distance (mètres)
+
+        Returns:
+            Tuple (phi2, lambda2, alpha21) en radians
+
+        Raises:
+            ValueError si l'itération ne converge pas
+        """
+        f = self.f
+        sin_alpha1 = math.sin(alpha12)
+        cos_alpha1 = math.cos(alpha12)
+
+        # Latitude réduite et arc σ1 sur la sphère auxiliaire
+        tan_U1 = (1 - f) * math.tan(phi1)
+        cos_U1 = 1 / math.sqrt(1 + tan_U1 ** 2)
+        sin_U1 = tan_U1 * cos_U1
+        sigma1 = math.atan2(tan_U1, cos_alpha1)
+        sin_alpha = cos_U1 * sin_alpha1
+        cos2_alpha = 1 - sin_alpha ** 2
+        A, B = self._coefficients_A_B(cos2_alpha * self.e_prime_squared)
+
+        # Itération sur σ
+        sigma = s / (self.b * A)
+        for _ in range(self.max_iterations):
+            cos_2sigma_m = math.cos(2 * sigma1 + sigma)
+            sin_sigma = math.sin(sigma)
+            cos_sigma = math.cos(sigma)
+            sigma_previous = sigma
+            sigma = s / (self.b * A) + self._delta_sigma(B, sin_sigma, cos_sigma, cos_2sigma_m)
+            if abs(sigma - sigma_previous) <= self.tolerance:
+                break
+        else:
+            raise ValueError("La méthode de Vincenty n'a pas convergé (problème direct)")
+
+        cos_2sigma_m = math.cos(2 * sigma1 + sigma)
+        sin_sigma = math.sin(sigma)
+        cos_sigma = math.cos(sigma)
+
+        # Point d'arrivée
+        tmp = sin_U1 * sin_sigma - cos_U1 * cos_sigma * cos_alpha1
+        phi2 = math.atan2(sin_U1 * cos_sigma + cos_U1 * sin_sigma * cos_alpha1,
+                          (1 - f) * math.hypot(sin_alpha, tmp))
+        lambda_aux = math.atan2(sin_sigma * sin_alpha1,
+                                cos_U1 * cos_sigma - sin_U1 * sin_sigma * cos_alpha1)
+        C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        L = lambda_aux - (1 - C) * f * sin_alpha * (
+            sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+        lambda2 = lambda1 + L
+
+        # Azimut retour : azimut direct en P2 + π
+        alpha21 = (math.atan2(sin_alpha, -tmp) + math.pi) % (2 * math.pi)
+
+        return phi2, lambda2, alpha21
+
+    def inverse_problem(self, phi1, lambda1, phi2, lambda2):
+        """
+        Résout le problème inverse par la méthode de Vincenty
+
+        Args:
+            phi1, lambda1: Coordonnées du point A (radians)
+            phi2, lambda2: Coordonnées du point B (radians)
+
+        Returns:
+            Tuple (s, alpha12, alpha21) : distance (mètres) et azimuts (radians)
+
+        Raises:
+            ValueError si l'itération ne converge pas (points quasi antipodaux)
+        """
+        f = self.f
+        L = lambda2 - lambda1
+        tan_U1 = (1 - f) * math.tan(phi1)
+        cos_U1 = 1 / math.sqrt(1 + tan_U1 ** 2)
+        sin_U1 = tan_U1 * cos_U1
+        tan_U2 = (1 - f) * math.tan(phi2)
+        cos_U2 = 1 / math.sqrt(1 + tan_U2 ** 2)
+        sin_U2 = tan_U2 * cos_U2
+
+        # Itération sur la longitude λ de la sphère auxiliaire
+        lambda_aux = L
+        for _ in range(self.max_iterations):
+            sin_lambda = math.sin(lambda_aux)
+            cos_lambda = math.cos(lambda_aux)
+            sin_sigma = math.hypot(cos_U2 * sin_lambda,
+                                   cos_U1 * sin_U2 - sin_U1 * cos_U2 * cos_lambda)
+            if sin_sigma == 0:
+                # Points confondus
+                return 0.0, 0.0, math.pi
+            cos_sigma = sin_U1 * sin_U2 + cos_U1 * cos_U2 * cos_lambda
+            sigma = math.atan2(sin_sigma, cos_sigma)
+            sin_alpha = cos_U1 * cos_U2 * sin_lambda / sin_sigma
+            cos2_alpha = 1 - sin_alpha ** 2
+            # Ligne équatoriale : cos²α = 0
+            cos_2sigma_m = cos_sigma - 2 * sin_U1 * sin_U2 / cos2_alpha if cos2_alpha != 0 else 0.0
+            C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+            lambda_previous = lambda_aux
+            lambda_aux = L + (1 - C) * f * sin_alpha * (
+                sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+            if abs(lambda_aux - lambda_previous) <= self.tolerance:
+                break
+        else:
+            raise ValueError("La méthode de Vincenty n'a pas convergé (points quasi antipodaux)")
+
+        A, B = self._coefficients_A_B(cos2_alpha * self.e_prime_squared)
+        s = self.b * A * (sigma - self._delta_sigma(B, sin_sigma, cos_sigma, cos_2sigma_m))
+
+        sin_lambda = math.sin(lambda_aux)
+        cos_lambda = math.cos(lambda_aux)
+        alpha12 = math.atan2(cos_U2 * sin_lambda, cos_U1 * sin_U2 - sin_U1 * cos_U2 * cos_lambda)
+        alpha2 = math.atan2(cos_U1 * sin_lambda, -sin_U1 * cos_U2 + cos_U1 * sin_U2 * cos_lambda)
+
+        return s, alpha12 % (2 * math.pi), (alpha2 + math.pi) % (2 * math.pi)
+
+    def direct_problem_batch(self, phi1, lambda1, alpha12, s):
+        """
+        Version vectorisée de direct_problem sur des tableaux NumPy.
+
+        Seules les lignes non encore convergées sont recalculées à chaque
+        itération.
+
+        Returns:
+            Tuple (phi2, lambda2, alpha21, status, iterations) : les trois tableaux
+            de résultats (radians), les codes d'état (BatchStatus.NOT_CONVERGED pour
+            les lignes qui ont atteint max_iterations) et le nombre d'itérations par ligne
+        """
+        shape, (phi1, lambda1, alpha12, s) = self._flat_inputs(phi1, lambda1, alpha12, s)
+        f = self.f
+        sin_alpha1 = np.sin(alpha12)
+        cos_alpha1 = np.cos(alpha12)
+
+        tan_U1 = (1 - f) * np.tan(phi1)
+        cos_U1 = 1 / np.sqrt(1 + tan_U1 ** 2)
+        sin_U1 = tan_U1 * cos_U1
+        sigma1 = np.arctan2(tan_U1, cos_alpha1)
+        sin_alpha = cos_U1 * sin_alpha1
+        cos2_alpha = 1 - sin_alpha ** 2
+        A, B = self._coefficients_A_B(cos2_alpha * self.e_prime_squared)
+
+        sigma = s / (self.b * A)
+        iterations = np.zeros(sigma.shape, dtype=np.int32)
+
+        # Tableaux de travail restreints aux lignes non convergées (compactés à chaque itération)
+        active = np.flatnonzero(np.isfinite(sigma))
+        sigma_0_active = sigma[active]
+        sigma_active = sigma_0_active.copy()
+        two_sigma1_active = 2 * sigma1[active]
+        B_active = B[active]
+        for _ in range(self.max_iterations):
+            if active.size == 0:
+                break
+            sigma_new = sigma_0_active + self._delta_sigma(
+                B_active, np.sin(sigma_active), np.cos(sigma_active),
+                np.cos(two_sigma1_active + sigma_active))
+            sigma[active] = sigma_new
+            iterations[active] += 1
+
+            keep = np.abs(sigma_new - sigma_active) > self.tolerance
+            active = active[keep]
+            sigma_active = sigma_new[keep]
+            sigma_0_active = sigma_0_active[keep]
+            two_sigma1_active = two_sigma1_active[keep]
+            B_active = B_active[keep]
+
+        status = np.zeros(sigma.shape, dtype=np.uint8)
+        status[active] |= BatchStatus.NOT_CONVERGED
+
+        cos_2sigma_m = np.cos(2 * sigma1 + sigma)
+        sin_sigma = np.sin(sigma)
+        cos_sigma = np.cos(sigma)
+
+        tmp = sin_U1 * sin_sigma - cos_U1 * cos_sigma * cos_alpha1
+        phi2 = np.arctan2(sin_U1 * cos_sigma + cos_U1 * sin_sigma * cos_alpha1,
+                          (1 - f) * np.hypot(sin_alpha, tmp))
+        lambda_aux = np.arctan2(sin_sigma * sin_alpha1,
+                                cos_U1 * cos_sigma - sin_U1 * sin_sigma * cos_alpha1)
+        C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        L = lambda_aux - (1 - C) * f * sin_alpha * (
+            sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+        lambda2 = lambda1 + L
+        alpha21 = np.mod(np.arctan2(sin_alpha, -tmp) + math.pi, 2 * math.pi)
+
+        status[~(np.isfinite(phi2) & np.isfinite(lambda2) & np.isfinite(alpha21))] |= BatchStatus.NON_FINITE
+        return tuple(a.reshape(shape) for a in (phi2, lambda2, alpha21, status, iterations))
+
+    def inverse_problem_batch(self, phi1, lambda1, phi2, lambda2):
+        """
+        Version vectorisée de inverse_problem sur des tableaux NumPy.
+
+        Seules les lignes non encore convergées sont recalculées à chaque
+        itération ; les paires quasi antipodales qui atteignent max_iterations
+        gardent le résultat de la dernière itération et sont signalées.
+
+        Returns:
+            Tuple (s, alpha12, alpha21, status, iterations) : distances (mètres),
+            azimuts (radians), codes d'état (BatchStatus.NOT_CONVERGED, NON_FINITE)
+            et nombre d'itérations par ligne
+        """
+        shape, (phi1, lambda1, phi2, lambda2) = self._flat_inputs(phi1, lambda1, phi2, lambda2)
+        f = self.f
+        L = lambda2 - lambda1
+        tan_U1 = (1 - f) * np.tan(phi1)
+        cos_U1 = 1 / np.sqrt(1 + tan_U1 ** 2)
+        sin_U1 = tan_U1 * cos_U1
+        tan_U2 = (1 - f) * np.tan(phi2)
+        cos_U2 = 1 / np.sqrt(1 + tan_U2 ** 2)
+        sin_U2 = tan_U2 * cos_U2
+
+        # Grandeurs de la dernière itération, conservées pour chaque ligne (NaN
+        # pour les lignes d'entrée non finies, qui ne sont pas itérées)
+        n = L.size
+        finite = np.isfinite(phi1) & np.isfinite(phi2) & np.isfinite(L)
+        lambda_aux = L.copy()
+        sin_sigma = np.zeros(n)
+        cos_sigma = np.ones(n)
+        sigma = np.zeros(n)
+        sigma[~finite] = np.nan
+        cos2_alpha = np.ones(n)
+        cos_2sigma_m = np.zeros(n)
+        iterations = np.zeros(n, dtype=np.int32)
+        outputs = (lambda_aux, sin_sigma, cos_sigma, sigma, cos2_alpha, cos_2sigma_m)
+
+        # Tableaux de travail restreints aux lignes non convergées (compactés à chaque itération)
+        active = np.flatnonzero(finite)
+        cU1, sU1, cU2, sU2, L_active = (a[active] for a in (cos_U1, sin_U1, cos_U2, sin_U2, L))
+        sU1_sU2 = sU1 * sU2
+        cU1_cU2 = cU1 * cU2
+        cU1_sU2 = cU1 * sU2
+        sU1_cU2 = sU1 * cU2
+        lam = L_active.copy()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _ in range(self.max_iterations):
+                if active.size == 0:
+                    break
+                sin_lambda = np.sin(lam)
+                cos_lambda = np.cos(lam)
+
+                sin_s = np.hypot(cU2 * sin_lambda, cU1_sU2 - sU1_cU2 * cos_lambda)
+                cos_s = sU1_sU2 + cU1_cU2 * cos_lambda
+                sig = np.arctan2(sin_s, cos_s)
+                # Points confondus : sin σ = 0
+                sin_a = np.where(sin_s == 0, 0.0, cU1_cU2 * sin_lambda / sin_s)
+                cos2_a = 1 - sin_a ** 2
+                # Ligne équatoriale : cos²α = 0
+                cos_2sm = np.where(cos2_a == 0, 0.0, cos_s - 2 * sU1_sU2 / cos2_a)
+                C = f / 16 * cos2_a * (4 + f * (4 - 3 * cos2_a))
+                lam_new = L_active + (1 - C) * f * sin_a * (
+                    sig + C * sin_s * (cos_2sm + C * cos_s * (-1 + 2 * cos_2sm ** 2)))
+
+                for output, value in zip(outputs, (lam_new, sin_s, cos_s, sig, cos2_a, cos_2sm)):
+                    output[active] = value
+                iterations[active] += 1
+
+                keep = np.abs(lam_new - lam) > self.tolerance
+                active = active[keep]
+                lam = lam_new[keep]
+                cU1, cU2, L_active = cU1[keep], cU2[keep], L_active[keep]
+                sU1_sU2, cU1_cU2 = sU1_sU2[keep], cU1_cU2[keep]
+                cU1_sU2, sU1_cU2 = cU1_sU2[keep], sU1_cU2[keep]
+
+        status = np.zeros(n, dtype=np.uint8)
+        status[active] |= BatchStatus.NOT_CONVERGED
+
+        A, B = self._coefficients_A_B(cos2_alpha * self.e_prime_squared)
+        s = self.b * A * (sigma - self._delta_sigma(B, sin_sigma, cos_sigma, cos_2sigma_m))
+
+        # Azimuts calculés avec la valeur finale de λ
+        sin_lambda = np.sin(lambda_aux)
+        cos_lambda = np.cos(lambda_aux)
+        alpha12 = np.mod(np.arctan2(cos_U2 * sin_lambda, cos_U1 * sin_U2 - sin_U1 * cos_U2 * cos_lambda),
+                         2 * math.pi)
+        alpha2 = np.arctan2(cos_U1 * sin_lambda, -sin_U1 * cos_U2 + cos_U1 * sin_U2 * cos_lambda)
+        alpha21 = np.mod(alpha2 + math.pi, 2 * math.pi)
+
+        status[~(np.isfinite(s) & np.isfinite(alpha12) & np.isfinite(alpha21))] |= BatchStatus.NON_FINITE
+        return tuple(a.reshape(shape) for a in (s, alpha12, alpha21, status, iterations))
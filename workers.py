@@ -0,0 +1,226 @@
+# workers.py
+"""
+Exécution des calculs de l'interface en arrière-plan, sur un QThreadPool
+partagé par toutes les pages.
+
+Un calcul est un Job (QRunnable) : sa fonction s'exécute hors du thread de
+l'interface et communique uniquement par les signaux de job.signals, reçus
+dans le thread de l'interface :
+
+    progress(traités, total)          avancement
+    batch_ready(début, résultats)     résultats d'un bloc, dès qu'il est calculé
+    finished(résultat)                résultat complet
+    failed(message)                   erreur
+    cancelled()                       calcul annulé
+
+L'annulation est coopérative : la fonction appelle job.check_cancelled()
+entre deux blocs (batch_job le fait pour elle).
+
+Chaque page soumet ses calculs par un JobSlot : un nouveau calcul annule le
+précédent, et les résultats d'un calcul dépassé ne sont jamais livrés.
+
+Un Debouncer regroupe des demandes rapprochées (saisie au clavier) en un seul
+appel, fait après un court délai sans nouvelle demande.
+"""
+import threading
+import numpy as np
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+# Nombre de lignes calculées entre deux livraisons de résultats
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Délai (ms) sans nouvelle saisie avant un recalcul en direct
+DEFAULT_DEBOUNCE_MS = 250
+
+
+class JobCancelled(Exception):
+    """Levée par Job.check_cancelled() pour interrompre un calcul annulé"""
+
+
+class JobSignals(QObject):
+    progress = pyqtSignal(int, int)
+    batch_ready = pyqtSignal(int, object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Job(QRunnable):
+    """
+    Calcul exécuté sur le pool partagé : function(job, *args, **kwargs).
+
+    Le Job doit être créé dans le thread de l'interface, pour que ses signaux
+    y soient reçus.
+    """
+
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        # Le pool ne doit pas détruire l'objet : Python en garde la référence
+        self.setAutoDelete(False)
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Demande l'arrêt du calcul ; sans effet s'il est déjà terminé"""
+        self._cancel.set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report_progress(self, done, total):
+        self.signals.progress.emit(done, total)
+
+    def deliver(self, start, results):
+        """Livre à l'interface les résultats d'un bloc commençant à la ligne start"""
+        self.signals.batch_ready.emit(start, results)
+
+    def run(self):
+        try:
+            self.check_cancelled()
+            result = self.function(self, *self.args, **self.kwargs)
+            self.check_cancelled()
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e) or type(e).__name__)
+        else:
+            self.signals.finished.emit(result)
+
+
+def batch_job(compute, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Job appliquant compute(*colonnes) bloc par bloc à des tableaux de même longueur.
+
+    compute retourne un tuple de tableaux (une valeur par ligne). Chaque bloc
+    est livré par batch_ready dès qu'il est calculé ; le résultat final est le
+    tuple des tableaux complets.
+    """
+    columns = [np.asarray(column) for column in columns]
+
+    def run(job):
+        total = len(columns[0]) if columns else 0
+        results = None
+        for start in range(0, total, chunk_size):
+            job.check_cancelled()
+            chunk = compute(*(column[start:start + chunk_size] for column in columns))
+            if results is None:
+                results = tuple(np.empty(total, dtype=np.asarray(r).dtype) for r in chunk)
+            for result, values in zip(results, chunk):
+                result[start:start + len(values)] = values
+            job.deliver(start, chunk)
+            job.report_progress(min(start + chunk_size, total), total)
+        return results or ()
+
+    return Job(run)
+
+
+_pool = None
+_jobs = set()
+
+
+def thread_pool():
+    """Pool de threads partagé, créé au premier appel (un cœur reste à l'interface)"""
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(max(1, QThreadPool.globalInstance().maxThreadCount() - 1))
+    return _pool
+
+
+def submit(job):
+    """Lance un Job sur le pool partagé ; sa référence est gardée jusqu'à sa fin"""
+    _jobs.add(job)
+    for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+        signal.connect(lambda *_: _jobs.discard(job))
+    thread_pool().start(job)
+    return job
+
+
+def cancel_all(wait_ms=-1):
+    """Annule tous les calculs en cours ou en attente et attend la fin des threads"""
+    for job in list(_jobs):
+        job.cancel()
+    if _pool is not None:
+        _pool.clear()
+        _pool.waitForDone(wait_ms)
+    _jobs.clear()
+
+
+class JobSlot:
+    """
+    Calcul en cours d'une page : soumettre un calcul annule le précédent, et
+    seuls les signaux du calcul courant parviennent aux fonctions de la page.
+    """
+
+    def __init__(self):
+        self.job = None
+
+    @property
+    def busy(self):
+        return self.job is not None
+
+    def submit(self, job, on_finished, on_failed=None, on_batch=None):
+        self.cancel()
+        self.job = job
+        job.signals.finished.connect(lambda result: self._done(job, on_finished, result))
+        job.signals.failed.connect(lambda message: self._done(job, on_failed, message))
+        job.signals.cancelled.connect(lambda: self._done(job, None, None))
+        if on_batch:
+            job.signals.batch_ready.connect(
+                lambda start, results: self._current(job) and on_batch(start, results))
+        return submit(job)
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+
+    def _current(self, job):
+        return job is self.job and not job.cancelled
+
+    def _done(self, job, callback, value):
+        if job is not self.job:
+            return
+        self.job = None
+        if callback and not job.cancelled:
+            callback(value)
+
+
+class Debouncer(QObject):
+    """
+    Appelle callback une seule fois, delay_ms après la dernière demande
+    (trigger) : chaque demande repousse l'appel en attente.
+    """
+
+    def __init__(self, callback, delay_ms=DEFAULT_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(callback)
+        self.callback = callback
+
+    @property
+    def pending(self):
+        return self.timer.isActive()
+
+    def trigger(self):
+        self.timer.start()
+
+    def cancel(self):
+        self.timer.stop()
+
+    def flush(self):
+        """Fait tout de suite l'appel en attente, s'il y en a un"""
+        if self.timer.isActive():
+            self.timer.stop()
+            self.callback()